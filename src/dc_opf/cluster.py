@@ -0,0 +1,362 @@
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.process import BaseProcess
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.dc_opf.lp import solve_lp
+from src.dc_opf.network import compile_network
+from src.dc_opf.opt_model import InfeasibleModelError, write_state
+from src.dc_opf.stochastic import ScenarioSet
+from src.dc_opf.template import ModelTemplate
+from src.model.power_system_model import PowerSystemModel, SystemState
+
+CHUNK_SIZE = 32
+MAX_RETRIES = 3
+STRAGGLER_FACTOR = 3.0
+"""Chunks running longer than this multiple of the median chunk time are re-assigned."""
+POLL_INTERVAL = 0.05
+
+Address = tuple[str, int] | str
+"""TCP (host, port) or Unix socket path."""
+
+
+@dataclass
+class ScenarioDispatch:
+    """DC OPF solutions of independent scenarios."""
+
+    power_generation: pd.DataFrame
+    """Generation (scenarios x generators), NaN in infeasible scenarios."""
+    power_flow: pd.DataFrame
+    """Branch flows (scenarios x branches)."""
+    theta: pd.DataFrame
+    """Nodes voltage angles (scenarios x nodes)."""
+    feasible: pd.Series
+    """Indicates if the scenario DC OPF is feasible."""
+
+    def state(self, power_system_model: PowerSystemModel, scenario) -> SystemState:
+        """System state in the given scenario."""
+        network = compile_network(power_system_model.parameters)
+        state = SystemState.undefined_state(power_system_model.parameters)
+        write_state(
+            state,
+            network,
+            self.power_generation.loc[scenario].to_numpy(),
+            self.power_flow.loc[scenario].to_numpy(),
+            self.theta.loc[scenario].to_numpy(),
+        )
+        return state
+
+
+@dataclass
+class CoordinatorStats:
+    """Coordinator instrumentation."""
+
+    workers: int = 0
+    """Workers connected during the run."""
+    chunks: int = 0
+    retries: int = 0
+    """Chunks re-queued after their worker disconnected."""
+    reassigned: int = 0
+    """Straggling chunks assigned to another worker."""
+
+
+@dataclass
+class _Chunk:
+    scenarios: slice
+    attempts: int = 0
+    running: dict[int, float] = field(default_factory=dict)
+    """Start times of the chunk on workers (by worker number)."""
+
+
+class Coordinator:
+    """
+    Coordinator of multi-scenario DC OPF executed by socket-connected workers.
+
+    Workers (see `run_worker`) connect over TCP or a Unix socket (the address
+    family follows `address`), receive the model template once and then pull
+    chunks of `chunk_size` scenarios, sending solutions back. Chunks of a
+    worker which disconnects are re-queued (at most `max_retries` times);
+    when the queue is empty, idle workers duplicate chunks running longer
+    than `straggler_factor` times the median chunk time and the first result
+    wins. Messages are pickled and authenticated with `authkey`.
+    """
+
+    def __init__(
+        self,
+        address: Address = ("127.0.0.1", 0),
+        authkey: bytes | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        max_retries: int = MAX_RETRIES,
+        straggler_factor: float = STRAGGLER_FACTOR,
+    ) -> None:
+        self.authkey = os.urandom(16) if authkey is None else authkey
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.straggler_factor = straggler_factor
+        self.stats = CoordinatorStats()
+        self._listener = Listener(address, authkey=self.authkey)
+        self._condition = threading.Condition()
+
+    @property
+    def address(self) -> Address:
+        """Bound address (with the assigned port for TCP port 0)."""
+        return self._listener.address
+
+    def close(self) -> None:
+        self._listener.close()
+
+    def __enter__(self) -> "Coordinator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(
+        self,
+        power_system_model: PowerSystemModel,
+        scenarios: ScenarioSet,
+        timeout: float | None = None,
+    ) -> ScenarioDispatch:
+        """
+        Solve DC OPF of every scenario on connected workers.
+
+        Workers are stopped once all scenarios are solved; raises
+        `TimeoutError` if that does not happen within `timeout` seconds.
+        """
+        structure = power_system_model.parameters
+        self._template = ModelTemplate.compile(structure)
+        network, _ = self._template.instantiate(structure)
+        self._demand = scenarios.demand_matrix(network)
+        self._availability = scenarios.availability_matrix(network)
+        n = len(self._demand)
+        self._chunks = [
+            _Chunk(slice(start, min(start + self.chunk_size, n)))
+            for start in range(0, n, self.chunk_size)
+        ]
+        self._queue = list(range(len(self._chunks)))
+        self._results: dict[int, tuple[np.ndarray, ...]] = dict()
+        self._durations: list[float] = list()
+        self._error: BaseException | None = None
+        self.stats.chunks = len(self._chunks)
+        self._done = False
+
+        acceptor = threading.Thread(target=self._accept, daemon=True)
+        acceptor.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while len(self._results) < len(self._chunks) and self._error is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._error = TimeoutError("scenarios were not solved in time")
+                    break
+                self._condition.wait(remaining)
+            self._done = True
+            self._condition.notify_all()
+        if self._error is not None:
+            raise self._error
+        return self._dispatch(scenarios)
+
+    def _accept(self) -> None:
+        worker = 0
+        while True:
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError):
+                return
+            with self._condition:
+                if self._done:
+                    connection.close()
+                    return
+                self.stats.workers += 1
+            worker += 1
+            threading.Thread(
+                target=self._serve, args=(connection, worker), daemon=True
+            ).start()
+
+    def _serve(self, connection: Connection, worker: int) -> None:
+        chunk = None
+        try:
+            connection.send(("template", self._template))
+            while True:
+                chunk = self._next_chunk(worker)
+                if chunk is None:
+                    connection.send(("stop",))
+                    return
+                scenarios = self._chunks[chunk].scenarios
+                connection.send(
+                    (
+                        "chunk",
+                        chunk,
+                        self._demand[scenarios],
+                        self._availability[scenarios],
+                    )
+                )
+                _, chunk_id, result = connection.recv()
+                self._complete(chunk_id, worker, result)
+                chunk = None
+        except (OSError, EOFError):
+            if chunk is not None:
+                self._retry(chunk, worker)
+        finally:
+            connection.close()
+
+    def _next_chunk(self, worker: int) -> int | None:
+        with self._condition:
+            while not self._done:
+                if self._queue:
+                    chunk = self._queue.pop(0)
+                    self._chunks[chunk].running[worker] = time.monotonic()
+                    return chunk
+                straggler = self._straggler()
+                if straggler is not None:
+                    self.stats.reassigned += 1
+                    self._chunks[straggler].running[worker] = time.monotonic()
+                    return straggler
+                self._condition.wait(POLL_INTERVAL)
+            return None
+
+    def _straggler(self) -> int | None:
+        """Running chunk (not yet duplicated) exceeding the straggler time."""
+        if not self._durations:
+            return None
+        limit = self.straggler_factor * statistics.median(self._durations)
+        now = time.monotonic()
+        for chunk_id, chunk in enumerate(self._chunks):
+            if (
+                chunk_id not in self._results
+                and len(chunk.running) == 1
+                and now - next(iter(chunk.running.values())) > limit
+            ):
+                return chunk_id
+        return None
+
+    def _complete(self, chunk_id: int, worker: int, result: tuple) -> None:
+        with self._condition:
+            chunk = self._chunks[chunk_id]
+            started = chunk.running.pop(worker, None)
+            if chunk_id not in self._results:
+                self._results[chunk_id] = result
+                if started is not None:
+                    self._durations.append(time.monotonic() - started)
+            self._condition.notify_all()
+
+    def _retry(self, chunk_id: int, worker: int) -> None:
+        with self._condition:
+            chunk = self._chunks[chunk_id]
+            chunk.running.pop(worker, None)
+            if chunk_id in self._results or chunk.running:
+                return
+            chunk.attempts += 1
+            self.stats.retries += 1
+            if chunk.attempts > self.max_retries:
+                self._error = RuntimeError(
+                    f"scenarios chunk {chunk_id} failed {chunk.attempts} times"
+                )
+            else:
+                self._queue.append(chunk_id)
+            self._condition.notify_all()
+
+    def _dispatch(self, scenarios: ScenarioSet) -> ScenarioDispatch:
+        network = self._template.network
+        generation, flow, theta, feasible = (
+            np.concatenate([self._results[i][k] for i in range(len(self._chunks))])
+            for k in range(4)
+        )
+        index = scenarios.scenario_ids
+        return ScenarioDispatch(
+            power_generation=pd.DataFrame(
+                generation, index=index, columns=network.generator_ids
+            ),
+            power_flow=pd.DataFrame(flow, index=index, columns=network.branch_ids),
+            theta=pd.DataFrame(theta, index=index, columns=network.node_ids),
+            feasible=pd.Series(feasible, index=index, name="Feasible"),
+        )
+
+
+def run_worker(address: Address, authkey: bytes) -> None:
+    """
+    Connect to the coordinator and solve scenario chunks until stopped (or
+    until the coordinator closes the connection).
+    """
+    with Client(address, authkey=authkey) as connection:
+        try:
+            _, template = connection.recv()
+            while True:
+                message = connection.recv()
+                if message[0] == "stop":
+                    return
+                _, chunk_id, demand, availability = message
+                result = solve_chunk(template, demand, availability)
+                connection.send(("result", chunk_id, result))
+        except (EOFError, ConnectionError):
+            return
+
+
+def solve_chunk(
+    template: ModelTemplate, demand: np.ndarray, availability: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    DC OPF of (k x nodes) demand and (k x generators) availability scenarios.
+
+    Scenarios are solved one by one, each warm started from the basis of the
+    previous one; returns generation, flows, angles (NaN if infeasible) and the
+    feasibility mask.
+    """
+    lp, network = template.lp, template.network
+    balance, generators = lp.rows["BalancingEquation"], lp.columns["Gen"]
+    decomposition = lp.rows["PowerGenerationCostDecomposition"]
+    k = len(demand)
+    p_max = availability * network.p_max
+    p_min = np.minimum(np.broadcast_to(network.p_min, p_max.shape), p_max)
+    generation = np.full((k, network.n_generators), np.nan)
+    flow = np.full((k, network.n_branches), np.nan)
+    theta = np.full((k, network.n_nodes), np.nan)
+    feasible = np.zeros(k, dtype=bool)
+    basis = None
+    for i in range(k):
+        scenario = replace(
+            lp,
+            row_lb=np.array(lp.row_lb),
+            row_ub=np.array(lp.row_ub),
+            col_lb=np.array(lp.col_lb),
+            col_ub=np.array(lp.col_ub),
+        )
+        scenario.row_lb[balance] = scenario.row_ub[balance] = demand[i]
+        scenario.row_lb[decomposition] = scenario.row_ub[decomposition] = p_min[i]
+        scenario.col_lb[generators], scenario.col_ub[generators] = p_min[i], p_max[i]
+        try:
+            solution = solve_lp(scenario, basis=basis)
+        except InfeasibleModelError:
+            continue
+        basis = solution.basis
+        generation[i] = solution.x[generators]
+        flow[i] = solution.x[lp.columns["Flow"]]
+        theta[i] = solution.x[lp.columns["Theta"]]
+        feasible[i] = True
+    return generation, flow, theta, feasible
+
+
+def start_local_workers(
+    address: Address,
+    authkey: bytes,
+    n_workers: int,
+    target: Callable[[Address, bytes], None] = run_worker,
+) -> list[BaseProcess]:
+    """Start worker processes on this machine (e.g. for tests)."""
+    # forking a process with polars threads running may deadlock
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=target, args=(address, authkey), daemon=True)
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
@@ -11,24 +11,40 @@ def constraints(model) -> None:
 
 def power_flow_equation(model, l):
     """Power flow equation."""
-    i, j = model.node_fr[l], model.node_to[l]
-    return model.Flow[l] == model.B[l] * (model.Theta[i] - model.Theta[j])
+    network = model.network
+    i, j = int(network.branch_from[l]), int(network.branch_to[l])
+    return branch_flow(model, l) == model.susceptance[l] * (
+        model.Theta[i] - model.Theta[j] - model.phase_shift[l]
+    )
 
 
 def balancing_equation(model, n):
     """Node balancing equation."""
-    power_generation = sum(model.Gen[g] for g in model.gen_at_node[n])
+    network = model.network
+    power_generation = sum(model.Gen[int(g)] for g in network.node_generators(n))
     demand = model.demand[n]
-    in_power_flow = sum(model.Flow[l] for l in model.lines_in[n])
-    out_power_flow = sum(model.Flow[l] for l in model.lines_out[n])
-    return power_generation - demand == in_power_flow - out_power_flow
+    if model.penalties is not None:
+        demand = demand - model.Shed[n] + model.Spill[n]
+    in_power_flow = sum(branch_flow(model, int(l)) for l in network.branches_in(n))
+    out_power_flow = sum(branch_flow(model, int(l)) for l in network.branches_out(n))
+    return power_generation - demand == out_power_flow - in_power_flow
+
+
+def branch_flow(model, l):
+    """Branch power flow (including overload in the soft DC OPF)."""
+    if model.penalties is None:
+        return model.Flow[l]
+    return model.Flow[l] + model.OverloadUp[l] - model.OverloadDown[l]
 
 
 def power_generation_cost_decomposition(model, g):
     """Power generation decomposition into merit order segments."""
-    return model.Gen[g] == sum(model.GenS[g, s] for (g, s) in model.G_GxS[g])
+    segments = model.network.generator_segments(g)
+    return model.Gen[g] == model.pmin[g] + sum(model.GenS[s] for s in segments)
 
 
 def slack_node_equation(model):
     """Setting slack node voltage angle to 0."""
-    return model.Theta[model.slack_node] == 0
+    if len(model.N) == 0:
+        return Constraint.Skip
+    return model.Theta[model.network.slack] == 0
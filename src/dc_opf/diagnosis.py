@@ -0,0 +1,323 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from src.dc_opf.lp import dc_opf_lp, highs_lp
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.sensitivity import islands
+from src.model.power_system_model import PowerSystemModel
+
+TOLERANCE = 1e-9
+
+_COLUMN_BOUNDS = {
+    "Gen": ("generators", {"lower": "P_min", "upper": "P_max"}),
+    "GenS": ("generators", {"lower": "segment", "upper": "segment"}),
+    "Flow": ("branches", {"lower": "F_min", "upper": "F_max"}),
+    "Theta": ("nodes", {"lower": "slack angle", "upper": "slack angle"}),
+}
+_ROWS = {
+    "PowerFlowEquation": ("branches", "power flow equation"),
+    "BalancingEquation": ("nodes", "power balance"),
+    "PowerGenerationCostDecomposition": ("generators", "merit order decomposition"),
+}
+
+
+@dataclass
+class Infeasibility:
+    """Part of the power system responsible for DC OPF infeasibility."""
+
+    kind: str
+    """Detection method: 'island balance', 'node cut', 'bridge cut' or 'IIS'."""
+    message: str
+    """Human readable description."""
+    nodes: dict[Any, str] = field(default_factory=dict)
+    """Involved nodes (node_id -> reason)."""
+    generators: dict[Any, str] = field(default_factory=dict)
+    """Involved generators (generator_id -> reason)."""
+    branches: dict[Any, str] = field(default_factory=dict)
+    """Involved lines and transformers (line_id / trafo_id -> reason)."""
+
+
+def diagnose(power_system_model: PowerSystemModel) -> list[Infeasibility]:
+    """
+    Explain why DC OPF on given model is infeasible.
+
+    The cheap feasibility screen runs first; only if it does not find any
+    violation, an irreducible infeasible subsystem is extracted from the
+    solver. An empty list means the DC OPF is feasible.
+    """
+    network = compile_network(power_system_model.parameters)
+    infeasibilities = feasibility_screen(network)
+    if infeasibilities:
+        return infeasibilities
+    iis = irreducible_infeasible_subsystem(network)
+    return [] if iis is None else [iis]
+
+
+def feasibility_screen(network: CompiledNetwork) -> list[Infeasibility]:
+    """
+    Vectorized necessary feasibility conditions.
+
+    * island balance: total P_min <= total demand <= total P_max in each island,
+    * node cut: net import of each node must fit into its branches flow limits,
+    * bridge cut: surplus of the network part behind a bridge branch must fit
+      into the bridge flow limits.
+    """
+    labels = islands(network)
+    result = _island_balance(network, labels)
+    violated_islands = np.unique(labels[_nodes_of(result, network)])
+    ok_nodes = ~np.isin(labels, violated_islands)
+    result += _node_cuts(network, ok_nodes)
+    result += _bridge_cuts(network, ok_nodes)
+    return result
+
+
+def irreducible_infeasible_subsystem(network: CompiledNetwork) -> Infeasibility | None:
+    """IIS of the DC OPF linear program, mapped to named network elements."""
+    import highspy
+
+    lp = dc_opf_lp(network)
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    strategy = highspy.IisStrategy
+    highs.setOptionValue(
+        "iis_strategy",
+        int(strategy.kIisStrategyFromLp) | int(strategy.kIisStrategyIrreducible),
+    )
+    highs.passModel(highs_lp(lp))
+    highs.run()
+    if highs.getModelStatus() != highspy.HighsModelStatus.kInfeasible:
+        return None
+    _, iis = highs.getIis()
+    status = highspy.IisBoundStatus
+    bound_sides = {
+        int(status.kIisBoundStatusLower): ("lower",),
+        int(status.kIisBoundStatusUpper): ("upper",),
+        int(status.kIisBoundStatusBoxed): ("lower", "upper"),
+    }
+
+    ids = {
+        "nodes": network.node_ids,
+        "generators": network.generator_ids,
+        "branches": network.branch_ids,
+    }
+    segment_owner = {"GenS": network.seg_gen}
+    result = Infeasibility(kind="IIS", message="irreducible infeasible subsystem")
+    for col, bound in zip(iis.col_index_, iis.col_bound_):
+        if int(bound) not in bound_sides:
+            continue
+        block, position = _locate(lp.columns, col)
+        component, names = _COLUMN_BOUNDS[block]
+        if block in segment_owner:
+            position = segment_owner[block][position]
+        reasons = getattr(result, component)
+        reason = "/".join(names[side] for side in bound_sides[int(bound)])
+        reasons[ids[component][position]] = reason
+    for row in iis.row_index_:
+        block, position = _locate(lp.rows, row)
+        component, reason = _ROWS[block]
+        getattr(result, component).setdefault(ids[component][position], reason)
+    return result
+
+
+def _island_balance(
+    network: CompiledNetwork, labels: np.ndarray
+) -> list[Infeasibility]:
+    n_islands = labels.max(initial=-1) + 1
+    demand = np.bincount(labels, weights=network.demand, minlength=n_islands)
+    gen_island = labels[network.gen_node]
+    p_min = np.bincount(gen_island, weights=network.p_min, minlength=n_islands)
+    p_max = np.bincount(gen_island, weights=network.p_max, minlength=n_islands)
+    violated = (demand < p_min - TOLERANCE) | (demand > p_max + TOLERANCE)
+
+    result = list()
+    for island in np.flatnonzero(violated):
+        nodes = np.flatnonzero(labels == island)
+        generators = np.flatnonzero(gen_island == island)
+        result.append(
+            Infeasibility(
+                kind="island balance",
+                message=(
+                    f"island demand {demand[island]:g} is not within "
+                    f"[{p_min[island]:g}, {p_max[island]:g}] generation range"
+                ),
+                nodes=dict.fromkeys(network.node_ids[nodes], "island demand"),
+                generators=dict.fromkeys(
+                    network.generator_ids[generators], "island generation"
+                ),
+            )
+        )
+    return result
+
+
+def _node_cuts(network: CompiledNetwork, ok_nodes: np.ndarray) -> list[Infeasibility]:
+    n = network.n_nodes
+    p_min = np.bincount(network.gen_node, weights=network.p_min, minlength=n)
+    p_max = np.bincount(network.gen_node, weights=network.p_max, minlength=n)
+    # import of a node through branch from -> to: F at `to`, -F at `from`
+    import_min = np.bincount(
+        network.branch_to, weights=network.f_min, minlength=n
+    ) - np.bincount(network.branch_from, weights=network.f_max, minlength=n)
+    import_max = np.bincount(
+        network.branch_to, weights=network.f_max, minlength=n
+    ) - np.bincount(network.branch_from, weights=network.f_min, minlength=n)
+    required_min, required_max = network.demand - p_max, network.demand - p_min
+    violated = ok_nodes & (
+        (required_min > import_max + TOLERANCE)
+        | (required_max < import_min - TOLERANCE)
+    )
+
+    result = list()
+    for node in np.flatnonzero(violated):
+        branches = np.concatenate(
+            [network.branches_in(node), network.branches_out(node)]
+        )
+        result.append(
+            Infeasibility(
+                kind="node cut",
+                message=(
+                    f"required import [{required_min[node]:g}, {required_max[node]:g}] "
+                    f"is not within [{import_min[node]:g}, {import_max[node]:g}] "
+                    "branches capacity"
+                ),
+                nodes={network.node_ids[node]: "power balance"},
+                generators=dict.fromkeys(
+                    network.generator_ids[network.node_generators(node)], "P_min/P_max"
+                ),
+                branches=dict.fromkeys(network.branch_ids[branches], "F_min/F_max"),
+            )
+        )
+    return result
+
+
+def _bridge_cuts(network: CompiledNetwork, ok_nodes: np.ndarray) -> list[Infeasibility]:
+    n = network.n_nodes
+    surplus_min = (
+        np.bincount(network.gen_node, weights=network.p_min, minlength=n)
+        - network.demand
+    )
+    surplus_max = (
+        np.bincount(network.gen_node, weights=network.p_max, minlength=n)
+        - network.demand
+    )
+    bridges, child, preorder, entry, size, surplus_min, surplus_max = _bridges(
+        network, surplus_min, surplus_max
+    )
+    if bridges.size == 0:
+        return []
+
+    # export from the child side through the bridge
+    leaves_from_child = network.branch_from[bridges] == child
+    export_min = np.where(
+        leaves_from_child, network.f_min[bridges], -network.f_max[bridges]
+    )
+    export_max = np.where(
+        leaves_from_child, network.f_max[bridges], -network.f_min[bridges]
+    )
+    side_min, side_max = surplus_min[child], surplus_max[child]
+    violated = ok_nodes[child] & (
+        (side_min > export_max + TOLERANCE) | (side_max < export_min - TOLERANCE)
+    )
+
+    result = list()
+    for bridge, node in zip(bridges[violated], child[violated]):
+        side = preorder[entry[node] : entry[node] + size[node]]
+        result.append(
+            Infeasibility(
+                kind="bridge cut",
+                message=(
+                    f"surplus [{surplus_min[node]:g}, {surplus_max[node]:g}] of "
+                    f"{side.size} node(s) behind the bridge cannot be exchanged "
+                    "within the bridge flow limits"
+                ),
+                nodes=dict.fromkeys(network.node_ids[side], "cut side"),
+                generators=dict.fromkeys(
+                    network.generator_ids[np.isin(network.gen_node, side)],
+                    "P_min/P_max",
+                ),
+                branches={network.branch_ids[bridge]: "F_min/F_max"},
+            )
+        )
+    return result
+
+
+def _bridges(
+    network: CompiledNetwork, surplus_min: np.ndarray, surplus_max: np.ndarray
+) -> tuple[np.ndarray, ...]:
+    """
+    Bridge branches found by (iterative) Tarjan DFS.
+
+    Returns bridges, their child (DFS subtree) endpoints, DFS preorder, nodes
+    entry times and subtree sizes (subtree of `v` is
+    `preorder[entry[v] : entry[v] + size[v]]`) and surplus ranges summed over
+    DFS subtrees.
+    """
+    n, n_branches = network.n_nodes, network.n_branches
+    ends = np.concatenate([network.branch_to, network.branch_from])
+    starts = np.concatenate([network.branch_from, network.branch_to])
+    order = np.argsort(starts, kind="stable")
+    neighbours = ends[order].tolist()
+    edges = (order % max(n_branches, 1)).tolist()
+    ptr = np.concatenate([[0], np.cumsum(np.bincount(starts, minlength=n))]).tolist()
+
+    entry, low, size = [-1] * n, [0] * n, [1] * n
+    parent_edge = [-1] * n
+    sub_min, sub_max = surplus_min.tolist(), surplus_max.tolist()
+    preorder, bridges, children = list(), list(), list()
+    for root in range(n):
+        if entry[root] >= 0:
+            continue
+        entry[root] = low[root] = len(preorder)
+        preorder.append(root)
+        stack = [[root, ptr[root]]]
+        while stack:
+            frame = stack[-1]
+            v, i = frame
+            if i < ptr[v + 1]:
+                frame[1] += 1
+                w, e = neighbours[i], edges[i]
+                if e == parent_edge[v]:
+                    continue
+                if entry[w] < 0:
+                    parent_edge[w] = e
+                    entry[w] = low[w] = len(preorder)
+                    preorder.append(w)
+                    stack.append([w, ptr[w]])
+                else:
+                    low[v] = min(low[v], entry[w])
+                continue
+            stack.pop()
+            if stack:
+                p = stack[-1][0]
+                low[p] = min(low[p], low[v])
+                size[p] += size[v]
+                sub_min[p] += sub_min[v]
+                sub_max[p] += sub_max[v]
+                if low[v] > entry[p]:
+                    bridges.append(parent_edge[v])
+                    children.append(v)
+
+    return (
+        np.asarray(bridges, dtype=np.int64),
+        np.asarray(children, dtype=np.int64),
+        np.asarray(preorder, dtype=np.int64),
+        np.asarray(entry, dtype=np.int64),
+        np.asarray(size, dtype=np.int64),
+        np.asarray(sub_min),
+        np.asarray(sub_max),
+    )
+
+
+def _nodes_of(
+    infeasibilities: list[Infeasibility], network: CompiledNetwork
+) -> np.ndarray:
+    node_ids = [node for item in infeasibilities for node in item.nodes]
+    return network.node_ids.get_indexer(node_ids)
+
+
+def _locate(blocks: dict[str, slice], position: int) -> tuple[str, int]:
+    for name, block in blocks.items():
+        if block.start <= position < block.stop:
+            return name, position - block.start
+    raise IndexError(f"position {position} is out of given blocks")
@@ -0,0 +1,431 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Self
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+
+from src.dc_opf.lp import dc_opf_lp, highs_lp
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import InfeasibleModelError, SlackPenalties
+from src.model.power_system_model import PowerSystemModel, SystemStructure
+from src.model.time_series import TimeSeriesData
+
+if TYPE_CHECKING:
+    import highspy
+
+DEFAULT_GAP = 1e-4
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_CHUNK_SIZE = 64
+"""Snapshots solved by a worker in one task."""
+
+
+@dataclass
+class ExpansionCandidates:
+    """Candidate transmission lines of the expansion planning."""
+
+    lines: pd.DataFrame
+    """
+    Candidate lines (indexed by line_id) with transmission lines columns
+    (`node_from`, `node_to`, `reactance`, `F_max`, optional `F_min`) and
+    `investment_cost` of building the line.
+    """
+
+    def __post_init__(self) -> None:
+        if "investment_cost" not in self.lines.columns:
+            raise ValueError("candidate lines must have investment_cost column")
+        costs = self.investment_cost
+        if (costs < 0).any() or not np.isfinite(costs).all():
+            raise ValueError("investment_cost must be finite and >= 0")
+
+    @property
+    def investment_cost(self) -> np.ndarray:
+        return self.lines["investment_cost"].to_numpy(dtype=np.float64)
+
+
+@dataclass
+class ExpansionResult:
+    """Transmission expansion plan."""
+
+    built: pd.Series
+    """Indicates if the candidate line is built."""
+    investment_cost: float
+    """Investment cost of built lines."""
+    operating_cost: float
+    """Weighted operating (generation and penalized slacks) cost of all snapshots."""
+    lower_bound: float
+    """Lower bound of the total (investment and operating) cost."""
+    iterations: int
+    """Number of Benders iterations."""
+
+    @property
+    def total_cost(self) -> float:
+        return self.investment_cost + self.operating_cost
+
+    @property
+    def gap(self) -> float:
+        """Relative gap between the plan cost and the lower bound."""
+        return (self.total_cost - self.lower_bound) / max(1.0, abs(self.total_cost))
+
+
+class ExpansionProgram:
+    """
+    Snapshot DC OPF of the network with candidate lines, with builds as parameters.
+
+    Candidate lines are ordinary branches of the network whose limits depend
+    on the build decision `y` (0 or 1):
+
+    * F_min y <= Flow <= F_max y,
+    * -M (1 - y) <= Flow - b A Theta <= M (1 - y) (the relaxed flow equation),
+
+    where the big-M bounds the angle difference between candidate ends
+    over existing branches (see `angle_big_m`). Load shedding and generation
+    spill of the soft DC OPF make every snapshot feasible (overloads are
+    disabled, so that big-M stays valid). Builds enter the snapshot program
+    only through bounds, so its optimal cost is convex in `y` and duals give
+    its subgradient (a Benders cut).
+    """
+
+    def __init__(
+        self,
+        network: CompiledNetwork,
+        candidates: np.ndarray,
+        penalties: SlackPenalties | None = None,
+    ) -> None:
+        self.network = network
+        self.candidates = np.asarray(candidates, dtype=np.int64)
+        self.lp = dc_opf_lp(
+            network, SlackPenalties() if penalties is None else penalties
+        )
+        for block in ("OverloadUp", "OverloadDown"):
+            self.lp.col_ub[self.lp.columns[block]] = 0.0
+        self.big_m = angle_big_m(network, self.candidates)
+        self.flow_rows = self.lp.rows["PowerFlowEquation"].start + self.candidates
+        self.flow_columns = self.lp.columns["Flow"].start + self.candidates
+        self.f_min = network.f_min[self.candidates]
+        self.f_max = network.f_max[self.candidates]
+
+    @classmethod
+    def from_structure(
+        cls,
+        structure: SystemStructure,
+        candidates: ExpansionCandidates,
+        penalties: SlackPenalties | None = None,
+    ) -> Self:
+        """Program of the structure network with candidate lines appended to lines."""
+        lines = candidates.lines.drop(columns="investment_cost")
+        extended = SystemStructure(
+            tramsmission_lines=pd.concat([structure.tramsmission_lines, lines]),
+            transformers=structure.transformers,
+            generators=structure.generators,
+            nodes=structure.nodes,
+            marginal_costs=structure.marginal_costs,
+        )
+        n_lines = len(structure.tramsmission_lines)
+        return cls(
+            compile_network(extended),
+            n_lines + np.arange(len(candidates.lines)),
+            penalties,
+        )
+
+    def build_bounds(
+        self, built: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Candidate flow rows bounds and flow columns bounds of given builds."""
+        relaxed = self.big_m * (1.0 - built)
+        return -relaxed, relaxed, self.f_min * built, self.f_max * built
+
+    def snapshot_bounds(
+        self, demand: np.ndarray, availability: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Balancing and cost decomposition rows right hand side, and generation,
+        load shedding and generation spill columns bounds of a snapshot.
+        """
+        network = self.network
+        p_max = availability * network.p_max
+        p_min = np.minimum(network.p_min, p_max)
+        shed_max, spill_max = network.slack_limits(demand, p_max)
+        col_lb = np.concatenate([p_min, np.zeros(2 * network.n_nodes)])
+        col_ub = np.concatenate([p_max, shed_max, spill_max])
+        return np.concatenate([demand, p_min]), col_lb, col_ub
+
+    def cut(self, row_dual: np.ndarray, col_dual: np.ndarray) -> np.ndarray:
+        """
+        Subgradient of the snapshot cost with respect to builds.
+
+        The active bound of a candidate row / column is told by the dual
+        sign (negative duals for upper bounds).
+        """
+        flow_dual = col_dual[self.flow_columns]
+        return np.abs(row_dual[self.flow_rows]) * self.big_m + flow_dual * np.where(
+            flow_dual < 0.0, self.f_max, self.f_min
+        )
+
+
+def expansion_planning(
+    power_system_model: PowerSystemModel,
+    time_series: TimeSeriesData,
+    candidates: ExpansionCandidates,
+    weights: np.ndarray | None = None,
+    penalties: SlackPenalties | None = None,
+    gap: float = DEFAULT_GAP,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    max_workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ExpansionResult:
+    """
+    Choose candidate lines minimizing investment and weighted operating cost
+    of time series snapshots (`weights` default to one per snapshot).
+
+    Solved with Benders decomposition: the master MILP picks builds and
+    estimates the operating cost from cuts, snapshot DC OPFs of the picked
+    builds give the next cut. Snapshots are solved in chunks in parallel
+    processes, each worker keeps one persistent HiGHS model warm started
+    from the previously solved snapshot, so only one snapshot program per
+    worker is held in memory. Stops when the relative gap between the best
+    plan and the master bound is within `gap`.
+    """
+    program = ExpansionProgram.from_structure(
+        power_system_model.parameters, candidates, penalties
+    )
+    demand, availability = _snapshots(time_series, program.network)
+    n_steps = len(demand)
+    weights = np.ones(n_steps) if weights is None else np.asarray(weights, np.float64)
+    chunks = [
+        range(start, min(start + chunk_size, n_steps))
+        for start in range(0, n_steps, chunk_size)
+    ]
+
+    investment = candidates.investment_cost
+    master = _Master(investment)
+    built = best = np.zeros(len(investment))
+    upper, operating, lower = np.inf, np.inf, -np.inf
+    # forking a process with polars threads running may deadlock
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(program, demand, availability, weights),
+    ) as executor:
+        for iteration in range(1, max_iterations + 1):
+            cost, gradient = 0.0, np.zeros(len(investment))
+            for chunk_cost, chunk_gradient in executor.map(
+                _solve_chunk, [built] * len(chunks), chunks
+            ):
+                cost += chunk_cost
+                gradient += chunk_gradient
+            if investment @ built + cost < upper:
+                upper, operating, best = investment @ built + cost, cost, built
+            master.add_cut(cost, gradient, built)
+            built, lower = master.solve(best)
+            if upper - lower <= gap * max(1.0, abs(upper)):
+                break
+
+    return ExpansionResult(
+        built=pd.Series(best > 0.5, index=candidates.lines.index, name="built"),
+        investment_cost=float(investment @ best),
+        operating_cost=float(operating),
+        lower_bound=float(lower),
+        iterations=iteration,
+    )
+
+
+def angle_big_m(network: CompiledNetwork, candidates: np.ndarray) -> np.ndarray:
+    """
+    Big-M of candidate lines flow equations: `b` times the largest angle
+    difference of candidate ends, bounded by the shortest path over other
+    branches weighted with their largest angle difference `|F| / b + |shift|`.
+    """
+    existing = np.setdiff1d(np.arange(network.n_branches), candidates)
+    limit = np.maximum(np.abs(network.f_min), np.abs(network.f_max))[existing]
+    weight = limit / np.abs(network.susceptance[existing]) + np.abs(
+        network.phase_shift[existing]
+    )
+    ends = np.sort(
+        np.stack([network.branch_from[existing], network.branch_to[existing]]), axis=0
+    )
+    # the tightest of parallel branches bounds the angle difference
+    edges = pd.Series(weight).groupby([ends[0], ends[1]]).min()
+    graph = sp.csr_matrix(
+        (
+            edges.to_numpy(),
+            (
+                edges.index.get_level_values(0).to_numpy(),
+                edges.index.get_level_values(1).to_numpy(),
+            ),
+        ),
+        shape=(network.n_nodes, network.n_nodes),
+    )
+    sources, rows = np.unique(network.branch_from[candidates], return_inverse=True)
+    distance = dijkstra(graph, directed=False, indices=sources)
+    distance = distance[rows, network.branch_to[candidates]]
+    if not np.isfinite(distance).all():
+        raise ValueError(
+            "candidate lines connecting separate islands of existing branches: "
+            f"{network.branch_ids[candidates[~np.isfinite(distance)]].tolist()}"
+        )
+    return np.abs(network.susceptance[candidates]) * distance
+
+
+class _Master:
+    """Benders master MILP over builds `y` and the operating cost estimate."""
+
+    def __init__(self, investment: np.ndarray) -> None:
+        import highspy
+
+        n = len(investment)
+        self.n_candidates = n
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.highs.setOptionValue("mip_rel_gap", 0.0)
+        self.highs.addVars(
+            n + 1, np.append(np.zeros(n), -np.inf), np.append(np.ones(n), np.inf)
+        )
+        columns = np.arange(n + 1, dtype=np.int32)
+        self.highs.changeColsCost(n + 1, columns, np.append(investment, 1.0))
+        self.highs.changeColsIntegrality(
+            n,
+            columns[:n],
+            np.full(n, highspy.HighsVarType.kInteger.value, dtype=np.uint8),
+        )
+
+    def add_cut(self, cost: float, gradient: np.ndarray, built: np.ndarray) -> None:
+        """Operating cost >= cost + gradient' (y - built)."""
+        n = self.n_candidates
+        self.highs.addRow(
+            cost - gradient @ built,
+            np.inf,
+            n + 1,
+            np.arange(n + 1, dtype=np.int32),
+            np.append(-gradient, 1.0),
+        )
+
+    def solve(self, incumbent: np.ndarray) -> tuple[np.ndarray, float]:
+        """Next builds and the lower bound of the total cost."""
+        import highspy
+
+        n = self.n_candidates
+        self.highs.setSolution(n, np.arange(n, dtype=np.int32), incumbent)
+        self.highs.run()
+        status = self.highs.getModelStatus()
+        if status != highspy.HighsModelStatus.kOptimal:
+            raise InfeasibleModelError(
+                f"expansion planning master crashed, solver terminated with: "
+                f"{self.highs.modelStatusToString(status)}"
+            )
+        x = np.asarray(self.highs.getSolution().col_value)
+        return np.round(x[:n]), self.highs.getInfo().mip_dual_bound
+
+
+class SnapshotSolver:
+    """
+    Persistent HiGHS model of the snapshot program.
+
+    Snapshots and builds change only rows and columns bounds, so every solve
+    is warm started from the optimal basis of the previous one.
+    """
+
+    def __init__(self, program: ExpansionProgram) -> None:
+        import highspy
+
+        self.program = program
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue("output_flag", False)
+        self.highs.passModel(highs_lp(program.lp))
+        lp = program.lp
+        self.rows = np.concatenate(
+            [
+                np.arange(
+                    lp.rows["BalancingEquation"].start,
+                    lp.rows["PowerGenerationCostDecomposition"].stop,
+                ),
+                program.flow_rows,
+            ]
+        ).astype(np.int32)
+        self.columns = np.concatenate(
+            [
+                np.arange(lp.columns["Gen"].start, lp.columns["Gen"].stop),
+                np.arange(lp.columns["Shed"].start, lp.columns["Spill"].stop),
+                program.flow_columns,
+            ]
+        ).astype(np.int32)
+
+    def solve(
+        self, built: np.ndarray, demand: np.ndarray, availability: np.ndarray
+    ) -> tuple[float, np.ndarray]:
+        """Snapshot optimal cost and its subgradient with respect to builds."""
+        import highspy
+
+        rhs, snapshot_lb, snapshot_ub = self.program.snapshot_bounds(
+            demand, availability
+        )
+        row_lb, row_ub, col_lb, col_ub = self.program.build_bounds(built)
+        self.highs.changeRowsBounds(
+            len(self.rows),
+            self.rows,
+            np.concatenate([rhs, row_lb]),
+            np.concatenate([rhs, row_ub]),
+        )
+        self.highs.changeColsBounds(
+            len(self.columns),
+            self.columns,
+            np.concatenate([snapshot_lb, col_lb]),
+            np.concatenate([snapshot_ub, col_ub]),
+        )
+        self.highs.run()
+        status = self.highs.getModelStatus()
+        if status != highspy.HighsModelStatus.kOptimal:
+            raise InfeasibleModelError(
+                f"expansion planning snapshot crashed, solver terminated with: "
+                f"{self.highs.modelStatusToString(status)}"
+            )
+        solution = self.highs.getSolution()
+        return self.highs.getInfo().objective_function_value, self.program.cut(
+            np.asarray(solution.row_dual), np.asarray(solution.col_dual)
+        )
+
+
+_worker_solver: SnapshotSolver | None = None
+_worker_snapshots: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+
+def _init_worker(
+    program: ExpansionProgram,
+    demand: np.ndarray,
+    availability: np.ndarray,
+    weights: np.ndarray,
+) -> None:
+    global _worker_solver, _worker_snapshots
+    _worker_solver = SnapshotSolver(program)
+    _worker_snapshots = (demand, availability, weights)
+
+
+def _solve_chunk(built: np.ndarray, steps: range) -> tuple[float, np.ndarray]:
+    """Weighted cost and cut of the snapshots chunk."""
+    demand, availability, weights = _worker_snapshots
+    cost, gradient = 0.0, np.zeros(len(built))
+    for step in steps:
+        snapshot_cost, snapshot_gradient = _worker_solver.solve(
+            built, demand[step], availability[step]
+        )
+        cost += weights[step] * snapshot_cost
+        gradient += weights[step] * snapshot_gradient
+    return cost, gradient
+
+
+def _snapshots(
+    time_series: TimeSeriesData, network: CompiledNetwork
+) -> tuple[np.ndarray, np.ndarray]:
+    """(snapshots x nodes) demand and (snapshots x generators) availability."""
+    demand = time_series.demand_samples().reindex(columns=network.node_ids)
+    demand = demand.to_numpy(dtype=np.float64)
+    availability = time_series.availability_samples()
+    availability = availability.reindex(columns=network.generator_ids).fillna(1.0)
+    return (
+        np.where(np.isnan(demand), network.demand, demand),
+        availability.to_numpy(dtype=np.float64),
+    )
@@ -0,0 +1,402 @@
+import gzip
+import os
+import re
+from typing import IO, Iterator
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.dc_opf.lp import LinearProgram, dc_opf_lp
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import SlackPenalties, write_state
+from src.model.power_system_model import PowerSystemModel
+
+DEFAULT_CHUNK_SIZE = 1 << 18
+"""Approximate number of matrix nonzeros formatted at once."""
+GZIP_LEVEL = 6
+OBJECTIVE = "COST"
+
+_NODE_BLOCKS = ("Theta", "BalancingEquation", "Shed", "Spill")
+_BRANCH_BLOCKS = ("Flow", "PowerFlowEquation", "OverloadUp", "OverloadDown")
+_GENERATOR_BLOCKS = ("Gen", "PowerGenerationCostDecomposition")
+# characters valid in both free MPS and LP format names
+_INVALID_CHARACTERS = re.compile(r"[^\w.,()!#$%&;?@{}|~']")
+
+
+def export_dc_opf(
+    power_system_model: PowerSystemModel,
+    path: str | os.PathLike,
+    penalties: SlackPenalties | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """
+    Write DC OPF (soft, if `penalties` are given) of the power system model
+    to a free MPS (`.mps`) or LP (`.lp`) file, gzip compressed if the path
+    ends with `.gz`.
+
+    Columns and rows are named after model components and identifiers,
+    e.g. `Gen(GEN1)`, `Flow(LINE1)` or `BalancingEquation(N1)` (see
+    `lp_names`), so solutions can be read back with `import_solution`.
+    """
+    network = compile_network(power_system_model.parameters)
+    lp = dc_opf_lp(network, penalties)
+    names = lp_names(network, lp)
+    suffix = str(path).removesuffix(".gz").rsplit(".", 1)[-1].lower()
+    if suffix == "mps":
+        write_mps(lp, path, names, chunk_size)
+    elif suffix == "lp":
+        write_lp(lp, path, names, chunk_size)
+    else:
+        raise ValueError(f"unknown model file format: {path}")
+
+
+def import_solution(
+    power_system_model: PowerSystemModel,
+    path: str | os.PathLike,
+    penalties: SlackPenalties | None = None,
+) -> None:
+    """
+    Write DC OPF solution of an exported model (soft, if it was exported with
+    `penalties`) into the system state.
+
+    The solution file has `name value` lines (as Gurobi or CBC solution
+    files, possibly gzip compressed), other lines are skipped. HiGHS
+    solution files are read up to dual values. Columns missing in the file
+    (solvers writing nonzeros only) are zero.
+    """
+    network = compile_network(power_system_model.parameters)
+    lp = dc_opf_lp(network, penalties)
+    columns, _ = lp_names(network, lp)
+    x = read_solution(path, columns)
+    slacks = ()
+    flow = x[lp.columns["Flow"]]
+    if penalties is not None:
+        overload = x[lp.columns["OverloadUp"]] - x[lp.columns["OverloadDown"]]
+        flow = flow + overload
+        slacks = (x[lp.columns["Shed"]], x[lp.columns["Spill"]], overload)
+    write_state(
+        power_system_model.state,
+        network,
+        x[lp.columns["Gen"]],
+        flow,
+        x[lp.columns["Theta"]],
+        *slacks,
+    )
+
+
+def lp_names(
+    network: CompiledNetwork, lp: LinearProgram
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Column and row names of a DC OPF linear program: `block(identifier)`.
+
+    Merit order segments are identified by their generator and position,
+    `GenS(GEN1,0)`. Blocks of other programs are named by position in the
+    block. Characters not valid in MPS / LP names are replaced with `_`.
+    """
+    segment = np.arange(network.n_segments) - network.gen_seg_ptr[network.seg_gen]
+    labels = {
+        "GenS": _join(network.generator_ids.to_numpy()[network.seg_gen], segment),
+    }
+    for blocks, ids in (
+        (_NODE_BLOCKS, network.node_ids),
+        (_BRANCH_BLOCKS, network.branch_ids),
+        (_GENERATOR_BLOCKS, network.generator_ids),
+    ):
+        labels.update({block: ids.to_numpy() for block in blocks})
+    columns = _block_names(lp.columns, labels, lp.n_cols)
+    rows = _block_names(lp.rows, labels, lp.n_rows)
+    for kind, names in (("column", columns), ("row", rows)):
+        unique, counts = np.unique(names, return_counts=True)
+        if (counts > 1).any():
+            raise ValueError(
+                f"{kind} names are not unique (after replacing invalid "
+                f"characters): {unique[counts > 1][:5].tolist()}"
+            )
+    return columns, rows
+
+
+def write_mps(
+    lp: LinearProgram,
+    path: str | os.PathLike,
+    names: tuple[np.ndarray, np.ndarray] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """
+    Write the linear program to a free MPS file (gzip compressed for `.gz` paths).
+
+    Ranged rows are written with RANGES, rows without bounds as free (N) rows.
+    The matrix is formatted in chunks of about `chunk_size` nonzeros.
+    """
+    columns, rows = _names(lp, names)
+    row_lb, row_ub = lp.row_lb, lp.row_ub
+    equal = row_lb == row_ub
+    lower, upper = np.isfinite(row_lb), np.isfinite(row_ub)
+    sense = np.select([equal, lower, upper], ["E", "G", "L"], default="N").astype(
+        object
+    )
+    rhs = np.where(lower, row_lb, np.where(upper, row_ub, 0.0))
+    ranged = lower & upper & ~equal
+
+    with _open(path) as file:
+        file.write(f"NAME DC_OPF\nROWS\n N  {OBJECTIVE}\n")
+        _write_lines(file, " " + sense + "  " + rows)
+        file.write("COLUMNS\n")
+        for chunk in _mps_columns(lp, columns, rows, chunk_size):
+            file.write(chunk)
+        file.write("RHS\n")
+        nonzero = np.flatnonzero(rhs != 0.0)
+        _write_lines(file, " RHS " + rows[nonzero] + " " + _numbers(rhs[nonzero]))
+        if ranged.any():
+            file.write("RANGES\n")
+            _write_lines(
+                file,
+                " RNG "
+                + rows[ranged]
+                + " "
+                + _numbers(row_ub[ranged] - row_lb[ranged]),
+            )
+        file.write("BOUNDS\n")
+        _write_lines(file, _mps_bounds(lp.col_lb, lp.col_ub, columns))
+        file.write("ENDATA\n")
+
+
+def write_lp(
+    lp: LinearProgram,
+    path: str | os.PathLike,
+    names: tuple[np.ndarray, np.ndarray] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """
+    Write the linear program to an LP file (gzip compressed for `.gz` paths).
+
+    Ranged rows are split into `<row>_lo` (>=) and `<row>_hi` (<=) rows and
+    rows without bounds are skipped. Every term is written on its own line,
+    so there are no overlong lines. The matrix is formatted in chunks of
+    about `chunk_size` nonzeros.
+    """
+    columns, rows = _names(lp, names)
+    with _open(path) as file:
+        file.write("\\ DC OPF\nMinimize\n obj:\n")
+        nonzero = np.flatnonzero(lp.cost)
+        if len(nonzero) == 0:
+            nonzero = np.zeros(1, dtype=np.int64)
+        _write_lines(file, _terms(lp.cost[nonzero], columns[nonzero]))
+        file.write("Subject To\n")
+
+        matrix = lp.matrix.tocsr()
+        row_lb, row_ub = lp.row_lb, lp.row_ub
+        equal = row_lb == row_ub
+        ranged = np.isfinite(row_lb) & np.isfinite(row_ub) & ~equal
+        for sense, bound, selected, suffix in (
+            ("=", row_lb, equal, ""),
+            (">=", row_lb, np.isfinite(row_lb) & ~equal, "_lo"),
+            ("<=", row_ub, np.isfinite(row_ub) & ~equal, "_hi"),
+        ):
+            row_names = np.where(ranged, rows + suffix, rows)
+            for chunk in _lp_rows(
+                matrix,
+                np.flatnonzero(selected),
+                row_names,
+                columns,
+                f" {sense} " + _numbers(bound),
+                chunk_size,
+            ):
+                file.write(chunk)
+
+        file.write("Bounds\n")
+        _write_lines(file, _lp_bounds(lp.col_lb, lp.col_ub, columns))
+        file.write("End\n")
+
+
+def read_solution(path: str | os.PathLike, columns: np.ndarray) -> np.ndarray:
+    """Columns values of a solution file (see `import_solution`)."""
+    position = {name: i for i, name in enumerate(columns)}
+    x = np.zeros(len(columns))
+    with _open(path, "rt") as file:
+        for line in file:
+            if line.startswith("# Dual"):
+                break
+            tokens = line.split()
+            if len(tokens) == 2 and tokens[0] in position:
+                try:
+                    x[position[tokens[0]]] = float(tokens[1])
+                except ValueError:
+                    continue
+    return x
+
+
+def _mps_columns(
+    lp: LinearProgram, columns: np.ndarray, rows: np.ndarray, chunk_size: int
+) -> Iterator[str]:
+    """COLUMNS section chunks, objective entry first in every column."""
+    matrix = lp.matrix.tocsc()
+    matrix.sort_indices()
+    # objective entries also keep columns without nonzeros in the section
+    with_cost = (lp.cost != 0.0) | (np.diff(matrix.indptr) == 0)
+    for start, stop in _chunks(matrix.indptr, chunk_size):
+        begin, end = matrix.indptr[start], matrix.indptr[stop]
+        counts = np.diff(matrix.indptr[start : stop + 1])
+        lines = (
+            " "
+            + np.repeat(columns[start:stop], counts)
+            + " "
+            + rows[matrix.indices[begin:end]]
+            + " "
+            + _numbers(matrix.data[begin:end])
+        )
+        selected = np.flatnonzero(with_cost[start:stop])
+        cost = (
+            " "
+            + columns[start + selected]
+            + f" {OBJECTIVE} "
+            + _numbers(lp.cost[start + selected])
+        )
+        lines = np.insert(lines, matrix.indptr[start + selected] - begin, cost)
+        yield "\n".join(lines.tolist()) + "\n"
+
+
+def _mps_bounds(
+    col_lb: np.ndarray, col_ub: np.ndarray, columns: np.ndarray
+) -> np.ndarray:
+    """BOUNDS section lines (MPS default bounds are [0, inf))."""
+    fixed = col_lb == col_ub
+    free = np.isneginf(col_lb) & np.isposinf(col_ub)
+    # lower bounds are written also for negative upper bounds, as some
+    # readers make such columns unbounded below
+    lower = ~fixed & np.isfinite(col_lb) & ((col_lb != 0.0) | (col_ub < 0.0))
+    minus = ~free & np.isneginf(col_lb)
+    upper = ~fixed & np.isfinite(col_ub)
+    order, lines = [], []
+    for kind, selected, values in (
+        ("FX", fixed, col_lb),
+        ("FR", free, None),
+        ("LO", lower, col_lb),
+        ("MI", minus, None),
+        ("UP", upper, col_ub),
+    ):
+        positions = np.flatnonzero(selected)
+        line = f" {kind} BND " + columns[positions]
+        if values is not None:
+            line = line + " " + _numbers(values[positions])
+        order.append(positions)
+        lines.append(line)
+    # bounds grouped by column
+    return np.concatenate(lines)[np.argsort(np.concatenate(order), kind="stable")]
+
+
+def _lp_rows(
+    matrix: sp.csr_matrix,
+    selected: np.ndarray,
+    rows: np.ndarray,
+    columns: np.ndarray,
+    footers: np.ndarray,
+    chunk_size: int,
+) -> Iterator[str]:
+    """Subject To section chunks of selected rows (`name:`, terms, footer)."""
+    counts = np.diff(matrix.indptr)[selected]
+    offsets = np.zeros(len(selected) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    for start, stop in _chunks(offsets, chunk_size):
+        chunk, chunk_counts = selected[start:stop], counts[start:stop]
+        term_rows = np.repeat(np.arange(len(chunk)), chunk_counts)
+        entries = (
+            np.arange(offsets[stop] - offsets[start])
+            + matrix.indptr[chunk][term_rows]
+            - (offsets[start:stop] - offsets[start])[term_rows]
+        )
+        terms = _terms(matrix.data[entries], columns[matrix.indices[entries]])
+        # rows without nonzeros get a zero term
+        empty = np.flatnonzero(chunk_counts == 0)
+        terms = np.insert(
+            terms,
+            offsets[start + empty] - offsets[start],
+            _terms(np.zeros(len(empty)), np.repeat(columns[:1], len(empty))),
+        )
+        term_rows = np.insert(term_rows, offsets[start + empty] - offsets[start], empty)
+        lengths = np.maximum(chunk_counts, 1)
+        first = np.zeros(len(chunk), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=first[1:])
+
+        lines = np.empty(len(terms) + 2 * len(chunk), dtype=object)
+        header = first + 2 * np.arange(len(chunk))
+        lines[header] = " " + rows[chunk] + ":"
+        lines[np.arange(len(terms)) + 2 * term_rows + 1] = terms
+        lines[header + lengths + 1] = footers[chunk]
+        yield "\n".join(lines.tolist()) + "\n"
+
+
+def _lp_bounds(
+    col_lb: np.ndarray, col_ub: np.ndarray, columns: np.ndarray
+) -> np.ndarray:
+    """Bounds section lines (LP default bounds are [0, inf))."""
+    lower = np.where(np.isneginf(col_lb), "-inf", _numbers(col_lb))
+    upper = np.where(np.isposinf(col_ub), "+inf", _numbers(col_ub))
+    lines = np.where(
+        col_lb == col_ub,
+        " " + columns + " = " + lower,
+        " " + lower + " <= " + columns + " <= " + upper,
+    )
+    free = np.isneginf(col_lb) & np.isposinf(col_ub)
+    lines[free] = " " + columns[free] + " free"
+    default = (col_lb == 0.0) & np.isposinf(col_ub)
+    return lines[~default]
+
+
+def _terms(values: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """Signed linear terms (` + 2.5 x`)."""
+    signs = np.where(values < 0.0, " - ", " + ")
+    return signs + _numbers(np.abs(values)) + " " + columns
+
+
+def _numbers(values: np.ndarray) -> np.ndarray:
+    """Shortest round-trip representation of floats."""
+    return np.asarray(values, dtype=np.float64).astype(str).astype(object)
+
+
+def _join(ids: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    return ids.astype(str).astype(object) + "," + positions.astype(str).astype(object)
+
+
+def _block_names(blocks: dict[str, slice], labels: dict, n: int) -> np.ndarray:
+    names = np.empty(n, dtype=object)
+    for block, positions in blocks.items():
+        size = positions.stop - positions.start
+        ids = labels.get(block)
+        if ids is None or len(ids) != size:
+            ids = np.arange(size)
+        ids = np.array(
+            [_INVALID_CHARACTERS.sub("_", str(label)) for label in ids], dtype=object
+        )
+        names[positions] = block + "(" + ids + ")"
+    return names
+
+
+def _names(
+    lp: LinearProgram, names: tuple[np.ndarray, np.ndarray] | None
+) -> tuple[np.ndarray, np.ndarray]:
+    if names is None:
+        return (
+            "x" + np.arange(lp.n_cols).astype(str).astype(object),
+            "r" + np.arange(lp.n_rows).astype(str).astype(object),
+        )
+    return tuple(np.asarray(n, dtype=object) for n in names)
+
+
+def _chunks(offsets: np.ndarray, chunk_size: int) -> Iterator[tuple[int, int]]:
+    """(start, stop) groups of consecutive items with about `chunk_size` entries."""
+    n = len(offsets) - 1
+    bounds = np.searchsorted(offsets, np.arange(0, offsets[-1], max(1, chunk_size)))
+    bounds = np.unique(np.concatenate([[0], bounds, [n]]))
+    yield from zip(bounds[:-1].tolist(), bounds[1:].tolist())
+
+
+def _write_lines(file: IO[str], lines: np.ndarray) -> None:
+    if len(lines) > 0:
+        file.write("\n".join(lines.tolist()) + "\n")
+
+
+def _open(path: str | os.PathLike, mode: str = "wt") -> IO[str]:
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=GZIP_LEVEL)
+    return open(path, mode.replace("t", ""))
@@ -0,0 +1,273 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.dc_opf.network import CompiledNetwork
+from src.dc_opf.opt_model import InfeasibleModelError, SlackPenalties
+from src.dc_opf.sensitivity import incidence_matrix
+
+if TYPE_CHECKING:
+    import highspy
+
+
+@dataclass
+class LinearProgram:
+    """
+    Linear program in matrix form.
+
+    min cost'x  s.t.  row_lb <= matrix @ x <= row_ub,  col_lb <= x <= col_ub
+
+    Columns and rows are grouped in contiguous blocks named after the DC OPF
+    model components (e.g. `columns["Flow"]` are branch flow columns in
+    network positions).
+    """
+
+    cost: np.ndarray
+    matrix: sp.csr_matrix
+    row_lb: np.ndarray
+    row_ub: np.ndarray
+    col_lb: np.ndarray
+    col_ub: np.ndarray
+    columns: dict[str, slice]
+    rows: dict[str, slice]
+
+    @property
+    def n_cols(self) -> int:
+        return len(self.cost)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.row_lb)
+
+
+@dataclass
+class LPSolution:
+    """Optimal primal and dual values of a linear program."""
+
+    x: np.ndarray
+    """Columns values."""
+    row_dual: np.ndarray
+    """Rows dual values."""
+    objective: float
+    """Objective function value."""
+    basis: "highspy.HighsBasis | None" = None
+    """Optimal basis (a warm start for similar programs)."""
+
+
+def dc_opf_lp(
+    network: CompiledNetwork, penalties: SlackPenalties | None = None
+) -> LinearProgram:
+    """
+    DC OPF (the same formulation as `dc_opf_model`) as a linear program.
+
+    If `penalties` are given, (Shed, Spill, OverloadUp, OverloadDown) slack
+    columns of the soft DC OPF are appended; no rows are added. Shedding and
+    spill are bounded by nodal consumption and production (see
+    `CompiledNetwork.slack_limits`).
+    """
+    n_gen, n_seg = network.n_generators, network.n_segments
+    n_branch, n_node = network.n_branches, network.n_nodes
+    columns = named_blocks(Gen=n_gen, GenS=n_seg, Flow=n_branch, Theta=n_node)
+    rows = named_blocks(
+        PowerFlowEquation=n_branch,
+        BalancingEquation=n_node,
+        PowerGenerationCostDecomposition=n_gen,
+    )
+
+    incidence = incidence_matrix(network)
+    gen_at_node = generators_incidence(network)
+    segments = segments_incidence(network)
+    matrix = sp.bmat(
+        [
+            [
+                None,
+                None,
+                sp.identity(n_branch),
+                -sp.diags(network.susceptance) @ incidence,
+            ],
+            [gen_at_node, None, -incidence.T, None],
+            [sp.identity(n_gen), -segments, None, None],
+        ],
+        format="csr",
+    )
+
+    shift = -network.susceptance * network.phase_shift
+    rhs = np.concatenate([shift, network.demand, network.p_min])
+    col_lb, col_ub = column_bounds(network)
+    cost = np.concatenate(
+        [np.zeros(n_gen), network.seg_cost, np.zeros(n_branch + n_node)]
+    )
+    lp = LinearProgram(
+        cost=cost,
+        matrix=matrix,
+        row_lb=rhs,
+        row_ub=rhs.copy(),
+        col_lb=col_lb,
+        col_ub=col_ub,
+        columns=columns,
+        rows=rows,
+    )
+    if penalties is not None:
+        _add_slack_columns(lp, network, penalties)
+    return lp
+
+
+def _add_slack_columns(
+    lp: LinearProgram, network: CompiledNetwork, penalties: SlackPenalties
+) -> None:
+    n_branch, n_node = network.n_branches, network.n_nodes
+    incidence = incidence_matrix(network)
+    nodes, branches = sp.identity(n_node), sp.identity(n_branch)
+    no_generators = sp.csr_matrix((network.n_generators, n_branch))
+    # overloads enter flow equations and balances in the same way as Flow
+    slack_matrix = sp.bmat(
+        [
+            [sp.csr_matrix((n_branch, 2 * n_node)), branches, -branches],
+            [sp.hstack([nodes, -nodes]), -incidence.T, incidence.T],
+            [
+                sp.csr_matrix((network.n_generators, 2 * n_node)),
+                no_generators,
+                no_generators,
+            ],
+        ],
+        format="csr",
+    )
+    n_cols = lp.n_cols
+    lp.matrix = sp.hstack([lp.matrix, slack_matrix], format="csr")
+    lp.columns.update(
+        named_blocks(
+            _offset=n_cols,
+            Shed=n_node,
+            Spill=n_node,
+            OverloadUp=n_branch,
+            OverloadDown=n_branch,
+        )
+    )
+    lp.cost = np.concatenate(
+        [
+            lp.cost,
+            np.full(n_node, penalties.load_shedding),
+            np.full(n_node, penalties.generation_spill),
+            np.full(2 * n_branch, penalties.overload),
+        ]
+    )
+    lp.col_lb = np.concatenate([lp.col_lb, np.zeros(2 * (n_node + n_branch))])
+    lp.col_ub = np.concatenate(
+        [lp.col_ub, *network.slack_limits(), np.full(2 * n_branch, np.inf)]
+    )
+
+
+def column_bounds(network: CompiledNetwork) -> tuple[np.ndarray, np.ndarray]:
+    """Bounds of (Gen, GenS, Flow, Theta) columns, with slack node angle fixed to 0."""
+    theta_lb = np.full(network.n_nodes, -np.inf)
+    theta_ub = np.full(network.n_nodes, np.inf)
+    if network.n_nodes > 0:
+        theta_lb[network.slack] = theta_ub[network.slack] = 0.0
+    col_lb = np.concatenate(
+        [network.p_min, np.zeros(network.n_segments), network.f_min, theta_lb]
+    )
+    col_ub = np.concatenate(
+        [
+            network.p_max,
+            network.seg_end - network.seg_start,
+            network.f_max,
+            theta_ub,
+        ]
+    )
+    return col_lb, col_ub
+
+
+def generators_incidence(network: CompiledNetwork) -> sp.csr_matrix:
+    """Sparse `(n_nodes, n_generators)` matrix summing generation per node."""
+    n_gen = network.n_generators
+    return sp.csr_matrix(
+        (np.ones(n_gen), (network.gen_node, np.arange(n_gen))),
+        shape=(network.n_nodes, n_gen),
+    )
+
+
+def segments_incidence(network: CompiledNetwork) -> sp.csr_matrix:
+    """Sparse `(n_generators, n_segments)` matrix summing segments per generator."""
+    n_seg = network.n_segments
+    return sp.csr_matrix(
+        (np.ones(n_seg), (network.seg_gen, np.arange(n_seg))),
+        shape=(network.n_generators, n_seg),
+    )
+
+
+def solve_lp(
+    lp: LinearProgram,
+    hessian_diagonal: np.ndarray | None = None,
+    basis: "highspy.HighsBasis | None" = None,
+) -> LPSolution:
+    """
+    Solve the linear program with HiGHS.
+
+    If `hessian_diagonal` is given, the quadratic term `0.5 * x' diag(h) x`
+    is added to the objective (a convex QP). If `basis` (of a program with the
+    same dimensions) is given, simplex is warm started from it.
+    """
+    import highspy
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    model = highspy.HighsModel()
+    model.lp_ = highs_lp(lp)
+    if hessian_diagonal is not None:
+        nonzero = np.flatnonzero(hessian_diagonal)
+        start = np.zeros(lp.n_cols + 1, dtype=np.int32)
+        np.cumsum(hessian_diagonal != 0, out=start[1:])
+        model.hessian_.dim_ = lp.n_cols
+        model.hessian_.format_ = highspy.HessianFormat.kTriangular
+        model.hessian_.start_ = start
+        model.hessian_.index_ = nonzero.astype(np.int32)
+        model.hessian_.value_ = hessian_diagonal[nonzero].astype(np.float64)
+    highs.passModel(model)
+    if basis is not None:
+        highs.setBasis(basis)
+    highs.run()
+
+    status = highs.getModelStatus()
+    if status != highspy.HighsModelStatus.kOptimal:
+        raise InfeasibleModelError(
+            f"DC OPF computation crashed, solver terminated with: "
+            f"{highs.modelStatusToString(status)}"
+        )
+    solution = highs.getSolution()
+    return LPSolution(
+        x=np.asarray(solution.col_value),
+        row_dual=np.asarray(solution.row_dual),
+        objective=highs.getInfo().objective_function_value,
+        basis=highs.getBasis() if hessian_diagonal is None else None,
+    )
+
+
+def highs_lp(lp: LinearProgram) -> "highspy.HighsLp":
+    """Convert the linear program to a (column-wise) HiGHS LP."""
+    import highspy
+
+    matrix = lp.matrix.tocsc()
+    highs_lp = highspy.HighsLp()
+    highs_lp.num_col_ = lp.n_cols
+    highs_lp.num_row_ = lp.n_rows
+    highs_lp.col_cost_ = lp.cost
+    highs_lp.col_lower_ = lp.col_lb
+    highs_lp.col_upper_ = lp.col_ub
+    highs_lp.row_lower_ = lp.row_lb
+    highs_lp.row_upper_ = lp.row_ub
+    highs_lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    highs_lp.a_matrix_.start_ = matrix.indptr.astype(np.int32)
+    highs_lp.a_matrix_.index_ = matrix.indices.astype(np.int32)
+    highs_lp.a_matrix_.value_ = matrix.data.astype(np.float64)
+    return highs_lp
+
+
+def named_blocks(_offset: int = 0, **sizes: int) -> dict[str, slice]:
+    """Contiguous named blocks of given sizes (starting at `_offset`)."""
+    blocks, start = dict(), _offset
+    for name, size in sizes.items():
+        blocks[name] = slice(start, start + size)
+        start += size
+    return blocks
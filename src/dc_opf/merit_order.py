@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.dc_opf.lp import generators_incidence, segments_incidence
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import DEFAULT_SOLVER, dc_opf, write_state
+from src.dc_opf.power_flow import PowerFlowSolver
+from src.dc_opf.sensitivity import islands
+from src.model.power_system_model import PowerSystemModel
+
+FLOW_TOLERANCE = 1e-7
+
+
+@dataclass
+class MeritOrderDispatch:
+    """Copper plate (merit order) dispatch of one or many demand snapshots."""
+
+    generation: np.ndarray
+    """Generation `(snapshots, n_generators)` in network positions."""
+    flow: np.ndarray
+    """Branch flows `(snapshots, n_branches)` of the dispatch."""
+    theta: np.ndarray
+    """Voltage angles `(snapshots, n_nodes)` of the dispatch."""
+    balanced: np.ndarray
+    """Snapshots for which demand of each island is within its generation range."""
+    congested: np.ndarray
+    """Snapshots for which some branch flow is out of [F_min, F_max]."""
+
+    @property
+    def optimal(self) -> np.ndarray:
+        """Snapshots for which the merit order dispatch solves the DC OPF."""
+        return self.balanced & ~self.congested
+
+
+def merit_order_dispatch(
+    network: CompiledNetwork, demand: np.ndarray | None = None
+) -> MeritOrderDispatch:
+    """
+    Merit order dispatch for `(n_nodes,)` or `(snapshots, n_nodes)` demand.
+
+    In each island generators produce their P_min and the rest of the island
+    demand is covered by the cheapest merit order segments, filled with a
+    cumulative sum over segments sorted by (island, cost). The dispatch is
+    DC OPF optimal unless it overloads a branch (checked on the power flow of
+    the dispatch), since the DC OPF without flow limits is the copper plate.
+    """
+    demand = np.atleast_2d(network.demand if demand is None else demand)
+    labels = islands(network)
+    n_islands = labels.max(initial=-1) + 1
+    seg_island = labels[network.gen_node][network.seg_gen]
+    width = network.seg_end - network.seg_start
+
+    order = np.lexsort((np.arange(network.n_segments), network.seg_cost, seg_island))
+    sorted_width, sorted_island = width[order], seg_island[order]
+    filled_before = np.cumsum(sorted_width) - sorted_width
+    island_first = np.searchsorted(sorted_island, np.arange(n_islands))
+    island_offset = np.append(filled_before, 0.0)[island_first]
+    filled_before -= island_offset[sorted_island]
+
+    island_nodes = sp.csr_matrix(
+        (np.ones(network.n_nodes), (np.arange(network.n_nodes), labels)),
+        shape=(network.n_nodes, n_islands),
+    )
+    island_p_min = np.bincount(
+        labels[network.gen_node], weights=network.p_min, minlength=n_islands
+    )
+    island_capacity = np.bincount(seg_island, weights=width, minlength=n_islands)
+    residual = np.asarray(demand @ island_nodes) - island_p_min
+    balanced = (
+        (residual >= -FLOW_TOLERANCE) & (residual <= island_capacity + FLOW_TOLERANCE)
+    ).all(axis=1)
+
+    fill = np.empty((demand.shape[0], network.n_segments))
+    fill[:, order] = np.clip(
+        residual[:, sorted_island] - filled_before, 0.0, sorted_width
+    )
+    generation = network.p_min + (segments_incidence(network) @ fill.T).T
+
+    injections = (generators_incidence(network) @ generation.T).T - demand
+    theta, flow = PowerFlowSolver(network).solve(injections)
+    congested = (
+        (flow > network.f_max + FLOW_TOLERANCE)
+        | (flow < network.f_min - FLOW_TOLERANCE)
+    ).any(axis=1)
+    return MeritOrderDispatch(
+        generation=generation,
+        flow=flow,
+        theta=theta,
+        balanced=balanced,
+        congested=congested,
+    )
+
+
+def fast_dc_opf(
+    power_system_model: PowerSystemModel, solver: str = DEFAULT_SOLVER
+) -> bool:
+    """
+    DC OPF with the merit order fast path.
+
+    If the merit order dispatch is balanced and uncongested, it is written to
+    the system state without calling the solver; otherwise the DC OPF is
+    solved. Returns True if the solver was skipped.
+    """
+    network = compile_network(power_system_model.parameters)
+    dispatch = merit_order_dispatch(network)
+    if not dispatch.optimal[0]:
+        dc_opf(power_system_model, solver)
+        return False
+    write_state(
+        power_system_model.state,
+        network,
+        dispatch.generation[0],
+        dispatch.flow[0],
+        dispatch.theta[0],
+    )
+    return True
@@ -0,0 +1,264 @@
+import numpy as np
+import pandas as pd
+
+from src.model.power_system_model import SystemStructure
+
+INDEX_DTYPE = np.int32
+OFFSET_DTYPE = np.int64
+
+
+class CompiledNetwork:
+    """
+    Array-backed power system network with contiguous integer indexing.
+
+    Identifiers are mapped to integer positions once, all other attributes are
+    flat NumPy arrays indexed by those positions:
+    * branches are transmission lines followed by transformers, so branches
+      `[0, n_lines)` are lines and `[n_lines, n_branches)` are transformers,
+    * generators attached to node `n` are `node_gen_idx[node_gen_ptr[n]:node_gen_ptr[n + 1]]`
+      (CSR offsets), the same layout is used for branches leaving / entering a node,
+    * merit order segments are sorted by (generator, p_start), so segments of
+      generator `g` are `gen_seg_ptr[g]:gen_seg_ptr[g + 1]`.
+
+    """
+
+    __slots__ = (
+        "node_ids",
+        "line_ids",
+        "trafo_ids",
+        "generator_ids",
+        "demand",
+        "slack",
+        "branch_from",
+        "branch_to",
+        "susceptance",
+        "phase_shift",
+        "f_min",
+        "f_max",
+        "gen_node",
+        "p_min",
+        "p_max",
+        "node_gen_ptr",
+        "node_gen_idx",
+        "node_out_ptr",
+        "node_out_idx",
+        "node_in_ptr",
+        "node_in_idx",
+        "seg_gen",
+        "seg_start",
+        "seg_end",
+        "seg_cost",
+        "gen_seg_ptr",
+    )
+
+    def __init__(self, **arrays) -> None:
+        for name in self.__slots__:
+            setattr(self, name, arrays[name])
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_lines(self) -> int:
+        return len(self.line_ids)
+
+    @property
+    def n_trafos(self) -> int:
+        return len(self.trafo_ids)
+
+    @property
+    def n_branches(self) -> int:
+        return len(self.branch_from)
+
+    @property
+    def n_generators(self) -> int:
+        return len(self.generator_ids)
+
+    @property
+    def n_segments(self) -> int:
+        return len(self.seg_gen)
+
+    @property
+    def branch_ids(self) -> pd.Index:
+        """Identifiers of all branches (lines followed by transformers)."""
+        return self.line_ids.append(self.trafo_ids)
+
+    def node_generators(self, n: int) -> np.ndarray:
+        """Generators attached to node `n`."""
+        return self.node_gen_idx[self.node_gen_ptr[n] : self.node_gen_ptr[n + 1]]
+
+    def branches_out(self, n: int) -> np.ndarray:
+        """Branches starting at node `n`."""
+        return self.node_out_idx[self.node_out_ptr[n] : self.node_out_ptr[n + 1]]
+
+    def branches_in(self, n: int) -> np.ndarray:
+        """Branches ending at node `n`."""
+        return self.node_in_idx[self.node_in_ptr[n] : self.node_in_ptr[n + 1]]
+
+    def generator_segments(self, g: int) -> range:
+        """Merit order segments of generator `g`."""
+        return range(self.gen_seg_ptr[g], self.gen_seg_ptr[g + 1])
+
+    def slack_limits(
+        self, demand: np.ndarray | None = None, p_max: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Largest load shedding and generation spill at each node (of the model
+        or given `demand` and generation capacity `p_max`).
+
+        Shedding curtails consumption at a node (positive demand and generators
+        with negative capacity), spill curtails its production (negative demand
+        and positive generation capacity).
+        """
+        demand = self.demand if demand is None else demand
+        p_max = self.p_max if p_max is None else p_max
+        consumption = np.bincount(
+            self.gen_node, weights=np.maximum(-p_max, 0.0), minlength=self.n_nodes
+        )
+        production = np.bincount(
+            self.gen_node, weights=np.maximum(p_max, 0.0), minlength=self.n_nodes
+        )
+        return (
+            np.maximum(demand, 0.0) + consumption,
+            np.maximum(-demand, 0.0) + production,
+        )
+
+    def shift_injections(self) -> np.ndarray:
+        """Nodal injections `p_shift` such that `B_bus @ theta = p + p_shift`."""
+        shift_flow = self.susceptance * self.phase_shift
+        return np.bincount(
+            self.branch_from, weights=shift_flow, minlength=self.n_nodes
+        ) - np.bincount(self.branch_to, weights=shift_flow, minlength=self.n_nodes)
+
+
+def compile_network(structure: SystemStructure) -> CompiledNetwork:
+    """Compile validated system structure into an array-backed network."""
+    nodes, generators = structure.nodes, structure.generators
+    lines, trafos = structure.tramsmission_lines, structure.transformers
+    node_ids, generator_ids = nodes.index, generators.index
+    n_nodes, n_generators = len(node_ids), len(generator_ids)
+
+    branch_from = _positions(node_ids, lines["node_from"], trafos["node_from"])
+    branch_to = _positions(node_ids, lines["node_to"], trafos["node_to"])
+    tap_ratio = _column(trafos, "tap_ratio", 1.0)
+    susceptance = np.concatenate(
+        [
+            1.0 / lines["reactance"].to_numpy(dtype=np.float64),
+            1.0 / (trafos["reactance"].to_numpy(dtype=np.float64) * tap_ratio),
+        ]
+    )
+    phase_shift = np.concatenate(
+        [np.zeros(len(lines)), _column(trafos, "phase_shift", 0.0)]
+    )
+
+    active = _column(generators, "active", True).astype(bool)
+    gen_node = _positions(node_ids, generators["node_id"])
+    p_min = np.where(active, generators["P_min"].to_numpy(dtype=np.float64), 0.0)
+    p_max = np.where(active, generators["P_max"].to_numpy(dtype=np.float64), 0.0)
+
+    node_gen_ptr, node_gen_idx = _csr(gen_node, n_nodes)
+    node_out_ptr, node_out_idx = _csr(branch_from, n_nodes)
+    node_in_ptr, node_in_idx = _csr(branch_to, n_nodes)
+
+    seg_gen, seg_start, seg_end, seg_cost = _segments(
+        structure.marginal_costs, generator_ids, p_min, p_max
+    )
+    seg_start = np.where(active[seg_gen], seg_start, 0.0)
+    seg_end = np.where(active[seg_gen], seg_end, 0.0)
+    gen_seg_ptr, _ = _csr(seg_gen, n_generators)
+
+    return CompiledNetwork(
+        node_ids=node_ids,
+        line_ids=lines.index,
+        trafo_ids=trafos.index,
+        generator_ids=generator_ids,
+        demand=nodes["P_demand"].fillna(0.0).to_numpy(dtype=np.float64),
+        slack=_slack_node(nodes),
+        branch_from=branch_from,
+        branch_to=branch_to,
+        susceptance=susceptance,
+        phase_shift=phase_shift,
+        f_min=np.concatenate(
+            [lines["F_min"].to_numpy(np.float64), trafos["F_min"].to_numpy(np.float64)]
+        ),
+        f_max=np.concatenate(
+            [lines["F_max"].to_numpy(np.float64), trafos["F_max"].to_numpy(np.float64)]
+        ),
+        gen_node=gen_node,
+        p_min=p_min,
+        p_max=p_max,
+        node_gen_ptr=node_gen_ptr,
+        node_gen_idx=node_gen_idx,
+        node_out_ptr=node_out_ptr,
+        node_out_idx=node_out_idx,
+        node_in_ptr=node_in_ptr,
+        node_in_idx=node_in_idx,
+        seg_gen=seg_gen,
+        seg_start=seg_start,
+        seg_end=seg_end,
+        seg_cost=seg_cost,
+        gen_seg_ptr=gen_seg_ptr,
+    )
+
+
+def _positions(index: pd.Index, *columns: pd.Series) -> np.ndarray:
+    """Map identifiers stored in given columns to positions in the index."""
+    if not columns or sum(len(col) for col in columns) == 0:
+        return np.zeros(0, dtype=INDEX_DTYPE)
+    values = pd.concat(columns, ignore_index=True)
+    return index.get_indexer(values).astype(INDEX_DTYPE)
+
+
+def _column(df: pd.DataFrame, name: str, default) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), default)
+    return df[name].fillna(default).to_numpy()
+
+
+def _csr(keys: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """CSR offsets and (stably sorted) element positions grouped by keys."""
+    counts = np.bincount(keys, minlength=n) if len(keys) else np.zeros(n, dtype=int)
+    ptr = np.zeros(n + 1, dtype=OFFSET_DTYPE)
+    np.cumsum(counts, out=ptr[1:])
+    idx = np.argsort(keys, kind="stable").astype(INDEX_DTYPE)
+    return ptr, idx
+
+
+def _slack_node(nodes: pd.DataFrame) -> int:
+    if "slack_node" in nodes.columns:
+        flagged = np.flatnonzero(nodes["slack_node"].fillna(False).to_numpy(bool))
+        if flagged.size > 0:
+            return int(flagged[0])
+    return 0
+
+
+def _segments(
+    marginal_costs: pd.DataFrame,
+    generator_ids: pd.Index,
+    p_min: np.ndarray,
+    p_max: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flat merit order segments sorted by (generator, p_start).
+
+    Generators without marginal costs specified get a single zero cost
+    segment covering the whole [P_min, P_max] interval.
+    """
+    seg_gen = generator_ids.get_indexer(marginal_costs["generator_id"]).astype(
+        INDEX_DTYPE
+    )
+    seg_start = marginal_costs["p_start"].to_numpy(dtype=np.float64)
+    seg_end = marginal_costs["p_end"].to_numpy(dtype=np.float64)
+    seg_cost = marginal_costs["cost"].to_numpy(dtype=np.float64)
+
+    missing = np.ones(len(generator_ids), dtype=bool)
+    missing[seg_gen] = False
+    missing = np.flatnonzero(missing).astype(INDEX_DTYPE)
+    seg_gen = np.concatenate([seg_gen, missing])
+    seg_start = np.concatenate([seg_start, p_min[missing]])
+    seg_end = np.concatenate([seg_end, p_max[missing]])
+    seg_cost = np.concatenate([seg_cost, np.zeros(len(missing))])
+
+    order = np.lexsort((seg_start, seg_gen))
+    return seg_gen[order], seg_start[order], seg_end[order], seg_cost[order]
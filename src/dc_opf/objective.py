@@ -7,4 +7,17 @@ def objective(model) -> None:
 
 
 def generation_cost(model):
-    return sum(model.GenS[g, s] * model.marginal_cost[g, s] for (g, s) in model.GxS)
+    cost = sum(model.GenS[s] * model.marginal_cost[s] for s in model.S)
+    if model.penalties is not None:
+        cost += slack_penalty(model)
+    return cost
+
+
+def slack_penalty(model):
+    """Penalty for load shedding, generation spill and branch overloads."""
+    return (
+        model.shed_penalty * sum(model.Shed[n] for n in model.N)
+        + model.spill_penalty * sum(model.Spill[n] for n in model.N)
+        + model.overload_penalty
+        * sum(model.OverloadUp[l] + model.OverloadDown[l] for l in model.L)
+    )
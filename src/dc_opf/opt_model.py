@@ -1,16 +1,56 @@
-from pyomo.environ import AbstractModel
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from src.dc_opf.constraints import constraints
-from src.dc_opf.objective import objective
-from src.dc_opf.parameters import parameters
-from src.dc_opf.sets import indices
-from src.dc_opf.variables import variables
-from src.model.power_system_model import PowerSystemModel
+import numpy as np
 
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.model.power_system_model import PowerSystemModel, SystemState
 
-def df_opf_abstract_model():
-    """Symbolic DC OPF Optimization Model Implementation."""
-    opt_model = AbstractModel()
+if TYPE_CHECKING:
+    from pyomo.environ import ConcreteModel
+
+DEFAULT_SOLVER = "appsi_highs"
+
+
+class InfeasibleModelError(RuntimeError):
+    """Raised when DC OPF computation does not end with an optimal solution."""
+
+
+@dataclass(frozen=True)
+class SlackPenalties:
+    """
+    Costs [per unit] of slack variables of the soft DC OPF.
+
+    In the soft DC OPF the power balance may be violated by load shedding or
+    generation spill and branch flow limits by overloads, so the model is
+    always feasible and infeasibility shows up as nonzero slacks.
+    """
+
+    load_shedding: float = 1e4
+    generation_spill: float = 1e4
+    overload: float = 1e3
+
+
+def dc_opf_model(
+    network: CompiledNetwork, penalties: SlackPenalties | None = None
+) -> "ConcreteModel":
+    """
+    Symbolic DC OPF Optimization Model built on a compiled network.
+
+    If `penalties` are given, the soft DC OPF (with penalized slacks) is built.
+    """
+    # Pyomo is imported on first use only
+    from pyomo.environ import ConcreteModel
+
+    from src.dc_opf.constraints import constraints
+    from src.dc_opf.objective import objective
+    from src.dc_opf.parameters import parameters
+    from src.dc_opf.sets import indices
+    from src.dc_opf.variables import variables
+
+    opt_model = ConcreteModel()
+    opt_model.network = network
+    opt_model.penalties = penalties
     indices(opt_model)
     parameters(opt_model)
     variables(opt_model)
@@ -19,12 +59,95 @@ def df_opf_abstract_model():
     return opt_model
 
 
-def dc_opf(power_system_model: PowerSystemModel) -> None:
-    """Solve DC OPF on given PowerSystemModel object."""
-    # TODO: create ConcreteModel from an AbstractModel based on the
-    #   given power_system_model
-    # TODO: run the optimization problem and update the system state
-    #   from the model results
-    # TODO: If model is infeasible, raise an error indicating, that
-    #   computation crushed
-    pass
+def dc_opf(
+    power_system_model: PowerSystemModel,
+    solver: str = DEFAULT_SOLVER,
+    penalties: SlackPenalties | None = None,
+) -> None:
+    """
+    Solve DC OPF on given PowerSystemModel object.
+
+    By default an infeasible model raises `InfeasibleModelError`. If `penalties`
+    are given, the soft DC OPF is solved instead and violations are reported as
+    load shedding, generation spill and overloads in the system state.
+    """
+    network = compile_network(power_system_model.parameters)
+    opt_model = dc_opf_model(network, penalties)
+    solve(opt_model, solver)
+    write_state(
+        power_system_model.state, network, *solution(opt_model), *slacks(opt_model)
+    )
+
+
+def solve(opt_model: "ConcreteModel", solver: str = DEFAULT_SOLVER) -> None:
+    """Solve the optimization model and load its optimal solution."""
+    from pyomo.environ import SolverFactory, TerminationCondition
+
+    results = SolverFactory(solver).solve(opt_model, load_solutions=False)
+    condition = results.solver.termination_condition
+    if condition != TerminationCondition.optimal:
+        raise InfeasibleModelError(
+            f"DC OPF computation crashed, solver terminated with: {condition}"
+        )
+    opt_model.solutions.load_from(results)
+
+
+def solution(opt_model: "ConcreteModel") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Optimal (generation, branch flow, theta) arrays in network positions."""
+    flow = _var_values(opt_model.Flow)
+    if opt_model.penalties is not None:
+        flow += _var_values(opt_model.OverloadUp) - _var_values(opt_model.OverloadDown)
+    return _var_values(opt_model.Gen), flow, _var_values(opt_model.Theta)
+
+
+def slacks(opt_model: "ConcreteModel") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Optimal (load shedding, generation spill, overload) arrays in network positions."""
+    network = opt_model.network
+    if opt_model.penalties is None:
+        return (
+            np.zeros(network.n_nodes),
+            np.zeros(network.n_nodes),
+            np.zeros(network.n_branches),
+        )
+    return (
+        _var_values(opt_model.Shed),
+        _var_values(opt_model.Spill),
+        _var_values(opt_model.OverloadUp) - _var_values(opt_model.OverloadDown),
+    )
+
+
+def write_state(
+    state: SystemState,
+    network: CompiledNetwork,
+    generation: np.ndarray,
+    flow: np.ndarray,
+    theta: np.ndarray,
+    load_shedding: np.ndarray | None = None,
+    generation_spill: np.ndarray | None = None,
+    overload: np.ndarray | None = None,
+) -> None:
+    """
+    Write arrays in network positions back to the system state (in bulk).
+
+    Branch `flow` is the total flow (including `overload`). Slacks that are
+    not given are set to zero.
+    """
+    overload = np.zeros(network.n_branches) if overload is None else overload
+    state.power_generation.iloc[:] = generation
+    state.ts_power_flow.iloc[:] = flow[: network.n_lines]
+    state.trafos_power_flow.iloc[:] = flow[network.n_lines :]
+    state.theta.iloc[:] = theta
+    state.load_shedding.iloc[:] = 0.0 if load_shedding is None else load_shedding
+    state.generation_spill.iloc[:] = (
+        0.0 if generation_spill is None else generation_spill
+    )
+    state.ts_overload.iloc[:] = overload[: network.n_lines]
+    state.trafos_overload.iloc[:] = overload[network.n_lines :]
+
+
+def _var_values(var) -> np.ndarray:
+    return np.fromiter(
+        (np.nan if v.value is None else v.value for v in var.values()),
+        dtype=np.float64,
+        count=len(var),
+    )
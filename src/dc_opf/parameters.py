@@ -1,3 +1,4 @@
+import numpy as np
 from pyomo.environ import Param  # type: ignore
 from pyomo.environ import PositiveReals  # type: ignore
 from pyomo.environ import NonNegativeReals, Reals  # type: ignore
@@ -7,62 +8,97 @@ def parameters(model) -> None:
     """DC OPF Paramters"""
     node_parameters(model)
     generator_parameters(model)
-    transmission_line_parameters(model)
+    marginal_cost_segments_parameters(model)
+    branch_parameters(model)
+    if model.penalties is not None:
+        penalty_parameters(model)
 
 
 def node_parameters(model) -> None:
     """Node parameters for the DC OPF optimization problem."""
     model.demand = Param(
-        model.N, within=Reals, doc="Power demand [per unit] at each node."
-    )
-    model.gen_at_node = Param(
-        model.N, within=model.G, doc="Generators attached to a node."
-    )
-    model.lines_in = Param(
-        model.N, within=model.L, doc="List of inflow transmission lines."
-    )
-    model.lines_out = Param(
-        model.N, within=model.L, doc="List of outflow transmission lines."
+        model.N,
+        within=Reals,
+        mutable=True,
+        initialize=_indexed(model.network.demand),
+        doc="Power demand [per unit] at each node.",
     )
-    model.slack_node = Param(within=model.N)
 
 
 def generator_parameters(model) -> None:
     """Generator parameters for the DC OPF optimization problem."""
     model.pmax = Param(
-        model.G, within=Reals, doc="Maximum generation capacity [per unit]."
+        model.G,
+        within=Reals,
+        initialize=_indexed(model.network.p_max),
+        doc="Maximum generation capacity [per unit].",
     )
     model.pmin = Param(
-        model.G, within=Reals, doc="Minimum generation capacity [per unit]."
+        model.G,
+        within=Reals,
+        initialize=_indexed(model.network.p_min),
+        doc="Minimum generation capacity [per unit].",
     )
 
 
 def marginal_cost_segments_parameters(model) -> None:
     """Generators marginal cost parameters for the DC OPF optimization problem."""
-    model.pstart = Param(model.GxS, within=NonNegativeReals)
-    model.pend = Param(model.GxS, within=NonNegativeReals)
-    model.marginal_cost = Param(model.GxS, within=NonNegativeReals)
+    network = model.network
+    model.pstart = Param(model.S, within=Reals, initialize=_indexed(network.seg_start))
+    model.pend = Param(model.S, within=Reals, initialize=_indexed(network.seg_end))
+    model.marginal_cost = Param(
+        model.S, within=Reals, initialize=_indexed(network.seg_cost)
+    )
 
 
-def transmission_line_parameters(model) -> None:
-    """Transmission line parameters for the DC OPF optimization problem."""
+def branch_parameters(model) -> None:
+    """Branch (transmission line and transformer) parameters for the DC OPF optimization problem."""
+    network = model.network
     model.fmax = Param(
         model.L,
         within=Reals,
-        doc="Maximum power flow on a transmission line [per unit].",
+        initialize=_indexed(network.f_max),
+        doc="Maximum power flow on a branch [per unit].",
     )
     model.fmin = Param(
         model.L,
         within=Reals,
-        doc="Minimum power flow on a transmission line [per unit].",
+        initialize=_indexed(network.f_min),
+        doc="Minimum power flow on a branch [per unit].",
+    )
+    model.susceptance = Param(
+        model.L,
+        within=PositiveReals,
+        initialize=_indexed(network.susceptance),
+        doc="Branch susceptance [per unit].",
+    )
+    model.phase_shift = Param(
+        model.L,
+        within=Reals,
+        initialize=_indexed(network.phase_shift),
+        doc="Branch phase shift angle (zero for transmission lines).",
+    )
+
+
+def penalty_parameters(model) -> None:
+    """Slack penalties for the soft DC OPF optimization problem."""
+    penalties = model.penalties
+    model.shed_penalty = Param(
+        within=NonNegativeReals,
+        initialize=penalties.load_shedding,
+        doc="Cost of load shedding [per unit].",
+    )
+    model.spill_penalty = Param(
+        within=NonNegativeReals,
+        initialize=penalties.generation_spill,
+        doc="Cost of generation spill [per unit].",
     )
-    model.subsceptance = Param(
-        model.L, within=PositiveReals, doc="Transmission line subsceptance [per unit]."
+    model.overload_penalty = Param(
+        within=NonNegativeReals,
+        initialize=penalties.overload,
+        doc="Cost of branch overload [per unit].",
     )
-    model.node_fr = Param(model.L, within=model.N, doc="Starting node of a line.")
-    model.node_to = Param(model.L, within=model.N, doc="End node of a line.")
 
 
-def transformer_parameters(model) -> None:
-    """Transformer parameters for the DC OPF optimization problem."""
-    raise NotImplementedError("Transformers are not supported yet.")
+def _indexed(values: np.ndarray) -> dict[int, float]:
+    return dict(enumerate(values.tolist()))
@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.dc_opf.lp import generators_incidence
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.sensitivity import Factorization, SparsePTDF, factorize
+from src.model.power_system_model import PowerSystemModel, SystemState
+
+DEFAULT_SAMPLES_BATCH_SIZE = 1024
+
+
+@dataclass
+class PowerFlowResult:
+    """DC power flow of many injection patterns (samples)."""
+
+    theta: pd.DataFrame
+    """Nodes voltage angles (samples x nodes)."""
+    ts_power_flow: pd.DataFrame
+    """Transmission lines power flow (samples x lines)."""
+    trafos_power_flow: pd.DataFrame
+    """Transformators power flow (samples x transformers)."""
+    flow_error: pd.DataFrame | None = None
+    """Bounds on flows errors (samples x branches) if computed from truncated PTDF."""
+
+    def write(self, state: SystemState, sample) -> None:
+        """Write voltage angles and flows of the given sample to the system state."""
+        state.ts_power_flow.iloc[:] = self.ts_power_flow.loc[sample].to_numpy()
+        state.trafos_power_flow.iloc[:] = self.trafos_power_flow.loc[sample].to_numpy()
+        state.theta.iloc[:] = self.theta.loc[sample].to_numpy()
+
+
+class PowerFlowSolver:
+    """
+    DC power flow on a compiled network.
+
+    The reduced susceptance matrix is factorized once (and shared through the
+    factorization cache), each batch of injection patterns is then a single
+    multi right hand side sparse triangular solve. Power imbalance of an
+    island is absorbed by its angle reference node.
+
+    With a truncated `ptdf`, flows of its branches are computed from the
+    stored rows instead (a sparse product, no triangular solves); angles and
+    flows of other branches are then NaN, see `error_bound`.
+    """
+
+    def __init__(
+        self,
+        network: CompiledNetwork,
+        batch_size: int = DEFAULT_SAMPLES_BATCH_SIZE,
+        ptdf: SparsePTDF | None = None,
+    ) -> None:
+        self.network = network
+        self.batch_size = batch_size
+        self.ptdf = ptdf
+        self.factorization: Factorization | None = (
+            factorize(network) if ptdf is None else None
+        )
+
+    def solve(self, injections: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (theta, flow) for `(samples, n_nodes)` nodal injections.
+
+        Returns `(samples, n_nodes)` voltage angles and `(samples, n_branches)`
+        branch flows.
+        """
+        injections = np.atleast_2d(injections)
+        n_samples = injections.shape[0]
+        network = self.network
+        if self.ptdf is not None:
+            theta = np.full((n_samples, network.n_nodes), np.nan)
+            flow = np.full((n_samples, network.n_branches), np.nan)
+            for start in range(0, n_samples, self.batch_size):
+                rows = slice(start, start + self.batch_size)
+                flow[rows, self.ptdf.monitored] = self.ptdf.flows(injections[rows].T).T
+            return theta, flow
+        theta = np.empty((n_samples, network.n_nodes))
+        flow = np.empty((n_samples, network.n_branches))
+        shift = network.shift_injections()
+        for start in range(0, n_samples, self.batch_size):
+            rows = slice(start, start + self.batch_size)
+            theta[rows] = self.factorization.solve((injections[rows] + shift).T).T
+            flow[rows] = self.branch_flows(theta[rows])
+        return theta, flow
+
+    def error_bound(self, injections: np.ndarray) -> np.ndarray:
+        """
+        `(samples, n_branches)` bounds on errors of `solve` flows.
+
+        Flows are exact (zero error) without truncated PTDF; errors of flows
+        of branches not stored in the truncated PTDF are NaN.
+        """
+        injections = np.atleast_2d(injections)
+        if self.ptdf is None:
+            return np.zeros((injections.shape[0], self.network.n_branches))
+        error = np.full((injections.shape[0], self.network.n_branches), np.nan)
+        error[:, self.ptdf.monitored] = self.ptdf.error_bound(injections.T).T
+        return error
+
+    def branch_flows(self, theta: np.ndarray) -> np.ndarray:
+        """`(samples, n_branches)` flows for `(samples, n_nodes)` voltage angles."""
+        network = self.network
+        delta = theta[:, network.branch_from] - theta[:, network.branch_to]
+        return network.susceptance * (delta - network.phase_shift)
+
+
+def dc_power_flow(
+    power_system_model: PowerSystemModel,
+    demand: pd.DataFrame | None = None,
+    generation: pd.Series | pd.DataFrame | None = None,
+    batch_size: int = DEFAULT_SAMPLES_BATCH_SIZE,
+    ptdf: SparsePTDF | None = None,
+) -> PowerFlowResult:
+    """
+    DC power flow of a given dispatch for many demand samples.
+
+    `demand` are nodes demand samples (samples x nodes), missing nodes keep
+    base demand; by default the base demand is the only sample. `generation`
+    is a dispatch shared by all samples (generators Series, by default the
+    model state power generation) or one dispatch per sample (samples x
+    generators). If a single sample is solved, voltage angles and flows are
+    also written to the model state. With a truncated `ptdf`, flows of its
+    branches are computed from the stored rows together with their error
+    bounds (see `PowerFlowSolver`).
+    """
+    network = compile_network(power_system_model.parameters)
+    if generation is None:
+        generation = power_system_model.state.power_generation
+    samples = _samples(demand, generation)
+    solver = PowerFlowSolver(network, batch_size, ptdf)
+    theta = np.empty((len(samples), network.n_nodes))
+    flow = np.empty((len(samples), network.n_branches))
+    error = None if ptdf is None else np.empty((len(samples), network.n_branches))
+    for start in range(0, len(samples), batch_size):
+        rows = slice(start, start + batch_size)
+        injections = _generation_injections(network, generation, rows) - _demand(
+            network, demand, rows
+        )
+        theta[rows], flow[rows] = solver.solve(injections)
+        if error is not None:
+            error[rows] = solver.error_bound(injections)
+
+    result = PowerFlowResult(
+        theta=pd.DataFrame(theta, index=samples, columns=network.node_ids),
+        ts_power_flow=pd.DataFrame(
+            flow[:, : network.n_lines], index=samples, columns=network.line_ids
+        ),
+        trafos_power_flow=pd.DataFrame(
+            flow[:, network.n_lines :], index=samples, columns=network.trafo_ids
+        ),
+        flow_error=(
+            None
+            if error is None
+            else pd.DataFrame(error, index=samples, columns=network.branch_ids)
+        ),
+    )
+    if len(samples) == 1:
+        result.write(power_system_model.state, samples[0])
+    return result
+
+
+def _samples(
+    demand: pd.DataFrame | None, generation: pd.Series | pd.DataFrame
+) -> pd.Index:
+    if isinstance(generation, pd.DataFrame):
+        if demand is not None and not demand.index.equals(generation.index):
+            raise ValueError("demand and generation samples must be the same")
+        return generation.index
+    return pd.RangeIndex(1) if demand is None else demand.index
+
+
+def _demand(
+    network: CompiledNetwork, demand: pd.DataFrame | None, rows: slice
+) -> np.ndarray:
+    """(samples x nodes) demand batch aligned with network positions."""
+    if demand is None:
+        return network.demand
+    batch = demand.iloc[rows].reindex(columns=network.node_ids).to_numpy(np.float64)
+    return np.where(np.isnan(batch), network.demand, batch)
+
+
+def _generation_injections(
+    network: CompiledNetwork, generation: pd.Series | pd.DataFrame, rows: slice
+) -> np.ndarray:
+    """(samples x nodes) or (nodes,) generation injections."""
+    if isinstance(generation, pd.DataFrame):
+        values = generation.iloc[rows].reindex(columns=network.generator_ids)
+    else:
+        values = generation.reindex(network.generator_ids)
+    values = values.to_numpy(np.float64)
+    if np.isnan(values).any():
+        raise ValueError(
+            "power generation is not defined for all generators "
+            "(solve DC OPF first or pass the dispatch explicitly)"
+        )
+    return (generators_incidence(network) @ values.T).T
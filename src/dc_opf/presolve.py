@@ -0,0 +1,245 @@
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.dc_opf.lp import (
+    LinearProgram,
+    dc_opf_lp,
+    generators_incidence,
+    named_blocks,
+    segments_incidence,
+    solve_lp,
+)
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import write_state
+from src.dc_opf.power_flow import PowerFlowSolver
+from src.dc_opf.sensitivity import SensitivityEngine, SparsePTDF, islands
+from src.model.power_system_model import PowerSystemModel
+
+BOUND_TOLERANCE = 1e-9
+
+
+@dataclass
+class FlowRanges:
+    """Ranges of flows achievable on branches (for any dispatch and demand in range)."""
+
+    lower: np.ndarray
+    """Minimal achievable flow of each branch."""
+    upper: np.ndarray
+    """Maximal achievable flow of each branch."""
+
+    def binding(self, network: CompiledNetwork) -> tuple[np.ndarray, np.ndarray]:
+        """Masks of branches whose (F_min, F_max) limits may bind."""
+        return (
+            self.lower <= network.f_min + BOUND_TOLERANCE,
+            self.upper >= network.f_max - BOUND_TOLERANCE,
+        )
+
+
+def flow_ranges(
+    network: CompiledNetwork,
+    demand_min: np.ndarray | None = None,
+    demand_max: np.ndarray | None = None,
+    engine: SensitivityEngine | None = None,
+    ptdf: SparsePTDF | None = None,
+) -> FlowRanges:
+    """
+    Bound branch flows with interval arithmetic over PTDF rows.
+
+    Nodal injections range from `P_min - demand_max` to `P_max - demand_min`
+    (demand is fixed to the network demand by default). Injections of an
+    island sum up to zero, so any constant `c` may be subtracted from the PTDF
+    row over the island nodes; `c` is the weighted median of the row (weighted
+    by injection ranges), which gives the narrowest interval.
+
+    With a truncated `ptdf` the rows are not shifted (that would make them
+    dense) and the intervals are widened by the PTDF error bound. It must
+    store rows of all branches, otherwise ValueError is raised.
+    """
+    demand_min = network.demand if demand_min is None else demand_min
+    demand_max = network.demand if demand_max is None else demand_max
+    gen_at_node = generators_incidence(network)
+    injection_min = gen_at_node @ network.p_min - demand_max
+    injection_max = gen_at_node @ network.p_max - demand_min
+    if ptdf is not None:
+        return _sparse_flow_ranges(network, ptdf, injection_min, injection_max)
+    engine = SensitivityEngine(network) if engine is None else engine
+    weight = injection_max - injection_min
+    labels = islands(network)
+    # flows at zero injections (phase shifting transformers)
+    offset = engine.flows(np.zeros(network.n_nodes))
+
+    lower = np.empty(network.n_branches)
+    upper = np.empty(network.n_branches)
+    for rows, batch in engine.iter_ptdf():
+        island = labels[network.branch_from[rows]]
+        in_island = labels[None, :] == island[:, None]
+        shift = _weighted_median(batch, np.where(in_island, weight, 0.0))
+        batch = np.where(in_island, batch - shift[:, None], 0.0)
+        low, high = batch * injection_min, batch * injection_max
+        lower[rows] = offset[rows] + np.minimum(low, high).sum(axis=1)
+        upper[rows] = offset[rows] + np.maximum(low, high).sum(axis=1)
+    return FlowRanges(lower=lower, upper=upper)
+
+
+def presolved_dc_opf_lp(
+    network: CompiledNetwork,
+    ranges: FlowRanges | None = None,
+    ptdf: SparsePTDF | None = None,
+) -> tuple[LinearProgram, np.ndarray]:
+    """
+    DC OPF linear program in the PTDF form, without limits that cannot bind.
+
+    Columns are `[Gen, GenS]`; rows are island balances, merit order
+    decompositions and flow limits of branches that may bind (a dropped side
+    of the limit is unbounded). Returns the program and monitored branches.
+
+    PTDF rows are dense over the generators of an island, so the program has
+    about `monitored x generators` non zeros. It is small when few limits
+    may bind; on large meshed grids with many of them it may have far more
+    non zeros than the angle form, use `relaxed_dc_opf_lp` then.
+
+    If a truncated `ptdf` is given, flow rows are built from its sparse rows
+    and flows of the program differ from exact flows by at most
+    `ptdf.error_bound` of the nodal injections. ValueError is raised if rows
+    of branches whose limits may bind are not stored.
+    """
+    engine = SensitivityEngine(network) if ptdf is None else None
+    if ranges is None:
+        ranges = flow_ranges(network, engine=engine, ptdf=ptdf)
+    lower_binds, upper_binds = ranges.binding(network)
+    monitored = np.flatnonzero(lower_binds | upper_binds)
+
+    n_gen, n_seg = network.n_generators, network.n_segments
+    labels = islands(network)
+    n_islands = labels.max(initial=-1) + 1
+    gen_island = sp.csr_matrix(
+        (np.ones(n_gen), (labels[network.gen_node], np.arange(n_gen))),
+        shape=(n_islands, n_gen),
+    )
+    island_demand = np.bincount(labels, weights=network.demand, minlength=n_islands)
+    # flow = PTDF @ (generation - demand) + offset
+    if ptdf is None:
+        base_flow = engine.flows(-network.demand)[monitored]
+        rows = sp.csr_matrix(engine.ptdf(monitored))
+    else:
+        base_flow = ptdf.flows(-network.demand)[ptdf.positions(monitored)]
+        rows = ptdf.rows(monitored).astype(np.float64)
+    flow_matrix = (rows @ generators_incidence(network)).tocsr()
+
+    matrix = sp.bmat(
+        [
+            [gen_island, sp.csr_matrix((n_islands, n_seg))],
+            [sp.identity(n_gen), -segments_incidence(network)],
+            [flow_matrix, sp.csr_matrix((monitored.size, n_seg))],
+        ],
+        format="csr",
+    )
+    flow_lb = np.where(lower_binds[monitored], network.f_min[monitored], -np.inf)
+    flow_ub = np.where(upper_binds[monitored], network.f_max[monitored], np.inf)
+    lp = LinearProgram(
+        cost=np.concatenate([np.zeros(n_gen), network.seg_cost]),
+        matrix=matrix,
+        row_lb=np.concatenate([island_demand, network.p_min, flow_lb - base_flow]),
+        row_ub=np.concatenate([island_demand, network.p_min, flow_ub - base_flow]),
+        col_lb=np.concatenate([network.p_min, np.zeros(n_seg)]),
+        col_ub=np.concatenate([network.p_max, network.seg_end - network.seg_start]),
+        columns=named_blocks(Gen=n_gen, GenS=n_seg),
+        rows=named_blocks(
+            IslandBalance=n_islands,
+            PowerGenerationCostDecomposition=n_gen,
+            FlowLimit=monitored.size,
+        ),
+    )
+    return lp, monitored
+
+
+def relaxed_dc_opf_lp(
+    network: CompiledNetwork, ranges: FlowRanges | None = None
+) -> LinearProgram:
+    """
+    DC OPF linear program (`dc_opf_lp`) without flow limits that cannot bind.
+
+    The angle form and its layout are kept, only `Flow` bounds of branches
+    whose limits cannot bind are made infinite (flow columns without bounds
+    are eliminated by the solver presolve).
+    """
+    ranges = flow_ranges(network) if ranges is None else ranges
+    lower_binds, upper_binds = ranges.binding(network)
+    lp = dc_opf_lp(network)
+    flows = lp.columns["Flow"]
+    lp.col_lb[flows] = np.where(lower_binds, network.f_min, -np.inf)
+    lp.col_ub[flows] = np.where(upper_binds, network.f_max, np.inf)
+    return lp
+
+
+def presolved_dc_opf(
+    power_system_model: PowerSystemModel,
+    ptdf_threshold: float | None = None,
+    ptdf_form: bool = True,
+) -> None:
+    """
+    Solve DC OPF without flow limits that cannot bind.
+
+    By default the PTDF form program (`presolved_dc_opf_lp`) is solved and
+    flows and voltage angles of the optimal dispatch are computed by the DC
+    power flow; with `ptdf_form` unset the angle form (`relaxed_dc_opf_lp`)
+    is solved. With `ptdf_threshold` flow ranges (and PTDF form rows) use
+    truncated float32 PTDF rows (see `SensitivityEngine.sparse_ptdf`).
+    """
+    network = compile_network(power_system_model.parameters)
+    ptdf = None
+    if ptdf_threshold is not None:
+        ptdf = SensitivityEngine(network).sparse_ptdf(threshold=ptdf_threshold)
+    if not ptdf_form:
+        lp = relaxed_dc_opf_lp(network, flow_ranges(network, ptdf=ptdf))
+        x = solve_lp(lp).x
+        write_state(
+            power_system_model.state,
+            network,
+            x[lp.columns["Gen"]],
+            x[lp.columns["Flow"]],
+            x[lp.columns["Theta"]],
+        )
+        return
+    lp, _ = presolved_dc_opf_lp(network, ptdf=ptdf)
+    generation = solve_lp(lp).x[lp.columns["Gen"]]
+    injections = generators_incidence(network) @ generation - network.demand
+    theta, flow = PowerFlowSolver(network).solve(injections)
+    write_state(power_system_model.state, network, generation, flow[0], theta[0])
+
+
+def _sparse_flow_ranges(
+    network: CompiledNetwork,
+    ptdf: SparsePTDF,
+    injection_min: np.ndarray,
+    injection_max: np.ndarray,
+) -> FlowRanges:
+    """Interval arithmetic over truncated PTDF rows widened by the error bound."""
+    if not np.isin(np.arange(network.n_branches), ptdf.monitored).all():
+        raise ValueError("flow ranges need truncated PTDF rows of all branches")
+    positive, negative = ptdf.matrix.maximum(0.0), ptdf.matrix.minimum(0.0)
+    error = ptdf.error_bound(np.maximum(np.abs(injection_min), np.abs(injection_max)))
+    lower = np.empty(network.n_branches)
+    upper = np.empty(network.n_branches)
+    lower[ptdf.monitored] = (
+        ptdf.offset + positive @ injection_min + negative @ injection_max - error
+    )
+    upper[ptdf.monitored] = (
+        ptdf.offset + positive @ injection_max + negative @ injection_min + error
+    )
+    return FlowRanges(lower=lower, upper=upper)
+
+
+def _weighted_median(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weighted median of each row (0 for rows with zero total weight)."""
+    order = np.argsort(values, axis=1)
+    cumulative = np.cumsum(np.take_along_axis(weights, order, axis=1), axis=1)
+    total = cumulative[:, -1:]
+    position = (cumulative < 0.5 * total).sum(axis=1, keepdims=True)
+    position = np.minimum(position, values.shape[1] - 1)
+    median = np.take_along_axis(
+        values, np.take_along_axis(order, position, axis=1), axis=1
+    )[:, 0]
+    return np.where(total[:, 0] > 0.0, median, 0.0)
@@ -0,0 +1,240 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from src.dc_opf.lp import LinearProgram, highs_lp
+from src.dc_opf.network import CompiledNetwork
+from src.dc_opf.opt_model import InfeasibleModelError, write_state
+from src.dc_opf.template import DEFAULT_TEMPLATE_CACHE, TemplateCache
+from src.model.power_system_model import PowerSystemModel
+
+if TYPE_CHECKING:
+    import highspy
+
+SWEEP_STEP = 1e-6
+"""Relative step taken past a breakpoint to reach the next optimal basis."""
+RATE_TOLERANCE = 1e-9
+
+
+@dataclass
+class Ranging:
+    """Sensitivity ranges of the DC OPF optimal basis."""
+
+    demand: pd.DataFrame
+    """
+    Nodes LMP (`lmp`) and demand range (`lower`, `upper`) within which the
+    optimal basis, i.e. the dispatch and congestion pattern, does not change
+    (each node demand changed alone). Within the range the cost changes by
+    LMP per unit of demand.
+    """
+    cost: pd.DataFrame
+    """
+    Merit order segments (generator_id, p_start) cost and cost range
+    (`lower`, `upper`) within which the optimal dispatch does not change.
+    """
+
+
+@dataclass
+class DemandSweep:
+    """
+    Optimal cost and LMPs as functions of one node demand.
+
+    The cost is piecewise linear between `demand` breakpoints (ascending),
+    LMPs are constant on each piece (where the optimal basis does not change).
+    """
+
+    node: str
+    """Swept node."""
+    demand: np.ndarray
+    """Demand breakpoints (the first and the last one are the swept range ends)."""
+    cost: np.ndarray
+    """Optimal cost at breakpoints."""
+    lmp: pd.DataFrame
+    """Nodes LMPs (columns) on pieces between breakpoints (rows)."""
+    solves: int
+    """Number of (warm started) LP solves made."""
+
+    def cost_at(self, demand: np.ndarray | float) -> np.ndarray:
+        """Optimal cost at given demand values (within the swept range)."""
+        return np.interp(demand, self.demand, self.cost)
+
+    def lmp_at(self, demand: np.ndarray | float) -> pd.DataFrame:
+        """Nodes LMPs at given demand values (left limits at breakpoints)."""
+        pieces = np.searchsorted(self.demand, np.atleast_1d(demand), side="left")
+        pieces = np.clip(pieces - 1, 0, len(self.lmp) - 1)
+        lmp = self.lmp.iloc[pieces]
+        lmp.index = pd.Index(np.atleast_1d(demand), name=self.node)
+        return lmp
+
+
+def ranging_dc_opf(
+    power_system_model: PowerSystemModel, cache: TemplateCache | None = None
+) -> Ranging:
+    """
+    Solve DC OPF (writing the system state) and range its optimal basis.
+
+    Ranges are read from the final simplex basis, no further LPs are solved.
+    """
+    network, lp = _instantiate(power_system_model, cache)
+    highs = _solve(lp)
+    x = np.asarray(highs.getSolution().col_value)
+    write_state(
+        power_system_model.state,
+        network,
+        x[lp.columns["Gen"]],
+        x[lp.columns["Flow"]],
+        x[lp.columns["Theta"]],
+    )
+
+    _, ranging = highs.getRanging()
+    balance, segments = lp.rows["BalancingEquation"], lp.columns["GenS"]
+    return Ranging(
+        demand=pd.DataFrame(
+            {
+                "lmp": np.asarray(highs.getSolution().row_dual)[balance],
+                "lower": np.asarray(ranging.row_bound_dn.value_)[balance],
+                "upper": np.asarray(ranging.row_bound_up.value_)[balance],
+            },
+            index=network.node_ids,
+        ),
+        cost=pd.DataFrame(
+            {
+                "cost": lp.cost[segments],
+                "lower": np.asarray(ranging.col_cost_dn.value_)[segments],
+                "upper": np.asarray(ranging.col_cost_up.value_)[segments],
+            },
+            index=_segments_index(network),
+        ),
+    )
+
+
+def demand_sweep(
+    power_system_model: PowerSystemModel,
+    node: str,
+    stop: float,
+    start: float | None = None,
+    cache: TemplateCache | None = None,
+) -> DemandSweep:
+    """
+    Parametric DC OPF in the demand of `node` from `start` (the model demand
+    by default) to `stop`, other demands fixed.
+
+    Instead of solving at grid points, the sweep jumps from one basis change
+    to the next: the demand range of the current optimal basis gives the next
+    breakpoint, the program is re-solved (warm started) just past it. Pieces
+    shorter than `SWEEP_STEP` (relative) may be merged. If the demand becomes
+    infeasible before `stop`, the sweep ends at the last feasible breakpoint.
+    Raises `InfeasibleModelError` if `start` is infeasible.
+    """
+    network, lp = _instantiate(power_system_model, cache)
+    position = network.node_ids.get_loc(node)
+    balance = lp.rows["BalancingEquation"]
+    row = balance.start + position
+    if start is None:
+        start = lp.row_lb[row]
+    lp.row_lb[row] = lp.row_ub[row] = start
+    direction = 1.0 if stop >= start else -1.0
+
+    highs = _solve(lp)
+    solves, point = 1, start
+    demand, costs, lmps = [start], [highs.getInfo().objective_function_value], []
+    while True:
+        solution = highs.getSolution()
+        lmp = np.asarray(solution.row_dual)[balance]
+        step = _rhs_step(highs, lp, row, direction, np.asarray(solution.col_value))
+        end = point + direction * step
+        if direction * (end - stop) >= 0:
+            end = stop
+        cost = highs.getInfo().objective_function_value + lmp[position] * (end - point)
+        if direction * (end - demand[-1]) > 0:
+            demand.append(end)
+            costs.append(cost)
+            lmps.append(lmp)
+        if end == stop:
+            break
+
+        point = end + direction * SWEEP_STEP * max(1.0, abs(end))
+        if direction * (point - stop) > 0:
+            point = stop
+        highs.changeRowBounds(row, point, point)
+        highs.run()
+        solves += 1
+        if not _optimal(highs):
+            break
+
+    if direction < 0:
+        demand, costs, lmps = demand[::-1], costs[::-1], lmps[::-1]
+    return DemandSweep(
+        node=node,
+        demand=np.array(demand),
+        cost=np.array(costs),
+        lmp=pd.DataFrame(
+            np.array(lmps).reshape(-1, network.n_nodes), columns=network.node_ids
+        ),
+        solves=solves,
+    )
+
+
+def _rhs_step(
+    highs: "highspy.Highs",
+    lp: LinearProgram,
+    row: int,
+    direction: float,
+    x: np.ndarray,
+) -> float:
+    """
+    Largest change of the (equality) row bound in `direction` keeping the
+    optimal basis primal feasible (ratio test along `B^-1 e_row`).
+    """
+    rhs = np.zeros(lp.n_rows)
+    rhs[row] = direction
+    _, rates = highs.getBasisSolve(rhs)
+    _, basic = highs.getBasicVariables()
+    moving = np.abs(rates) > RATE_TOLERANCE
+    # basic row activities of equality rows cannot move at all
+    if (moving & (basic < 0)).any():
+        return 0.0
+    columns, rates = basic[moving], rates[moving]
+    limits = np.where(rates > 0, lp.col_ub[columns], lp.col_lb[columns])
+    with np.errstate(invalid="ignore"):
+        steps = (limits - x[columns]) / rates
+    return float(np.maximum(steps, 0.0).min(initial=np.inf))
+
+
+def _instantiate(
+    power_system_model: PowerSystemModel, cache: TemplateCache | None
+) -> tuple[CompiledNetwork, LinearProgram]:
+    cache = DEFAULT_TEMPLATE_CACHE if cache is None else cache
+    template = cache.get(power_system_model.parameters)
+    return template.instantiate(power_system_model.parameters)
+
+
+def _solve(lp: LinearProgram) -> "highspy.Highs":
+    """HiGHS instance holding the optimal basis of the program."""
+    import highspy
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.passModel(highs_lp(lp))
+    highs.run()
+    if not _optimal(highs):
+        raise InfeasibleModelError(
+            f"DC OPF computation crashed, solver terminated with: "
+            f"{highs.modelStatusToString(highs.getModelStatus())}"
+        )
+    return highs
+
+
+def _optimal(highs: "highspy.Highs") -> bool:
+    import highspy
+
+    return highs.getModelStatus() == highspy.HighsModelStatus.kOptimal
+
+
+def _segments_index(network: CompiledNetwork) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays(
+        [network.generator_ids[network.seg_gen], network.seg_start],
+        names=["generator_id", "p_start"],
+    )
@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.dc_opf.lp import solve_lp
+from src.dc_opf.network import compile_network
+from src.dc_opf.opt_model import write_state
+from src.dc_opf.template import DEFAULT_TEMPLATE_CACHE, TemplateCache
+from src.model.power_system_model import PowerSystemModel, SystemState, SystemStructure
+
+RESULT_STORE_SIZE = 1024
+DEFAULT_RESOLUTION = 1e-6
+
+
+@dataclass
+class StoredResult:
+    """Optimal DC OPF solution of one snapshot."""
+
+    structure_key: str
+    """Structure hash of the solved model."""
+    point: np.ndarray
+    """Snapshot (demand and availability) vector."""
+    generation: np.ndarray
+    flow: np.ndarray
+    theta: np.ndarray
+    basis: object
+    """Optimal simplex basis (HiGHS), a warm start for similar snapshots."""
+    solve_time: float
+    """Solver wall time [s]."""
+
+    def state(self, structure: SystemStructure) -> SystemState:
+        """System state of the stored solution."""
+        state = SystemState.undefined_state(structure)
+        write_state(
+            state, compile_network(structure), self.generation, self.flow, self.theta
+        )
+        return state
+
+
+@dataclass
+class ResultStoreStats:
+    """Result store instrumentation."""
+
+    hits: int = 0
+    """Snapshots answered from the store."""
+    warm_starts: int = 0
+    """Snapshots solved from the nearest stored basis."""
+    misses: int = 0
+    """Snapshots solved from scratch."""
+    time_saved: float = 0.0
+    """Estimated solver time saved [s]."""
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.warm_starts + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class ResultStore:
+    """
+    Bounded (LRU) store of optimal DC OPF solutions.
+
+    Results are keyed by the structure hash and the snapshot vector (nodes
+    demand and generators availability) quantized to `resolution`, so
+    repeated snapshots are answered without solving. For other snapshots of
+    the same structure the store provides the nearest (euclidean) stored
+    result, whose basis warm starts the solver.
+    """
+
+    def __init__(
+        self, maxsize: int = RESULT_STORE_SIZE, resolution: float = DEFAULT_RESOLUTION
+    ) -> None:
+        self.maxsize = maxsize
+        self.resolution = resolution
+        self.stats = ResultStoreStats()
+        self._results: OrderedDict[tuple[str, bytes], StoredResult] = OrderedDict()
+        self._lock = threading.Lock()
+        self._cold_solve_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def key(self, structure_key: str, point: np.ndarray) -> tuple[str, bytes]:
+        quantized = np.round(np.asarray(point) / self.resolution).astype(np.int64)
+        return structure_key, quantized.tobytes()
+
+    def get(self, key: tuple[str, bytes]) -> StoredResult | None:
+        """Stored result of the snapshot (and mark it as recently used)."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def nearest(self, structure_key: str, point: np.ndarray) -> StoredResult | None:
+        """Stored result of the same structure nearest to the snapshot."""
+        with self._lock:
+            candidates = [
+                result
+                for result in self._results.values()
+                if result.structure_key == structure_key
+            ]
+        if not candidates:
+            return None
+        distance = np.linalg.norm(
+            np.stack([result.point for result in candidates]) - point, axis=1
+        )
+        return candidates[int(np.argmin(distance))]
+
+    def put(self, key: tuple[str, bytes], result: StoredResult) -> None:
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def record(self, outcome: str, solve_time: float = 0.0) -> None:
+        """Update instrumentation with a lookup outcome ('hit', 'warm_start' or 'miss')."""
+        with self._lock:
+            if outcome == "hit":
+                self.stats.hits += 1
+                self.stats.time_saved += solve_time
+            elif outcome == "warm_start":
+                self.stats.warm_starts += 1
+                self.stats.time_saved += max(self._mean_cold_time() - solve_time, 0.0)
+            else:
+                self.stats.misses += 1
+                self._cold_solve_time += solve_time
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def _mean_cold_time(self) -> float:
+        return self._cold_solve_time / self.stats.misses if self.stats.misses else 0.0
+
+
+def memoized_dc_opf(
+    power_system_model: PowerSystemModel,
+    store: ResultStore,
+    availability: np.ndarray | None = None,
+    templates: TemplateCache | None = None,
+) -> str:
+    """
+    DC OPF answered from the result store when possible.
+
+    `availability` is the available fraction of P_max of each generator (1.0
+    by default). The optimal state is written to the model; returns the
+    lookup outcome: 'hit', 'warm_start' or 'miss'.
+    """
+    structure = power_system_model.parameters
+    templates = DEFAULT_TEMPLATE_CACHE if templates is None else templates
+    template = templates.get(structure)
+    network, lp = template.instantiate(structure)
+    availability = (
+        np.ones(network.n_generators) if availability is None else availability
+    )
+    point = np.concatenate([network.demand, availability])
+    key = store.key(template.key, point)
+
+    result = store.get(key)
+    if result is not None:
+        outcome = "hit"
+        store.record(outcome, result.solve_time)
+    else:
+        nearest = store.nearest(template.key, point)
+        generators = lp.columns["Gen"]
+        decomposition = lp.rows["PowerGenerationCostDecomposition"]
+        p_max = network.p_max * availability
+        p_min = np.minimum(network.p_min, p_max)
+        lp.row_lb, lp.row_ub = np.array(lp.row_lb), np.array(lp.row_ub)
+        lp.col_lb, lp.col_ub = np.array(lp.col_lb), np.array(lp.col_ub)
+        lp.row_lb[decomposition] = lp.row_ub[decomposition] = p_min
+        lp.col_lb[generators], lp.col_ub[generators] = p_min, p_max
+        start = time.perf_counter()
+        solution = solve_lp(lp, basis=None if nearest is None else nearest.basis)
+        solve_time = time.perf_counter() - start
+        result = StoredResult(
+            structure_key=template.key,
+            point=point,
+            generation=solution.x[generators],
+            flow=solution.x[lp.columns["Flow"]],
+            theta=solution.x[lp.columns["Theta"]],
+            basis=solution.basis,
+            solve_time=solve_time,
+        )
+        store.put(key, result)
+        outcome = "miss" if nearest is None else "warm_start"
+        store.record(outcome, solve_time)
+
+    write_state(
+        power_system_model.state, network, result.generation, result.flow, result.theta
+    )
+    return outcome
@@ -0,0 +1,418 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+
+from src.dc_opf.network import CompiledNetwork
+
+FACTOR_CACHE_SIZE = 16
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_PTDF_THRESHOLD = 1e-4
+
+_factor_cache: OrderedDict[str, "Factorization"] = OrderedDict()
+_factor_cache_lock = threading.Lock()
+
+
+class Factorization:
+    """Sparse LU factorization of the reduced (reference buses removed) susceptance matrix."""
+
+    __slots__ = ("n_nodes", "references", "kept", "lu")
+
+    def __init__(self, network: CompiledNetwork) -> None:
+        self.n_nodes = network.n_nodes
+        self.references = reference_nodes(network)
+        kept = np.ones(network.n_nodes, dtype=bool)
+        kept[self.references] = False
+        self.kept = np.flatnonzero(kept)
+        b_bus = susceptance_matrix(network)
+        self.lu = splu(b_bus[self.kept][:, self.kept].tocsc()) if self.kept.size else None
+
+    def solve(self, injections: np.ndarray) -> np.ndarray:
+        """Voltage angles for (n_nodes,) or (n_nodes, k) nodal injections."""
+        theta = np.zeros(injections.shape, dtype=np.float64)
+        if self.lu is not None:
+            theta[self.kept] = self.lu.solve(
+                np.asarray(injections[self.kept], dtype=np.float64)
+            )
+        return theta
+
+
+@dataclass
+class SparsePTDF:
+    """
+    Truncated PTDF rows of monitored branches stored as float32 CSR matrix.
+
+    Entries with magnitude below `threshold` are dropped. `residual` is the
+    L1 norm of the difference between the exact and the stored row (dropped
+    entries and float32 rounding), so by Hoelder inequality the flow error of
+    branch `monitored[m]` is at most `residual[m] * max(|p|)` for nodal
+    injections `p` (see `error_bound`).
+    """
+
+    matrix: sp.csr_matrix
+    """`(len(monitored), n_nodes)` truncated PTDF rows (float32)."""
+    monitored: np.ndarray
+    """Positions of monitored branches (rows of the matrix)."""
+    threshold: float
+    """Magnitude below which PTDF entries were dropped."""
+    residual: np.ndarray
+    """L1 norm of the approximation error of each row."""
+    offset: np.ndarray
+    """Exact flows of monitored branches at zero injections (phase shifters)."""
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the stored matrix."""
+        matrix = self.matrix
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+    def flows(self, injections: np.ndarray) -> np.ndarray:
+        """Approximate monitored flows for (n_nodes,) or (n_nodes, k) injections."""
+        return self.matrix @ injections + _expand(self.offset, injections)
+
+    def error_bound(self, injections: np.ndarray) -> np.ndarray:
+        """Bound on the error of `flows` for (n_nodes,) or (n_nodes, k) injections."""
+        return _expand(self.residual, injections) * np.abs(injections).max(axis=0)
+
+    def rows(self, branches: np.ndarray) -> sp.csr_matrix:
+        """Stored PTDF rows of given (monitored) branches."""
+        return self.matrix[self.positions(branches)]
+
+    def positions(self, branches: np.ndarray) -> np.ndarray:
+        """Row positions of given branches."""
+        branches = np.asarray(branches, dtype=np.int64)
+        order = np.argsort(self.monitored)
+        index = np.searchsorted(self.monitored, branches, sorter=order)
+        found = index < order.size
+        found[found] = self.monitored[order[index[found]]] == branches[found]
+        if not found.all():
+            raise ValueError("PTDF rows of some branches are not stored")
+        return order[index]
+
+
+class SensitivityEngine:
+    """
+    PTDF / LODF computation on a compiled network.
+
+    The reduced susceptance matrix is factorized once and the factorization is
+    shared between engines built for the same topology (see `topology_hash`).
+    Sensitivities are computed only for the requested (monitored) branches, in
+    batches of `batch_size` rows, so the dense `(n_branches, n_nodes)` PTDF is
+    never materialized unless asked for.
+    """
+
+    def __init__(
+        self, network: CompiledNetwork, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        self.network = network
+        self.batch_size = batch_size
+        self.factorization = factorize(network)
+
+    def ptdf(
+        self, monitored: np.ndarray | None = None, dtype: np.dtype = np.float64
+    ) -> np.ndarray:
+        """PTDF rows `(len(monitored), n_nodes)` of monitored branches (all by default)."""
+        monitored = self._monitored(monitored)
+        result = np.empty((monitored.size, self.network.n_nodes), dtype=dtype)
+        for rows, batch in self.iter_ptdf(monitored, dtype=dtype):
+            result[rows] = batch
+        return result
+
+    def iter_ptdf(
+        self, monitored: np.ndarray | None = None, dtype: np.dtype = np.float64
+    ) -> Iterator[tuple[slice, np.ndarray]]:
+        """Yield (rows slice, PTDF rows batch) pairs for monitored branches."""
+        monitored = self._monitored(monitored)
+        for start in range(0, monitored.size, self.batch_size):
+            branches = monitored[start : start + self.batch_size]
+            rhs = self._incidence(branches) * self.network.susceptance[branches]
+            batch = self.factorization.solve(rhs).T
+            yield slice(start, start + branches.size), batch.astype(dtype, copy=False)
+
+    def sparse_ptdf(
+        self,
+        monitored: np.ndarray | None = None,
+        threshold: float = DEFAULT_PTDF_THRESHOLD,
+    ) -> SparsePTDF:
+        """
+        Truncated float32 CSR PTDF of monitored branches (all by default).
+
+        Rows are computed batch by batch and truncated right away, so peak
+        memory is one dense batch plus the sparse result.
+        """
+        monitored = self._monitored(monitored)
+        matrix, residual = _truncate(
+            self.iter_ptdf(monitored), monitored.size, self.network.n_nodes, threshold
+        )
+        return SparsePTDF(
+            matrix=matrix,
+            monitored=monitored,
+            threshold=threshold,
+            residual=residual,
+            offset=self.flows(np.zeros(self.network.n_nodes))[monitored],
+        )
+
+    def flows(self, injections: np.ndarray) -> np.ndarray:
+        """Branch flows for (n_nodes,) or (n_nodes, k) nodal injections."""
+        network = self.network
+        shift = _expand(network.shift_injections(), injections)
+        theta = self.factorization.solve(injections + shift)
+        delta = theta[network.branch_from] - theta[network.branch_to]
+        return _expand(network.susceptance, delta) * (
+            delta - _expand(network.phase_shift, delta)
+        )
+
+    def lodf(
+        self,
+        outages: np.ndarray,
+        monitored: np.ndarray | None = None,
+        ptdf: SparsePTDF | None = None,
+    ) -> np.ndarray:
+        """
+        Line outage distribution factors `(len(monitored), len(outages))`.
+
+        Entry `[m, k]` is the share of pre-outage flow on branch `outages[k]`
+        redistributed to branch `monitored[m]`. Outages splitting the network
+        (bridges) have undefined factors and are reported as NaN.
+
+        With a truncated `ptdf`, monitored branches default to its branches
+        and their PTDF rows are taken from it (the error of `[m, k]` is at most
+        `residual[m] / |1 - PTDF_kk|`); only outaged branches rows are solved.
+        """
+        if ptdf is not None and monitored is None:
+            monitored = ptdf.monitored
+        monitored = self._monitored(monitored)
+        outages = np.asarray(outages, dtype=np.int64)
+        # x[:, k] = B^-1 (e_from(k) - e_to(k)), shared by all monitored rows
+        a_k = self._incidence(outages)
+        x = self.factorization.solve(a_k)
+        network = self.network
+        if ptdf is None:
+            ptdf_mk = network.susceptance[monitored, None] * (
+                x[network.branch_from[monitored]] - x[network.branch_to[monitored]]
+            )
+        else:
+            ptdf_mk = ptdf.rows(monitored) @ a_k
+        ptdf_kk = network.susceptance[outages] * (
+            x[network.branch_from[outages], np.arange(outages.size)]
+            - x[network.branch_to[outages], np.arange(outages.size)]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denominator = 1.0 - ptdf_kk
+            lodf = ptdf_mk / np.where(np.isclose(denominator, 0.0), np.nan, denominator)
+        lodf[monitored[:, None] == outages[None, :]] = -1.0
+        return lodf
+
+    def outage_ptdf(
+        self,
+        outages: np.ndarray,
+        monitored: np.ndarray | None = None,
+        dtype: np.dtype = np.float64,
+    ) -> np.ndarray:
+        """
+        PTDF rows of monitored branches after simultaneous outage of given branches.
+
+        Uses the Sherman-Morrison-Woodbury identity on top of the base
+        factorization, so no refactorization is needed:
+        `B'^-1 = B^-1 + B^-1 A_k (diag(1 / b_k) - A_k' B^-1 A_k)^-1 A_k' B^-1`.
+        """
+        network = self.network
+        monitored = self._monitored(monitored)
+        outages = np.asarray(outages, dtype=np.int64)
+        a_k, x, capacitance = self._outage(outages)
+
+        # PTDF' = PTDF + (PTDF A_k) C^-1 x', where x = B^-1 A_k
+        correction = np.linalg.solve(capacitance, x.T)
+        result = np.empty((monitored.size, network.n_nodes), dtype=dtype)
+        for rows, batch in self.iter_ptdf(monitored):
+            batch = batch + (batch @ a_k) @ correction
+            batch[np.isin(monitored[rows], outages)] = 0.0
+            result[rows] = batch
+        return result
+
+    def sparse_outage_ptdf(self, outages: np.ndarray, ptdf: SparsePTDF) -> SparsePTDF:
+        """
+        Truncated PTDF of `ptdf` branches after simultaneous outage of given branches.
+
+        Post-outage rows are computed from the stored rows (as in
+        `outage_ptdf`, without solving for the base PTDF) and truncated at the
+        same threshold. The residual of a row is the propagated error of the
+        stored row plus the error of the new truncation.
+        """
+        network = self.network
+        outages = np.asarray(outages, dtype=np.int64)
+        a_k, x, capacitance = self._outage(outages)
+        correction = np.linalg.solve(capacitance, x.T)
+        outaged = np.isin(ptdf.monitored, outages)
+
+        def batches() -> Iterator[tuple[slice, np.ndarray]]:
+            for start in range(0, ptdf.monitored.size, self.batch_size):
+                rows = slice(start, start + self.batch_size)
+                batch = ptdf.matrix[rows].toarray().astype(np.float64)
+                batch += (batch @ a_k) @ correction
+                batch[outaged[rows]] = 0.0
+                yield rows, batch
+
+        matrix, residual = _truncate(
+            batches(), ptdf.monitored.size, network.n_nodes, ptdf.threshold
+        )
+        # error e of a stored row becomes e (I + A_k C^-1 x'), where only rows
+        # of A_k C^-1 x' at outaged branches ends are non zero
+        ends = np.unique(
+            np.concatenate([network.branch_from[outages], network.branch_to[outages]])
+        )
+        gain = np.abs(a_k[ends] @ correction).sum(axis=1).max(initial=0.0)
+        residual += np.where(outaged, 0.0, ptdf.residual * (1.0 + gain))
+
+        # exact flows at zero injections of the post-outage network
+        shift_flow = network.susceptance * network.phase_shift
+        shift_flow[outages] = 0.0
+        theta = self.factorization.solve(incidence_matrix(network).T @ shift_flow)
+        theta += x @ np.linalg.solve(capacitance, a_k.T @ theta)
+        monitored = ptdf.monitored
+        offset = network.susceptance[monitored] * (
+            theta[network.branch_from[monitored]]
+            - theta[network.branch_to[monitored]]
+            - network.phase_shift[monitored]
+        )
+        offset[outaged] = 0.0
+        return SparsePTDF(
+            matrix=matrix,
+            monitored=monitored,
+            threshold=ptdf.threshold,
+            residual=residual,
+            offset=offset,
+        )
+
+    def _outage(self, outages: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """`(A_k, B^-1 A_k, C)` of outaged branches, `C = diag(1 / b_k) - A_k' B^-1 A_k`."""
+        a_k = self._incidence(outages)
+        x = self.factorization.solve(a_k)
+        capacitance = np.diag(1.0 / self.network.susceptance[outages]) - a_k.T @ x
+        if np.linalg.matrix_rank(capacitance) < outages.size:
+            raise ValueError("given outages split the network into islands")
+        return a_k, x, capacitance
+
+    def _monitored(self, monitored: np.ndarray | None) -> np.ndarray:
+        if monitored is None:
+            return np.arange(self.network.n_branches)
+        return np.asarray(monitored, dtype=np.int64)
+
+    def _incidence(self, branches: np.ndarray) -> np.ndarray:
+        """Dense `(n_nodes, len(branches))` incidence columns `e_from - e_to`."""
+        columns = np.arange(branches.size)
+        incidence = np.zeros((self.network.n_nodes, branches.size))
+        incidence[self.network.branch_from[branches], columns] += 1.0
+        incidence[self.network.branch_to[branches], columns] -= 1.0
+        return incidence
+
+
+def factorize(network: CompiledNetwork) -> Factorization:
+    """Factorization of network susceptance matrix (cached by topology hash)."""
+    key = topology_hash(network)
+    with _factor_cache_lock:
+        if key in _factor_cache:
+            _factor_cache.move_to_end(key)
+            return _factor_cache[key]
+    factorization = Factorization(network)
+    with _factor_cache_lock:
+        _factor_cache[key] = factorization
+        if len(_factor_cache) > FACTOR_CACHE_SIZE:
+            _factor_cache.popitem(last=False)
+    return factorization
+
+
+def clear_factor_cache() -> None:
+    """Drop all cached factorizations."""
+    with _factor_cache_lock:
+        _factor_cache.clear()
+
+
+def topology_hash(network: CompiledNetwork) -> str:
+    """Hash of everything the susceptance matrix factorization depends on."""
+    digest = hashlib.sha1()
+    digest.update(np.int64(network.n_nodes).tobytes())
+    digest.update(np.int64(network.slack).tobytes())
+    for array in (network.branch_from, network.branch_to, network.susceptance):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def susceptance_matrix(network: CompiledNetwork) -> sp.csr_matrix:
+    """Nodal susceptance matrix `A' diag(b) A` as a sparse matrix."""
+    incidence = incidence_matrix(network)
+    return (incidence.T @ sp.diags(network.susceptance) @ incidence).tocsr()
+
+
+def incidence_matrix(network: CompiledNetwork) -> sp.csr_matrix:
+    """Sparse `(n_branches, n_nodes)` branch-node incidence matrix."""
+    n_branches = network.n_branches
+    rows = np.concatenate([np.arange(n_branches), np.arange(n_branches)])
+    cols = np.concatenate([network.branch_from, network.branch_to])
+    data = np.concatenate([np.ones(n_branches), -np.ones(n_branches)])
+    return sp.csr_matrix((data, (rows, cols)), shape=(n_branches, network.n_nodes))
+
+
+def islands(network: CompiledNetwork) -> np.ndarray:
+    """Island label of each node."""
+    adjacency = sp.csr_matrix(
+        (np.ones(network.n_branches), (network.branch_from, network.branch_to)),
+        shape=(network.n_nodes, network.n_nodes),
+    )
+    _, labels = connected_components(adjacency, directed=False)
+    return labels
+
+
+def reference_nodes(network: CompiledNetwork) -> np.ndarray:
+    """One angle reference node per island (the slack node within its island)."""
+    if network.n_nodes == 0:
+        return np.zeros(0, dtype=np.int64)
+    labels = islands(network)
+    order = np.argsort(labels, kind="stable")
+    first = order[np.r_[0, np.flatnonzero(np.diff(labels[order])) + 1]]
+    first[labels[first] == labels[network.slack]] = network.slack
+    return np.sort(first)
+
+
+def _truncate(
+    batches: Iterable[tuple[slice, np.ndarray]],
+    n_rows: int,
+    n_nodes: int,
+    threshold: float,
+) -> tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Float32 CSR matrix of rows batches without entries below `threshold`.
+
+    Returns the matrix and L1 norms of the rows approximation errors.
+    """
+    residual = np.empty(n_rows)
+    data, indices = [np.zeros(0, dtype=np.float32)], [np.zeros(0, dtype=np.int32)]
+    counts = [np.zeros(1, dtype=np.int64)]
+    for rows, batch in batches:
+        kept = np.abs(batch) >= threshold
+        values = batch.astype(np.float32)
+        error = np.where(kept, batch - values, batch)
+        residual[rows] = np.abs(error).sum(axis=1)
+        data.append(values[kept])
+        indices.append(np.nonzero(kept)[1].astype(np.int32))
+        counts.append(kept.sum(axis=1))
+    matrix = sp.csr_matrix(
+        (
+            np.concatenate(data),
+            np.concatenate(indices),
+            np.cumsum(np.concatenate(counts)),
+        ),
+        shape=(n_rows, n_nodes),
+    )
+    return matrix, residual
+
+
+def _expand(values: np.ndarray, like: np.ndarray) -> np.ndarray:
+    """Broadcast a 1D vector along trailing axes of `like`."""
+    return values.reshape(values.shape + (1,) * (like.ndim - 1))
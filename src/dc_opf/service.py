@@ -0,0 +1,234 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.dc_opf.lp import solve_lp
+from src.dc_opf.opt_model import InfeasibleModelError, write_state
+from src.dc_opf.template import DEFAULT_TEMPLATE_CACHE, ModelTemplate, TemplateCache
+from src.model.power_system_model import PowerSystemModel, SystemState
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT = 0.002
+"""Time [s] a request waits for others of the same structure before solving."""
+
+
+@dataclass
+class ServiceStats:
+    """Dispatch service instrumentation."""
+
+    requests: int = 0
+    coalesced: int = 0
+    """Requests answered by the solve of an identical pending request."""
+    batches: int = 0
+    """Batched (multi-snapshot) solves."""
+    snapshots: int = 0
+    """Snapshots solved."""
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.snapshots / self.batches if self.batches else 0.0
+
+
+@dataclass
+class _Batch:
+    """Pending requests of one structure."""
+
+    template: ModelTemplate
+    points: dict[bytes, int] = field(default_factory=dict)
+    demand: list[np.ndarray] = field(default_factory=list)
+    availability: list[np.ndarray] = field(default_factory=list)
+    futures: list[asyncio.Future] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+def batch_dc_opf(
+    template: ModelTemplate, demand: np.ndarray, availability: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Solve DC OPF of `k` snapshots of one structure as one linear program.
+
+    `demand` is (k x nodes), `availability` (k x generators) in network
+    positions. The template program is replicated block-diagonally; returns
+    (k x generators) generation, (k x branches) flows and (k x nodes) angles.
+    """
+    lp, network, k = template.lp, template.network, len(demand)
+    balance, generators = lp.rows["BalancingEquation"], lp.columns["Gen"]
+    decomposition = lp.rows["PowerGenerationCostDecomposition"]
+    p_max = availability * network.p_max
+    p_min = np.minimum(np.broadcast_to(network.p_min, p_max.shape), p_max)
+    row_lb = np.tile(lp.row_lb, (k, 1))
+    row_lb[:, balance] = demand
+    row_lb[:, decomposition] = p_min
+    col_lb, col_ub = np.tile(lp.col_lb, (k, 1)), np.tile(lp.col_ub, (k, 1))
+    col_lb[:, generators], col_ub[:, generators] = p_min, p_max
+    batch = type(lp)(
+        cost=np.tile(lp.cost, k),
+        matrix=sp.kron(sp.identity(k), lp.matrix, format="csr"),
+        row_lb=row_lb.ravel(),
+        row_ub=row_lb.ravel(),
+        col_lb=col_lb.ravel(),
+        col_ub=col_ub.ravel(),
+        columns=lp.columns,
+        rows=lp.rows,
+    )
+    x = solve_lp(batch).x.reshape(k, lp.n_cols)
+    return x[:, generators], x[:, lp.columns["Flow"]], x[:, lp.columns["Theta"]]
+
+
+class DispatchService:
+    """
+    Asyncio front end of the DC OPF coalescing concurrent requests.
+
+    Requests of the same structure (see `structure_hash`) arriving within
+    `max_wait` seconds are queued and solved together as one multi-snapshot
+    program (at most `max_batch_size` snapshots) in the executor pool;
+    identical requests share one snapshot. Every caller gets its own system
+    state. If a batch is infeasible, its snapshots are solved one by one, so
+    only callers of infeasible snapshots get `InfeasibleModelError`.
+    """
+
+    def __init__(
+        self,
+        templates: TemplateCache | None = None,
+        executor: Executor | None = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait: float = MAX_WAIT,
+    ) -> None:
+        self.templates = DEFAULT_TEMPLATE_CACHE if templates is None else templates
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = ServiceStats()
+        self._own_executor = executor is None
+        self._executor = ThreadPoolExecutor() if executor is None else executor
+        self._pending: dict[str, _Batch] = dict()
+        self._solving: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "DispatchService":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def dispatch(
+        self,
+        power_system_model: PowerSystemModel,
+        demand: pd.Series | None = None,
+        availability: pd.Series | None = None,
+    ) -> SystemState:
+        """
+        Optimal system state of the model with given nodes demand and available
+        fraction of generators P_max (missing entries keep the model values).
+        """
+        structure = power_system_model.parameters
+        template = self.templates.get(structure)
+        network = template.network
+        point_demand = structure.nodes["P_demand"].fillna(0.0).to_numpy(np.float64)
+        if demand is not None:
+            point_demand[_positions(network.node_ids, demand)] = demand.to_numpy()
+        point_availability = np.ones(network.n_generators)
+        if availability is not None:
+            positions = _positions(network.generator_ids, availability)
+            point_availability[positions] = availability.to_numpy()
+
+        self.stats.requests += 1
+        future = self._enqueue(template, point_demand, point_availability)
+        generation, flow, theta = await asyncio.shield(future)
+        state = SystemState.undefined_state(structure)
+        write_state(state, network, generation, flow, theta)
+        return state
+
+    async def close(self) -> None:
+        """Solve pending requests and shut the owned executor down."""
+        for key in list(self._pending):
+            self._flush(key)
+        if self._solving:
+            await asyncio.gather(*self._solving, return_exceptions=True)
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    def _enqueue(
+        self,
+        template: ModelTemplate,
+        demand: np.ndarray,
+        availability: np.ndarray,
+    ) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(template.key)
+        if batch is None:
+            batch = self._pending[template.key] = _Batch(template)
+            batch.timer = loop.call_later(self.max_wait, self._flush, template.key)
+
+        point = demand.tobytes() + availability.tobytes()
+        if point in batch.points:
+            self.stats.coalesced += 1
+            return batch.futures[batch.points[point]]
+        batch.points[point] = len(batch.futures)
+        batch.demand.append(demand)
+        batch.availability.append(availability)
+        batch.futures.append(loop.create_future())
+        future = batch.futures[-1]
+        if len(batch.futures) >= self.max_batch_size:
+            self._flush(template.key)
+        return future
+
+    def _flush(self, key: str) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._solve(batch))
+        self._solving.add(task)
+        task.add_done_callback(self._solving.discard)
+
+    async def _solve(self, batch: _Batch) -> None:
+        loop = asyncio.get_running_loop()
+        demand, availability = np.stack(batch.demand), np.stack(batch.availability)
+        self.stats.batches += 1
+        self.stats.snapshots += len(demand)
+        try:
+            results = await loop.run_in_executor(
+                self._executor, batch_dc_opf, batch.template, demand, availability
+            )
+        except InfeasibleModelError as error:
+            if len(demand) == 1:
+                _set_exception(batch.futures[0], error)
+                return
+            await asyncio.gather(
+                *(
+                    self._solve(
+                        _Batch(
+                            batch.template,
+                            demand=[demand[i]],
+                            availability=[availability[i]],
+                            futures=[future],
+                        )
+                    )
+                    for i, future in enumerate(batch.futures)
+                )
+            )
+            return
+        except Exception as error:
+            for future in batch.futures:
+                _set_exception(future, error)
+            return
+
+        for i, future in enumerate(batch.futures):
+            if not future.done():
+                future.set_result(tuple(result[i] for result in results))
+
+
+def _positions(index: pd.Index, values: pd.Series) -> np.ndarray:
+    positions = index.get_indexer(values.index)
+    if (positions < 0).any():
+        raise KeyError(f"unknown identifiers: {list(values.index[positions < 0])}")
+    return positions
+
+
+def _set_exception(future: asyncio.Future, error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
@@ -1,11 +1,12 @@
-from pyomo.environ import Set
+from pyomo.environ import RangeSet
 
 
 def indices(model) -> None:
-    """DC OPF Indexing Sets."""
-    model.N = Set(doc="Nodes index.")
-    model.L = Set(doc="Transmission lines index.")
-    model.G = Set(doc="Generators index.")
-
-    model.GxS = Set(dimen=2, doc="(Generator, Segments) pairs.")
-    model.G_GxS = Set(model.G, within=model.GxS, doc="g -> {(g, s): (g, s) in GxS}")
+    """DC OPF Indexing Sets (contiguous positions of the compiled network)."""
+    network = model.network
+    model.N = RangeSet(0, network.n_nodes - 1, doc="Nodes index.")
+    model.L = RangeSet(
+        0, network.n_branches - 1, doc="Branches (lines and transformers) index."
+    )
+    model.G = RangeSet(0, network.n_generators - 1, doc="Generators index.")
+    model.S = RangeSet(0, network.n_segments - 1, doc="Merit order segments index.")
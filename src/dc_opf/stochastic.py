@@ -0,0 +1,425 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.dc_opf.lp import (
+    LinearProgram,
+    named_blocks,
+    generators_incidence,
+    segments_incidence,
+    solve_lp,
+)
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import write_state
+from src.dc_opf.sensitivity import incidence_matrix
+from src.model.power_system_model import PowerSystemModel, SystemState
+
+DEFAULT_UPWARD_COST = 1.0
+DEFAULT_DOWNWARD_COST = 1.0
+
+
+@dataclass
+class ScenarioSet:
+    """Demand and generators availability scenarios."""
+
+    demand: pd.DataFrame
+    """Nodes demand [per unit] (scenarios x nodes), missing nodes keep base demand."""
+    availability: pd.DataFrame | None = None
+    """Available fraction of P_max (scenarios x generators), 1.0 if not given."""
+    probability: pd.Series | None = None
+    """Scenarios probabilities, uniform if not given."""
+
+    def __post_init__(self) -> None:
+        if self.probability is None:
+            self.probability = pd.Series(
+                np.full(len(self.demand), 1.0 / len(self.demand)),
+                index=self.demand.index,
+            )
+        probability = self.probability.to_numpy(dtype=np.float64)
+        if (probability < 0.0).any() or not np.isclose(probability.sum(), 1.0):
+            raise ValueError(
+                "scenarios probabilities must be non-negative and sum up to 1"
+            )
+
+    @property
+    def scenario_ids(self) -> pd.Index:
+        return self.demand.index
+
+    def demand_matrix(self, network: CompiledNetwork) -> np.ndarray:
+        """(scenarios x nodes) demand aligned with network positions."""
+        demand = self.demand.reindex(columns=network.node_ids).to_numpy(np.float64)
+        return np.where(np.isnan(demand), network.demand, demand)
+
+    def availability_matrix(self, network: CompiledNetwork) -> np.ndarray:
+        """(scenarios x generators) available fraction of P_max in network positions."""
+        if self.availability is None:
+            return np.ones((len(self.demand), network.n_generators))
+        availability = self.availability.reindex(
+            index=self.scenario_ids, columns=network.generator_ids
+        )
+        return availability.fillna(1.0).to_numpy(np.float64)
+
+
+@dataclass
+class StochasticResult:
+    """Two-stage stochastic DC OPF solution."""
+
+    first_stage: pd.Series
+    """Scheduled (first-stage) generation shared by all scenarios."""
+    power_generation: pd.DataFrame
+    """Generation after recourse (scenarios x generators)."""
+    power_flow: pd.DataFrame
+    """Branch flows (scenarios x branches)."""
+    theta: pd.DataFrame
+    """Nodes voltage angles (scenarios x nodes)."""
+    expected_cost: float
+    """Expected total (first-stage and recourse) cost."""
+    converged: bool = True
+    """
+    Indicates if progressive hedging met the tolerance. If not, recourse was
+    computed against scenario first stages, so it may not balance the system
+    with the averaged `first_stage`.
+    """
+    residual: float = 0.0
+    """Largest deviation of a scenario first-stage generation from the average."""
+
+    def state(self, power_system_model: PowerSystemModel, scenario) -> SystemState:
+        """System state in the given scenario."""
+        network = compile_network(power_system_model.parameters)
+        state = SystemState.undefined_state(power_system_model.parameters)
+        write_state(
+            state,
+            network,
+            self.power_generation.loc[scenario].to_numpy(),
+            self.power_flow.loc[scenario].to_numpy(),
+            self.theta.loc[scenario].to_numpy(),
+        )
+        return state
+
+
+class TwoStageProgram:
+    """
+    Two-stage stochastic DC OPF in matrix form.
+
+    First stage columns `[Gen, GenS]` (scheduled generation and its merit
+    order decomposition) are shared by all scenarios. Each scenario has its
+    own block of `[Flow, Theta, Up, Down]` columns, where `Up` / `Down` are
+    recourse (redispatch) adjustments of the schedule. The scenario block does
+    not depend on the scenario, so the deterministic equivalent is assembled
+    by replicating it with sparse Kronecker products; scenarios differ only in
+    the right hand side (demand and available capacity).
+    """
+
+    def __init__(
+        self,
+        network: CompiledNetwork,
+        upward_cost: float = DEFAULT_UPWARD_COST,
+        downward_cost: float = DEFAULT_DOWNWARD_COST,
+    ) -> None:
+        self.network = network
+        n_gen, n_seg = network.n_generators, network.n_segments
+        n_branch, n_node = network.n_branches, network.n_nodes
+        self.first_stage = named_blocks(Gen=n_gen, GenS=n_seg)
+        self.second_stage = named_blocks(
+            Flow=n_branch, Theta=n_node, Up=n_gen, Down=n_gen
+        )
+        self.scenario_rows = named_blocks(
+            PowerFlowEquation=n_branch, BalancingEquation=n_node, GenerationBounds=n_gen
+        )
+
+        incidence = incidence_matrix(network)
+        gen_at_node = generators_incidence(network)
+        identity = sp.identity(n_gen)
+        # first stage rows: Gen - sum(GenS) = P_min
+        self.decomposition = sp.hstack(
+            [identity, -segments_incidence(network)], format="csr"
+        )
+        # scenario rows coupling with the first stage: Gen in balance and bounds rows
+        self.technology = sp.bmat(
+            [
+                [sp.csr_matrix((n_branch, n_gen)), None],
+                [gen_at_node, sp.csr_matrix((n_node, n_seg))],
+                [identity, None],
+            ],
+            format="csr",
+        )
+        # scenario block: flow equations, balance and generation bounds
+        self.recourse = sp.bmat(
+            [
+                [
+                    sp.identity(n_branch),
+                    -sp.diags(network.susceptance) @ incidence,
+                    None,
+                    None,
+                ],
+                [-incidence.T, None, gen_at_node, -gen_at_node],
+                [None, None, identity, -identity],
+            ],
+            format="csr",
+        )
+        self.first_stage_cost = np.concatenate([np.zeros(n_gen), network.seg_cost])
+        self.recourse_cost = np.concatenate(
+            [
+                np.zeros(n_branch + n_node),
+                np.full(n_gen, upward_cost),
+                np.full(n_gen, downward_cost),
+            ]
+        )
+
+    @property
+    def n_first_stage(self) -> int:
+        return self.decomposition.shape[1]
+
+    @property
+    def n_second_stage(self) -> int:
+        return self.recourse.shape[1]
+
+    def scenario_bounds(
+        self, demand: np.ndarray, availability: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Scenario rows bounds for (k, n_nodes) demand and (k, n_gen) availability."""
+        network = self.network
+        k = len(demand)
+        shift = np.tile(-network.susceptance * network.phase_shift, (k, 1))
+        p_max = availability * network.p_max
+        p_min = np.minimum(np.broadcast_to(network.p_min, p_max.shape), p_max)
+        row_lb = np.hstack([shift, demand, p_min])
+        row_ub = np.hstack([shift, demand, p_max])
+        return row_lb, row_ub
+
+    def first_stage_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        network = self.network
+        col_lb = np.concatenate([network.p_min, np.zeros(network.n_segments)])
+        col_ub = np.concatenate([network.p_max, network.seg_end - network.seg_start])
+        return col_lb, col_ub
+
+    def second_stage_bounds(self, k: int) -> tuple[np.ndarray, np.ndarray]:
+        network = self.network
+        theta_lb = np.full(network.n_nodes, -np.inf)
+        theta_ub = np.full(network.n_nodes, np.inf)
+        if network.n_nodes > 0:
+            theta_lb[network.slack] = theta_ub[network.slack] = 0.0
+        col_lb = np.concatenate(
+            [network.f_min, theta_lb, np.zeros(2 * network.n_generators)]
+        )
+        col_ub = np.concatenate(
+            [network.f_max, theta_ub, np.full(2 * network.n_generators, np.inf)]
+        )
+        return np.tile(col_lb, k), np.tile(col_ub, k)
+
+    def deterministic_equivalent(
+        self, demand: np.ndarray, availability: np.ndarray, probability: np.ndarray
+    ) -> LinearProgram:
+        """Extensive form over all scenarios (block-angular linear program)."""
+        k = len(probability)
+        matrix = sp.bmat(
+            [
+                [
+                    self.decomposition,
+                    sp.csr_matrix(
+                        (self.decomposition.shape[0], k * self.n_second_stage)
+                    ),
+                ],
+                [
+                    sp.kron(np.ones((k, 1)), self.technology),
+                    sp.kron(sp.identity(k), self.recourse),
+                ],
+            ],
+            format="csr",
+        )
+        row_lb, row_ub = self.scenario_bounds(demand, availability)
+        first_lb, first_ub = self.first_stage_bounds()
+        second_lb, second_ub = self.second_stage_bounds(k)
+        pmin = self.network.p_min
+        return LinearProgram(
+            cost=np.concatenate(
+                [self.first_stage_cost, np.kron(probability, self.recourse_cost)]
+            ),
+            matrix=matrix,
+            row_lb=np.concatenate([pmin, row_lb.ravel()]),
+            row_ub=np.concatenate([pmin, row_ub.ravel()]),
+            col_lb=np.concatenate([first_lb, second_lb]),
+            col_ub=np.concatenate([first_ub, second_ub]),
+            columns=named_blocks(
+                FirstStage=self.n_first_stage, SecondStage=k * self.n_second_stage
+            ),
+            rows=named_blocks(
+                PowerGenerationCostDecomposition=len(pmin), Scenarios=row_lb.size
+            ),
+        )
+
+    def scenario_subproblem(self) -> LinearProgram:
+        """
+        Single scenario problem `[Gen, GenS, Flow, Theta, Up, Down]` (full recourse cost).
+
+        Scenario data is set by overwriting rows bounds of the `Scenarios` block.
+        """
+        network = self.network
+        return self.deterministic_equivalent(
+            network.demand[None, :], np.ones((1, network.n_generators)), np.ones(1)
+        )
+
+
+def stochastic_dc_opf(
+    power_system_model: PowerSystemModel,
+    scenarios: ScenarioSet,
+    upward_cost: float = DEFAULT_UPWARD_COST,
+    downward_cost: float = DEFAULT_DOWNWARD_COST,
+    progressive_hedging: bool = False,
+    rho: float = 1.0,
+    tolerance: float = 1e-4,
+    max_iterations: int = 200,
+    max_workers: int | None = None,
+) -> StochasticResult:
+    """
+    Solve two-stage stochastic DC OPF over given scenarios.
+
+    By default the deterministic equivalent is solved at once. With
+    `progressive_hedging` set, scenario subproblems are solved in parallel
+    processes and coordinated by the progressive hedging algorithm until the
+    first-stage decisions of all scenarios agree within `tolerance` (or
+    `max_iterations` is reached, see `StochasticResult.converged`).
+    """
+    network = compile_network(power_system_model.parameters)
+    program = TwoStageProgram(network, upward_cost, downward_cost)
+    demand = scenarios.demand_matrix(network)
+    availability = scenarios.availability_matrix(network)
+    probability = scenarios.probability.to_numpy(dtype=np.float64)
+
+    if progressive_hedging:
+        first_stage, second_stage, residual = _progressive_hedging(
+            program,
+            demand,
+            availability,
+            probability,
+            rho,
+            tolerance,
+            max_iterations,
+            max_workers,
+        )
+    else:
+        lp = program.deterministic_equivalent(demand, availability, probability)
+        x = solve_lp(lp).x
+        first_stage = x[lp.columns["FirstStage"]]
+        second_stage = x[lp.columns["SecondStage"]].reshape(len(probability), -1)
+
+    result = _result(program, scenarios, first_stage, second_stage, probability)
+    if progressive_hedging:
+        result.converged, result.residual = residual < tolerance, residual
+    return result
+
+
+def _progressive_hedging(
+    program: TwoStageProgram,
+    demand: np.ndarray,
+    availability: np.ndarray,
+    probability: np.ndarray,
+    rho: float,
+    tolerance: float,
+    max_iterations: int,
+    max_workers: int | None,
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """First stage, scenario second stages and the final nonanticipativity residual."""
+    k, gen = len(probability), program.first_stage["Gen"]
+    weights = np.zeros((k, gen.stop))
+    x_bar = None
+    # forking a process with polars threads running may deadlock
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(program,),
+    ) as executor:
+        for _ in range(max_iterations):
+            solutions = np.array(
+                list(
+                    executor.map(
+                        _solve_subproblem,
+                        demand,
+                        availability,
+                        weights,
+                        [x_bar] * k,
+                        [rho] * k,
+                    )
+                )
+            )
+            x_gen = solutions[:, gen]
+            x_bar = probability @ x_gen
+            weights += rho * (x_gen - x_bar)
+            residual = float(np.abs(x_gen - x_bar).max(initial=0.0))
+            if residual < tolerance:
+                break
+
+    first_stage = probability @ solutions[:, : program.n_first_stage]
+    return first_stage, solutions[:, program.n_first_stage :], residual
+
+
+_worker_program: TwoStageProgram | None = None
+_worker_subproblem: LinearProgram | None = None
+
+
+def _init_worker(program: TwoStageProgram) -> None:
+    global _worker_program, _worker_subproblem
+    _worker_program = program
+    _worker_subproblem = program.scenario_subproblem()
+
+
+def _solve_subproblem(
+    demand: np.ndarray,
+    availability: np.ndarray,
+    weights: np.ndarray,
+    x_bar: np.ndarray | None,
+    rho: float,
+) -> np.ndarray:
+    """Scenario subproblem with PH terms `w'x + rho / 2 * |x - x_bar|^2` on `Gen`."""
+    row_lb, row_ub = _worker_program.scenario_bounds(
+        demand[None, :], availability[None, :]
+    )
+    rows = _worker_subproblem.rows["Scenarios"]
+    lp = replace(_worker_subproblem, cost=_worker_subproblem.cost.copy())
+    lp.row_lb, lp.row_ub = lp.row_lb.copy(), lp.row_ub.copy()
+    lp.row_lb[rows], lp.row_ub[rows] = row_lb.ravel(), row_ub.ravel()
+    gen = _worker_program.first_stage["Gen"]
+    if x_bar is None:
+        return solve_lp(lp).x
+    lp.cost[gen] += weights - rho * x_bar
+    hessian = np.zeros(lp.n_cols)
+    hessian[gen] = rho
+    return solve_lp(lp, hessian_diagonal=hessian).x
+
+
+def _result(
+    program: TwoStageProgram,
+    scenarios: ScenarioSet,
+    first_stage: np.ndarray,
+    second_stage: np.ndarray,
+    probability: np.ndarray,
+) -> StochasticResult:
+    network, blocks = program.network, program.second_stage
+    scheduled = first_stage[program.first_stage["Gen"]]
+    generation = (
+        scheduled + second_stage[:, blocks["Up"]] - second_stage[:, blocks["Down"]]
+    )
+    expected_cost = first_stage @ program.first_stage_cost + probability @ (
+        second_stage @ program.recourse_cost
+    )
+    index = scenarios.scenario_ids
+    return StochasticResult(
+        first_stage=pd.Series(
+            scheduled, index=network.generator_ids, name="Power Generation"
+        ),
+        power_generation=pd.DataFrame(
+            generation, index=index, columns=network.generator_ids
+        ),
+        power_flow=pd.DataFrame(
+            second_stage[:, blocks["Flow"]], index=index, columns=network.branch_ids
+        ),
+        theta=pd.DataFrame(
+            second_stage[:, blocks["Theta"]], index=index, columns=network.node_ids
+        ),
+        expected_cost=float(expected_cost),
+    )
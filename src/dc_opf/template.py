@@ -0,0 +1,245 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.dc_opf.lp import LinearProgram, dc_opf_lp, solve_lp
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import write_state
+from src.dc_opf.sensitivity import Factorization, factorize
+from src.model.power_system_model import PowerSystemModel, SystemStructure
+
+TEMPLATE_CACHE_SIZE = 16
+
+_INDEX_SLOTS = ("node_ids", "line_ids", "trafo_ids", "generator_ids")
+_LP_ARRAYS = ("cost", "row_lb", "row_ub", "col_lb", "col_ub")
+
+
+def structure_hash(structure: SystemStructure) -> str:
+    """Hash of everything except nodes demand the DC OPF structure depends on."""
+    digest = hashlib.sha1()
+    nodes = structure.nodes.drop(columns="P_demand", errors="ignore")
+    for df in (
+        nodes,
+        structure.tramsmission_lines,
+        structure.transformers,
+        structure.generators,
+        structure.marginal_costs,
+    ):
+        digest.update(repr(list(df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class ModelTemplate:
+    """
+    Demand independent part of the DC OPF.
+
+    Holds the compiled network (index maps, branch and generator arrays, merit
+    order segments) and the DC OPF linear program (sparse constraint matrix,
+    bounds and blocks layout). Instances share template arrays, only demand
+    vectors are filled.
+    """
+
+    key: str
+    """Structure hash of the template."""
+    network: CompiledNetwork
+    """Compiled network (with zero demand)."""
+    lp: LinearProgram
+    """DC OPF linear program (with zero demand)."""
+
+    @classmethod
+    def compile(cls, structure: SystemStructure, key: str | None = None) -> Self:
+        network = compile_network(structure)
+        network.demand = np.zeros(network.n_nodes)
+        return cls(
+            key=structure_hash(structure) if key is None else key,
+            network=network,
+            lp=dc_opf_lp(network),
+        )
+
+    @property
+    def factorization(self) -> Factorization:
+        """Susceptance matrix factorization (built once per topology)."""
+        return factorize(self.network)
+
+    def instantiate(
+        self, structure: SystemStructure
+    ) -> tuple[CompiledNetwork, LinearProgram]:
+        """Network and linear program of the structure with its nodes demand."""
+        demand = structure.nodes["P_demand"].fillna(0.0).to_numpy(dtype=np.float64)
+        network = CompiledNetwork(
+            **{name: getattr(self.network, name) for name in CompiledNetwork.__slots__}
+        )
+        network.demand = demand
+        balance = self.lp.rows["BalancingEquation"]
+        row_lb, row_ub = np.array(self.lp.row_lb), np.array(self.lp.row_ub)
+        row_lb[balance] = row_ub[balance] = demand
+        return network, replace(self.lp, row_lb=row_lb, row_ub=row_ub)
+
+    def save(self, directory: str | os.PathLike) -> None:
+        """
+        Save template arrays as `.npy` files (memory mappable on load).
+
+        Files are written to a temporary directory next to `directory`, which
+        is then renamed to `directory`. A complete saved template is never
+        overwritten, so other processes may keep its arrays memory mapped.
+        """
+        directory = Path(directory)
+        if (directory / "meta.pkl").exists():
+            return
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(
+            tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent)
+        )
+        try:
+            self._write(staging)
+            try:
+                os.replace(staging, directory)
+            except OSError:
+                # saved by another process meanwhile or left incomplete
+                if (directory / "meta.pkl").exists():
+                    return
+                shutil.rmtree(directory)
+                os.replace(staging, directory)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _write(self, directory: Path) -> None:
+        meta = {"key": self.key, "slack": self.network.slack}
+        for name in CompiledNetwork.__slots__:
+            if name in _INDEX_SLOTS:
+                meta[name] = getattr(self.network, name)
+            elif name != "slack":
+                np.save(directory / f"network.{name}.npy", getattr(self.network, name))
+        matrix = self.lp.matrix.tocsr()
+        for name, array in (
+            ("data", matrix.data),
+            ("indices", matrix.indices),
+            ("indptr", matrix.indptr),
+        ):
+            np.save(directory / f"lp.matrix.{name}.npy", array)
+        for name in _LP_ARRAYS:
+            np.save(directory / f"lp.{name}.npy", getattr(self.lp, name))
+        meta.update(shape=matrix.shape, columns=self.lp.columns, rows=self.lp.rows)
+        with open(directory / "meta.pkl", "wb") as file:
+            pickle.dump(meta, file)
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike, mmap_mode: str | None = "r") -> Self:
+        """Load a saved template (arrays memory mapped by default)."""
+        directory = Path(directory)
+        with open(directory / "meta.pkl", "rb") as file:
+            meta = pickle.load(file)
+
+        def array(name: str) -> np.ndarray:
+            return np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+
+        network = CompiledNetwork(
+            **{
+                name: (
+                    meta[name]
+                    if name in _INDEX_SLOTS or name == "slack"
+                    else array(f"network.{name}")
+                )
+                for name in CompiledNetwork.__slots__
+            }
+        )
+        matrix = sp.csr_matrix(
+            (
+                array("lp.matrix.data"),
+                array("lp.matrix.indices"),
+                array("lp.matrix.indptr"),
+            ),
+            shape=meta["shape"],
+        )
+        lp = LinearProgram(
+            matrix=matrix,
+            columns=meta["columns"],
+            rows=meta["rows"],
+            **{name: array(f"lp.{name}") for name in _LP_ARRAYS},
+        )
+        return cls(key=meta["key"], network=network, lp=lp)
+
+
+class TemplateCache:
+    """
+    Two tier cache of model templates keyed by structure hash.
+
+    The in-memory tier keeps `maxsize` recently used templates (LRU); the
+    optional on-disk tier keeps every compiled template in `directory` as
+    memory mappable arrays, so other processes and later runs skip compilation.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = TEMPLATE_CACHE_SIZE,
+        directory: str | os.PathLike | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.directory = None if directory is None else Path(directory)
+        self.memory_hits = self.disk_hits = self.misses = 0
+        self._templates: OrderedDict[str, ModelTemplate] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, structure: SystemStructure) -> ModelTemplate:
+        """Template of the structure (compiled only if not cached in any tier)."""
+        key = structure_hash(structure)
+        with self._lock:
+            if key in self._templates:
+                self._templates.move_to_end(key)
+                self.memory_hits += 1
+                return self._templates[key]
+
+        path = None if self.directory is None else self.directory / key
+        if path is not None and (path / "meta.pkl").exists():
+            template = ModelTemplate.load(path)
+            hit = "disk_hits"
+        else:
+            template = ModelTemplate.compile(structure, key)
+            if path is not None:
+                template.save(path)
+            hit = "misses"
+
+        with self._lock:
+            setattr(self, hit, getattr(self, hit) + 1)
+            self._templates[key] = template
+            if len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        return template
+
+    def clear(self) -> None:
+        """Drop in-memory templates (on-disk templates are kept)."""
+        with self._lock:
+            self._templates.clear()
+
+
+DEFAULT_TEMPLATE_CACHE = TemplateCache()
+
+
+def template_dc_opf(
+    power_system_model: PowerSystemModel, cache: TemplateCache | None = None
+) -> None:
+    """Solve DC OPF on a model instantiated from a cached template."""
+    cache = DEFAULT_TEMPLATE_CACHE if cache is None else cache
+    template = cache.get(power_system_model.parameters)
+    network, lp = template.instantiate(power_system_model.parameters)
+    x = solve_lp(lp).x
+    write_state(
+        power_system_model.state,
+        network,
+        x[lp.columns["Gen"]],
+        x[lp.columns["Flow"]],
+        x[lp.columns["Theta"]],
+    )
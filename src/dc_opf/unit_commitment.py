@@ -0,0 +1,421 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.dc_opf.lp import LinearProgram, dc_opf_lp, highs_lp, named_blocks, solve_lp
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import InfeasibleModelError, write_state
+from src.model.power_system_model import PowerSystemModel, SystemState
+from src.model.time_series import TimeSeriesData
+
+DEFAULT_MIP_GAP = 1e-3
+DEFAULT_TIME_LIMIT = 600.0
+ROUNDING_THRESHOLD = 0.5
+
+COMMITMENT_COLUMNS = {
+    "min_up": 1,
+    "min_down": 1,
+    "startup_cost": 0.0,
+    "no_load_cost": 0.0,
+    "initial_status": 1,
+}
+
+
+@dataclass
+class CommitmentData:
+    """Unit commitment parameters of committable generators."""
+
+    generators: pd.DataFrame
+    """
+    Committable generators (indexed by generator_id) with optional columns
+    `min_up` / `min_down` (minimal up / down time [time steps]), `startup_cost`,
+    `no_load_cost` (cost per time step online) and `initial_status` (1 if on
+    before the horizon). Other generators are online in every time step.
+    """
+
+    def __post_init__(self) -> None:
+        generators = self.generators.copy()
+        for column, default in COMMITMENT_COLUMNS.items():
+            if column not in generators.columns:
+                generators[column] = default
+            generators[column] = generators[column].fillna(default)
+        self.generators = generators[list(COMMITMENT_COLUMNS)]
+        times = generators[["min_up", "min_down"]].to_numpy(dtype=np.float64)
+        if (times < 1).any() or (times != np.round(times)).any():
+            raise ValueError("min_up and min_down must be positive integers")
+        costs = generators[["startup_cost", "no_load_cost"]].to_numpy(np.float64)
+        if (costs < 0).any() or not np.isfinite(costs).all():
+            raise ValueError("startup_cost and no_load_cost must be finite and >= 0")
+        if not generators["initial_status"].isin([0, 1]).all():
+            raise ValueError("initial_status must be 0 or 1")
+
+    def positions(self, network: CompiledNetwork) -> np.ndarray:
+        """Positions of committable generators in the network."""
+        positions = network.generator_ids.get_indexer(self.generators.index)
+        if (positions < 0).any():
+            raise ValueError("unit commitment data of unknown generators")
+        return positions
+
+    def column(self, name: str) -> np.ndarray:
+        return self.generators[name].to_numpy(dtype=np.float64)
+
+
+@dataclass
+class CommitmentResult:
+    """Unit commitment solution over a time horizon."""
+
+    commitment: pd.DataFrame
+    """On / off status of committable generators (time steps x generators)."""
+    startup: pd.DataFrame
+    """Start-ups of committable generators (time steps x generators)."""
+    power_generation: pd.DataFrame
+    """Generation (time steps x generators)."""
+    power_flow: pd.DataFrame
+    """Branch flows (time steps x branches)."""
+    theta: pd.DataFrame
+    """Nodes voltage angles (time steps x nodes)."""
+    cost: float
+    """Total (generation, no-load and start-up) cost."""
+    relaxation_cost: float
+    """Cost of the LP relaxation (a lower bound)."""
+    mip_gap: float
+    """Relative MIP gap of the solution."""
+    status: str
+    """Solver status (optimal or a reached limit)."""
+
+    def state(self, power_system_model: PowerSystemModel, step) -> SystemState:
+        """System state in the given time step."""
+        network = compile_network(power_system_model.parameters)
+        state = SystemState.undefined_state(power_system_model.parameters)
+        write_state(
+            state,
+            network,
+            self.power_generation.loc[step].to_numpy(),
+            self.power_flow.loc[step].to_numpy(),
+            self.theta.loc[step].to_numpy(),
+        )
+        return state
+
+
+class UnitCommitmentProgram:
+    """
+    Multi-period DC OPF with unit commitment as a mixed integer linear program.
+
+    Each time step has its own block of DC OPF columns `[Gen, GenS, Flow,
+    Theta]` and rows (the `dc_opf_lp` formulation replicated with sparse
+    Kronecker products). Committable generators get the tight 3-binary
+    formulation with on (`U`), start-up (`V`) and shut-down (`W`) columns:
+
+    * U[t] - U[t-1] - V[t] + W[t] = 0 (`CommitmentLogic`),
+    * Gen[t] - P_min U[t] - sum(GenS[t]) = 0 (the generation cost decomposition),
+    * Gen[t] - availability[t] P_max U[t] <= 0 (`GenerationCapacity`),
+    * sum(V[t - min_up + 1 .. t]) - U[t] <= 0 (`MinUpTime`),
+    * sum(W[t - min_down + 1 .. t]) + U[t] <= 1 (`MinDownTime`).
+
+    Minimal up / down windows do not extend before the horizon.
+    """
+
+    def __init__(
+        self, network: CompiledNetwork, commitment: CommitmentData, n_steps: int
+    ) -> None:
+        self.network, self.n_steps = network, n_steps
+        self.committed = commitment.positions(network)
+        self.period = dc_opf_lp(network)
+        n_c, n_period = len(self.committed), self.period.n_cols
+        self.columns = named_blocks(
+            Periods=n_steps * n_period,
+            U=n_steps * n_c,
+            V=n_steps * n_c,
+            W=n_steps * n_c,
+        )
+        self.rows = named_blocks(
+            Periods=n_steps * self.period.n_rows,
+            GenerationCapacity=n_steps * n_c,
+            CommitmentLogic=n_steps * n_c,
+            MinUpTime=n_steps * n_c,
+            MinDownTime=n_steps * n_c,
+        )
+        self.initial_status = commitment.column("initial_status")
+        self.min_up = commitment.column("min_up").astype(np.int64)
+        self.min_down = commitment.column("min_down").astype(np.int64)
+        self.startup_cost = commitment.column("startup_cost")
+        self.no_load_cost = commitment.column("no_load_cost")
+
+    @property
+    def integer_columns(self) -> np.ndarray:
+        return np.arange(self.columns["U"].start, self.columns["W"].stop)
+
+    def program(self, demand: np.ndarray, availability: np.ndarray) -> LinearProgram:
+        """
+        Linear program (the relaxation) for (time steps x nodes) demand and
+        (time steps x generators) availability.
+        """
+        network, period = self.network, self.period
+        t, n_c = self.n_steps, len(self.committed)
+        p_max = availability * network.p_max
+        p_min = np.minimum(np.broadcast_to(network.p_min, p_max.shape), p_max)
+
+        # period rows and bounds
+        balance = period.rows["BalancingEquation"]
+        decomposition = period.rows["PowerGenerationCostDecomposition"]
+        row_lb = np.tile(period.row_lb, (t, 1))
+        row_lb[:, balance] = demand
+        row_lb[:, decomposition] = p_min
+        row_lb[:, decomposition.start + self.committed] = 0.0
+        row_ub = row_lb.copy()
+        gen = period.columns["Gen"]
+        col_lb, col_ub = np.tile(period.col_lb, (t, 1)), np.tile(period.col_ub, (t, 1))
+        col_lb[:, gen], col_ub[:, gen] = p_min, p_max
+        col_lb[:, gen.start + self.committed] = np.minimum(
+            network.p_min[self.committed], 0.0
+        )
+        col_ub[:, gen.start + self.committed] = np.maximum(
+            network.p_max[self.committed], 0.0
+        )
+
+        # committed generators coupling with periods
+        steps = np.repeat(np.arange(t), n_c)
+        units = np.tile(np.arange(n_c), t)
+        generators = self.committed[units]
+        u = np.arange(t * n_c)
+        decomposition_rows = steps * period.n_rows + decomposition.start + generators
+        gen_columns = steps * period.n_cols + gen.start + generators
+        n_periods = self.columns["Periods"].stop
+        coupling = sp.csr_matrix(
+            (-network.p_min[generators], (decomposition_rows, u)),
+            shape=(self.rows["Periods"].stop, t * n_c),
+        )
+        capacity = sp.csr_matrix(
+            (np.ones(t * n_c), (u, gen_columns)), shape=(t * n_c, n_periods)
+        )
+        capacity_u = sp.diags(-p_max[steps, generators])
+        identity = sp.identity(t * n_c, format="csr")
+        previous = sp.kron(sp.eye(t, k=-1), sp.identity(n_c), format="csr")
+        no_periods = sp.csr_matrix((t * n_c, n_periods))
+
+        matrix = sp.bmat(
+            [
+                [sp.kron(sp.identity(t), period.matrix), coupling, None, None],
+                [capacity, capacity_u, None, None],
+                [no_periods, identity - previous, -identity, identity],
+                [
+                    no_periods,
+                    -identity,
+                    _window_sum(t, self.min_up),
+                    sp.csr_matrix((t * n_c, t * n_c)),
+                ],
+                [
+                    no_periods,
+                    identity,
+                    sp.csr_matrix((t * n_c, t * n_c)),
+                    _window_sum(t, self.min_down),
+                ],
+            ],
+            format="csr",
+        )
+
+        logic = np.zeros(t * n_c)
+        logic[:n_c] = self.initial_status
+        zeros, ones = np.zeros(t * n_c), np.ones(t * n_c)
+        binaries = 3 * t * n_c
+        return LinearProgram(
+            cost=np.concatenate(
+                [
+                    np.tile(period.cost, t),
+                    np.tile(self.no_load_cost, t),
+                    np.tile(self.startup_cost, t),
+                    zeros,
+                ]
+            ),
+            matrix=matrix,
+            row_lb=np.concatenate(
+                [row_lb.ravel(), np.full(t * n_c, -np.inf), logic]
+                + [np.full(t * n_c, -np.inf)] * 2
+            ),
+            row_ub=np.concatenate([row_ub.ravel(), zeros, logic, zeros, ones]),
+            col_lb=np.concatenate([col_lb.ravel(), np.zeros(binaries)]),
+            col_ub=np.concatenate([col_ub.ravel(), np.ones(binaries)]),
+            columns=self.columns,
+            rows=self.rows,
+        )
+
+    def rounded_commitment(self, relaxed: np.ndarray) -> np.ndarray:
+        """
+        (time steps x committable generators) commitment rounded from the
+        relaxation and repaired to respect minimal up / down times.
+        """
+        wanted = relaxed >= ROUNDING_THRESHOLD
+        status = self.initial_status.astype(bool)
+        # the history before the horizon is not modelled
+        in_state = np.full(len(status), np.iinfo(np.int64).max // 2)
+        commitment = np.empty_like(wanted)
+        for step in range(self.n_steps):
+            minimal = np.where(status, self.min_up, self.min_down)
+            switch = (wanted[step] != status) & (in_state >= minimal)
+            status = np.where(switch, ~status, status)
+            in_state = np.where(switch, 1, in_state + 1)
+            commitment[step] = status
+        return commitment
+
+    def transitions(self, commitment: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Start-ups and shut-downs of a (time steps x generators) commitment."""
+        previous = np.vstack([self.initial_status[None, :], commitment[:-1]])
+        change = commitment.astype(np.float64) - previous
+        return np.maximum(change, 0.0), np.maximum(-change, 0.0)
+
+
+def unit_commitment(
+    power_system_model: PowerSystemModel,
+    time_series: TimeSeriesData,
+    commitment: CommitmentData,
+    mip_gap: float = DEFAULT_MIP_GAP,
+    time_limit: float = DEFAULT_TIME_LIMIT,
+    warm_start: bool = True,
+) -> CommitmentResult:
+    """
+    Solve multi-period DC OPF with unit commitment of given generators.
+
+    The LP relaxation (the same program without integrality) is solved
+    first; with `warm_start` its commitment, rounded and repaired to respect
+    minimal up / down times, seeds the MILP (HiGHS completes the continuous
+    part). The MILP stops at the relative `mip_gap` or after `time_limit`
+    seconds, returning the best solution found.
+    """
+    network = compile_network(power_system_model.parameters)
+    demand = _demand_matrix(time_series, network)
+    availability = _availability_matrix(time_series, network)
+    program = UnitCommitmentProgram(network, commitment, len(demand))
+    lp = program.program(demand, availability)
+
+    relaxation = solve_lp(lp)
+    start = None
+    if warm_start:
+        shape = (program.n_steps, len(program.committed))
+        u = program.rounded_commitment(relaxation.x[lp.columns["U"]].reshape(shape))
+        v, w = program.transitions(u)
+        start = np.concatenate([u.ravel(), v.ravel(), w.ravel()])
+
+    x, objective, gap, status = _solve_milp(
+        lp, program.integer_columns, start, mip_gap, time_limit
+    )
+    return _result(
+        program, time_series.time, x, objective, relaxation.objective, gap, status
+    )
+
+
+def _solve_milp(
+    lp: LinearProgram,
+    integer_columns: np.ndarray,
+    start: np.ndarray | None,
+    mip_gap: float,
+    time_limit: float,
+) -> tuple[np.ndarray, float, float, str]:
+    import highspy
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.setOptionValue("mip_rel_gap", mip_gap)
+    highs.setOptionValue("time_limit", float(time_limit))
+    model = highs_lp(lp)
+    integrality = np.full(lp.n_cols, highspy.HighsVarType.kContinuous)
+    integrality[integer_columns] = highspy.HighsVarType.kInteger
+    model.integrality_ = list(integrality)
+    highs.passModel(model)
+    if start is not None:
+        highs.setSolution(len(integer_columns), integer_columns.astype(np.int32), start)
+    highs.run()
+
+    status = highs.getModelStatus()
+    info = highs.getInfo()
+    feasible = highspy.SolutionStatus.kSolutionStatusFeasible
+    if (
+        status != highspy.HighsModelStatus.kOptimal
+        and info.primal_solution_status != feasible
+    ):
+        raise InfeasibleModelError(
+            f"unit commitment computation crashed, solver terminated with: "
+            f"{highs.modelStatusToString(status)}"
+        )
+    return (
+        np.asarray(highs.getSolution().col_value),
+        info.objective_function_value,
+        info.mip_gap,
+        highs.modelStatusToString(status),
+    )
+
+
+def _window_sum(n_steps: int, lengths: np.ndarray) -> sp.csr_matrix:
+    """
+    Sparse matrix summing the last `lengths[k]` time steps of unit `k`, for
+    columns and rows ordered by (time step, unit).
+    """
+    n_units = len(lengths)
+    steps = np.repeat(np.arange(n_steps), n_units)
+    units = np.tile(np.arange(n_units), n_steps)
+    counts = np.minimum(steps + 1, lengths[units])
+    rows = np.repeat(np.arange(n_steps * n_units), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    columns = (np.repeat(steps, counts) - offsets) * n_units + units[rows]
+    return sp.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)),
+        shape=(n_steps * n_units, n_steps * n_units),
+    )
+
+
+def _demand_matrix(time_series: TimeSeriesData, network: CompiledNetwork) -> np.ndarray:
+    """(time steps x nodes) demand aligned with network positions."""
+    demand = time_series.demand_samples().reindex(columns=network.node_ids)
+    demand = demand.to_numpy(dtype=np.float64)
+    return np.where(np.isnan(demand), network.demand, demand)
+
+
+def _availability_matrix(
+    time_series: TimeSeriesData, network: CompiledNetwork
+) -> np.ndarray:
+    """(time steps x generators) available fraction of P_max in network positions."""
+    availability = time_series.availability_samples()
+    availability = availability.reindex(columns=network.generator_ids).fillna(1.0)
+    return availability.to_numpy(dtype=np.float64)
+
+
+def _result(
+    program: UnitCommitmentProgram,
+    time: pd.Index,
+    x: np.ndarray,
+    objective: float,
+    relaxation_objective: float,
+    gap: float,
+    status: str,
+) -> CommitmentResult:
+    network, lp_columns = program.network, program.columns
+    shape = (program.n_steps, len(program.committed))
+    committed_ids = network.generator_ids[program.committed]
+    periods = x[lp_columns["Periods"]].reshape(program.n_steps, -1)
+    blocks = program.period.columns
+    return CommitmentResult(
+        commitment=pd.DataFrame(
+            np.round(x[lp_columns["U"]]).reshape(shape).astype(int),
+            index=time,
+            columns=committed_ids,
+        ),
+        startup=pd.DataFrame(
+            np.round(x[lp_columns["V"]]).reshape(shape).astype(int),
+            index=time,
+            columns=committed_ids,
+        ),
+        power_generation=pd.DataFrame(
+            periods[:, blocks["Gen"]], index=time, columns=network.generator_ids
+        ),
+        power_flow=pd.DataFrame(
+            periods[:, blocks["Flow"]], index=time, columns=network.branch_ids
+        ),
+        theta=pd.DataFrame(
+            periods[:, blocks["Theta"]], index=time, columns=network.node_ids
+        ),
+        cost=float(objective),
+        relaxation_cost=float(relaxation_objective),
+        mip_gap=float(gap),
+        status=status,
+    )
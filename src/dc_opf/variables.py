@@ -1,14 +1,14 @@
-from math import pi
-
-from pyomo.environ import Reals  # type: ignore
+from pyomo.environ import NonNegativeReals, Reals  # type: ignore
 from pyomo.environ import Var
 
 
 def variables(model) -> None:
     """DC OPF Optimization Variables."""
     generator_variables(model)
-    transmission_line_variables(model)
+    branch_variables(model)
     node_variables(model)
+    if model.penalties is not None:
+        slack_variables(model)
 
 
 def generator_variables(model) -> None:
@@ -20,30 +20,55 @@ def generator_variables(model) -> None:
         doc="Power generation [per unit] at each generator.",
     )
     model.GenS = Var(
-        model.GxS,
+        model.S,
         within=Reals,
-        bounds=lambda model, gs: (0, model.pend[gs] - model.pstart[gs]),
+        bounds=lambda model, s: (0, model.pend[s] - model.pstart[s]),
         doc="Power generation [per unit] at each generator within given merit order segment.",
     )
 
 
-def transmission_line_variables(model) -> None:
-    """Transmission line variables for the DC OPF optimization problem."""
+def branch_variables(model) -> None:
+    """Branch variables for the DC OPF optimization problem."""
     model.Flow = Var(
         model.L,
         within=Reals,
         bounds=lambda model, l: (model.fmin[l], model.fmax[l]),
-        doc="Power flow [per unit] on transmission lines.",
+        doc="Power flow [per unit] on branches.",
     )
 
 
 def node_variables(model) -> None:
-    """Node variables for the DC OPF optimization problem."""
-    model.Theta = Var(
-        model.N, within=Reals, bounds=(0.0, 2 * pi), doc="Voltage angle at each node."
-    )
+    """
+    Node variables for the DC OPF optimization problem.
+
+    Voltage angles are free: they are relative to the slack node angle fixed
+    to 0 (see `slack_node_equation`), so angles below it are valid.
+    """
+    model.Theta = Var(model.N, within=Reals, doc="Voltage angle at each node.")
 
 
-def transformers_variables(model) -> None:
-    """Transformer variables."""
-    raise NotImplementedError("Transformers are not supported yet.")
+def slack_variables(model) -> None:
+    """Penalized slack variables of the soft DC OPF optimization problem."""
+    shed_max, spill_max = model.network.slack_limits()
+    model.Shed = Var(
+        model.N,
+        within=NonNegativeReals,
+        bounds=lambda model, n: (0, shed_max[n]),
+        doc="Load shedding [per unit] at each node.",
+    )
+    model.Spill = Var(
+        model.N,
+        within=NonNegativeReals,
+        bounds=lambda model, n: (0, spill_max[n]),
+        doc="Generation spill [per unit] at each node.",
+    )
+    model.OverloadUp = Var(
+        model.L,
+        within=NonNegativeReals,
+        doc="Power flow [per unit] above the maximum flow of a branch.",
+    )
+    model.OverloadDown = Var(
+        model.L,
+        within=NonNegativeReals,
+        doc="Power flow [per unit] below the minimum flow of a branch.",
+    )
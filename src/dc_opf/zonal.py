@@ -0,0 +1,200 @@
+from dataclasses import dataclass
+from typing import Callable, Hashable, Iterable
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.dc_opf.network import CompiledNetwork
+from src.dc_opf.sensitivity import SensitivityEngine
+from src.model.power_system_model import SystemStructure
+from src.model.time_series import TimeSeries
+
+GSK_WEIGHTS: dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    "P_max": lambda generators: generators["P_max"],
+    "headroom": lambda generators: generators["P_max"] - generators["P_min"],
+    "flat": lambda generators: pd.Series(1.0, index=generators.index),
+}
+"""Generators weights of built-in GSK variants."""
+
+
+@dataclass
+class ShiftKeys:
+    """
+    Generation shift keys (GSK) of bidding zones for GSK variants and time steps.
+
+    A change `dp` of a zone net injection is shared by the zone nodes with
+    generators (shifted nodes): shifted node `nodes[i]` injection changes by
+    `keys[v, t, i] * dp`. Keys of each zone sum up to one, unless none of the
+    zone generators has a positive weight (then the zone keys are NaN).
+    """
+
+    zones: pd.Index
+    """Bidding zones."""
+    variants: pd.Index
+    """GSK variants."""
+    time: pd.Index
+    """Time steps."""
+    nodes: np.ndarray
+    """Network positions of shifted nodes."""
+    node_zone: np.ndarray
+    """Zone positions of shifted nodes."""
+    keys: np.ndarray
+    """Shifted nodes keys `(n_variants, n_time, n_nodes)`."""
+
+
+@dataclass
+class ZonalPTDF:
+    """Zonal PTDFs of monitored branches for GSK variants and time steps."""
+
+    values: np.ndarray
+    """PTDFs `(n_variants, n_time, n_branches, n_zones)`."""
+    variants: pd.Index
+    """GSK variants."""
+    time: pd.Index
+    """Time steps."""
+    branches: pd.Index
+    """Monitored branches."""
+    zones: pd.Index
+    """Bidding zones."""
+
+    def frame(self, variant: Hashable, step: Hashable) -> pd.DataFrame:
+        """PTDF (monitored branches x zones) of given GSK variant and time step."""
+        return pd.DataFrame(
+            self.values[self.variants.get_loc(variant), self.time.get_loc(step)],
+            index=self.branches,
+            columns=self.zones,
+        )
+
+
+def generation_shift_keys(
+    structure: SystemStructure,
+    variants: Iterable[str] = ("P_max",),
+    availability: TimeSeries | None = None,
+) -> ShiftKeys:
+    """
+    GSKs proportional to generators weights, one variant per weight.
+
+    Weights are either built-in (see `GSK_WEIGHTS`) or generators table
+    columns. Negative weights and weights of inactive generators are zero.
+    With `availability` given (generators x time steps, missing generators
+    fully available) weights are scaled by it at every time step, otherwise
+    keys have a single time step. Nodes zones are read from the `zone_id`
+    column of nodes.
+    """
+    nodes, generators = structure.nodes, structure.generators
+    if "zone_id" not in nodes.columns:
+        raise ValueError("nodes have no zone_id column, zonal GSKs are undefined")
+    variants = pd.Index(list(variants))
+    zone_codes, zones = pd.factorize(nodes["zone_id"], sort=True)
+
+    gen_node = nodes.index.get_indexer(generators["node_id"])
+    in_zone = np.flatnonzero(zone_codes[gen_node] >= 0)
+    shifted, gen_shifted = np.unique(gen_node[in_zone], return_inverse=True)
+    node_zone = zone_codes[shifted]
+
+    active = (
+        generators["active"].fillna(True).to_numpy(dtype=bool)
+        if "active" in generators.columns
+        else np.ones(len(generators), dtype=bool)
+    )
+    weights = np.stack(
+        [
+            _weights(generators, variant).to_numpy(dtype=np.float64)
+            for variant in variants
+        ]
+    )
+    weights = np.where(active, np.clip(weights, 0.0, None), 0.0)[:, in_zone]
+
+    time = pd.RangeIndex(1) if availability is None else availability.time
+    available = np.ones((len(in_zone), len(time)))
+    if availability is not None:
+        rows = availability.index.get_indexer(generators.index[in_zone])
+        available[rows >= 0] = availability.values[rows[rows >= 0]]
+
+    # generators -> shifted nodes and shifted nodes -> zones sums
+    to_node = sp.csr_matrix(
+        (np.ones(len(in_zone)), (gen_shifted, np.arange(len(in_zone)))),
+        shape=(len(shifted), len(in_zone)),
+    )
+    to_zone = sp.csr_matrix(
+        (np.ones(len(shifted)), (node_zone, np.arange(len(shifted)))),
+        shape=(len(zones), len(shifted)),
+    )
+    keys = np.empty((len(variants), len(time), len(shifted)))
+    for v in range(len(variants)):
+        node_weights = to_node @ (available * weights[v][:, None])
+        totals = to_zone @ node_weights
+        with np.errstate(divide="ignore", invalid="ignore"):
+            keys[v] = (
+                node_weights / np.where(totals > 0.0, totals, np.nan)[node_zone]
+            ).T
+    return ShiftKeys(
+        zones=zones,
+        variants=variants,
+        time=time,
+        nodes=shifted,
+        node_zone=node_zone,
+        keys=keys,
+    )
+
+
+def zonal_ptdf(
+    network: CompiledNetwork,
+    keys: ShiftKeys,
+    monitored: np.ndarray | None = None,
+    hub: Hashable | None = None,
+    engine: SensitivityEngine | None = None,
+    dtype: np.dtype = np.float64,
+) -> ZonalPTDF:
+    """
+    Zonal PTDFs of monitored branches (all by default) for all GSK variants
+    and time steps at once.
+
+    Zonal PTDF is the nodal PTDF weighted by zone GSKs. Nodal PTDF rows are
+    computed once, in batches, and combined with keys of all variants and
+    time steps with one matrix product per zone. With `hub` given, PTDFs are
+    zone-to-hub (the hub zone PTDF is subtracted). Zones without shifted
+    nodes, or with NaN keys, have NaN PTDFs.
+    """
+    engine = SensitivityEngine(network) if engine is None else engine
+    monitored = (
+        np.arange(network.n_branches)
+        if monitored is None
+        else np.asarray(monitored, dtype=np.int64)
+    )
+    n_variants, n_time, _ = keys.keys.shape
+    flat_keys = keys.keys.reshape(n_variants * n_time, -1)
+    zone_nodes = [np.flatnonzero(keys.node_zone == z) for z in range(len(keys.zones))]
+    hub = None if hub is None else keys.zones.get_loc(hub)
+
+    values = np.empty(
+        (n_variants, n_time, monitored.size, len(keys.zones)), dtype=dtype
+    )
+    for rows, batch in engine.iter_ptdf(monitored):
+        batch = batch[:, keys.nodes]
+        for z, nodes in enumerate(zone_nodes):
+            values[:, :, rows, z] = (
+                (flat_keys[:, nodes] @ batch[:, nodes].T).reshape(
+                    n_variants, n_time, -1
+                )
+                if nodes.size > 0
+                else np.nan
+            )
+        if hub is not None:
+            values[:, :, rows] -= values[:, :, rows, hub, None]
+    return ZonalPTDF(
+        values=values,
+        variants=keys.variants,
+        time=keys.time,
+        branches=network.branch_ids[monitored],
+        zones=keys.zones,
+    )
+
+
+def _weights(generators: pd.DataFrame, variant: str) -> pd.Series:
+    if variant in GSK_WEIGHTS:
+        return GSK_WEIGHTS[variant](generators)
+    if variant in generators.columns:
+        return generators[variant].fillna(0.0)
+    raise KeyError(f"unknown GSK variant: {variant}")
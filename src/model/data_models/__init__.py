@@ -1,28 +1,63 @@
-from typing import Any
+from contextvars import ContextVar
+from typing import Any, Iterable
 
 from pandera import DataFrameModel
 from pandera.typing.common import DataFrameBase
 
+_validation_context: ContextVar[dict[Any, Any]] = ContextVar("validation_context")
+
 
 class DataFrameModelWithContext(DataFrameModel):
-    """DataFrameModel wrapper with dynamic validation parameters."""
+    """
+    DataFrameModel wrapper with dynamic validation parameters.
 
-    _context = dict()
+    Validation context is stored in a context variable, so it is local to the
+    thread (or asyncio task) running the validation and concurrent validations
+    with different contexts do not interfere.
+    """
 
     @classmethod
-    def validate(cls, *args, context: dict[Any, Any] | None, **kwargs) -> DataFrameBase:
-        cls._context = context or dict()
+    def validate(
+        cls,
+        check_obj,
+        *args,
+        context: dict[Any, Any] | None,
+        skip_columns: Iterable[str] = (),
+        **kwargs,
+    ) -> DataFrameBase:
+        """
+        Validate `check_obj` within the given context.
+
+        Columns listed in `skip_columns` (with their checks) are not
+        validated. Numeric columns already of the schema dtype are not
+        coerced, so they are not copied.
+        """
+        schema = cls.to_schema()
+        if skip_columns:
+            schema = schema.remove_columns(list(skip_columns))
+        uncoerced = {
+            name: {"coerce": False}
+            for name, column in schema.columns.items()
+            if column.coerce
+            and name in check_obj.columns
+            and check_obj[name].dtype.kind in "biuf"
+            and check_obj[name].dtype == column.dtype.type
+        }
+        if uncoerced:
+            schema = schema.update_columns(uncoerced)
+        token = _validation_context.set(context or dict())
         try:
-            result = super().validate(*args, **kwargs)
+            result = schema.validate(check_obj, *args, **kwargs)
         finally:
-            cls._context = dict()
+            _validation_context.reset(token)
         return result
 
     @classmethod
     def get_context(cls, context_parameter: str) -> Any:
-        if not context_parameter in cls._context:
+        context = _validation_context.get(dict())
+        if not context_parameter in context:
             raise KeyError(
                 f"given context parameter: {context_parameter} "
                 "was not provided as validation context"
             )
-        return cls._context.get(context_parameter)
+        return context.get(context_parameter)
@@ -57,9 +57,8 @@ class BranchesDataModel(DataFrameModelWithContext):
     def validate_flow_limits(cls, df: pd.DataFrame):
         """Validate if F_max >= F_min for each branch, where F_min is specified."""
         if "F_min" not in df.columns:
-            df["F_min"] = np.ones(len(df)) * np.nan
-        min_flow_provided = df[~np.isnan(df["F_min"])]
-        return min_flow_provided["F_min"] <= min_flow_provided["F_max"]
+            return pd.Series(True, index=df.index)
+        return df["F_min"].isna() | (df["F_min"] <= df["F_max"])
 
 
 class TransmissionLinesDataModel(BranchesDataModel):
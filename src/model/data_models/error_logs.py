@@ -1,19 +1,34 @@
 import logging
+from functools import cache
+from typing import TYPE_CHECKING
 
 from pandera import errors
-from rich.console import Console
-from rich.logging import RichHandler
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-handler = RichHandler()
-logger.addHandler(handler)
-
-console = Console()
 
 ERR_LINE_SEP = 80 * "-"
 
 
+@cache
+def get_console() -> "Console":
+    """Rich console (rich is imported and the log handler attached on first use)."""
+    from rich.console import Console
+    from rich.logging import RichHandler
+
+    logger.addHandler(RichHandler())
+    return Console()
+
+
+def __getattr__(name: str):
+    if name == "console":
+        return get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def stringify_schema_errors(schema_errors: errors.SchemaErrors) -> list[tuple[str, str]]:
     error_types = [("SCHEMA", "error"), ("DATA", "check")]
 
@@ -30,9 +45,16 @@ def stringify_schema_errors(schema_errors: errors.SchemaErrors) -> list[tuple[st
 
 
 def log_schema_errors(schema_errors: errors.SchemaErrors) -> None:
-    console.rule(f"{schema_errors.schema.name} Validation Errors", style="red")
+    log_validation_errors(
+        schema_errors.schema.name, stringify_schema_errors(schema_errors)
+    )
+
+
+def log_validation_errors(dataset_name: str, errors: list[tuple[str, str]]) -> None:
+    console = get_console()
+    console.rule(f"{dataset_name} Validation Errors", style="red")
 
-    for col_name, error_info in stringify_schema_errors(schema_errors):
+    for col_name, error_info in errors:
         err_msg = f"Error in [bold]{col_name}[/]: {error_info}"
         logger.error(err_msg)
 
@@ -40,6 +62,7 @@ def log_schema_errors(schema_errors: errors.SchemaErrors) -> None:
 
 
 def log_error(msg: str, dataset_name: str) -> None:
+    console = get_console()
     console.rule(f"{dataset_name} Validation Error", style="red")
     logger.error(msg)
     console.rule(style="red")
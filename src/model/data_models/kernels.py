@@ -0,0 +1,179 @@
+"""
+Compiled (numba) kernels for marginal cost segments validation.
+
+Kernels work on flat arrays of segments and a permutation `order` sorting them
+by (generator, p_start). Segments are read through the permutation and masks
+are written back in the original row order, so no sorted copies of the
+segment table are made. Numba is imported (and kernels compiled) on first use.
+"""
+
+from functools import cache
+
+import numpy as np
+import pandas as pd
+
+
+def cost_intervals_mask(
+    generator_id: pd.Series,
+    p_start: pd.Series,
+    p_end: pd.Series,
+    p_min: pd.Series,
+    p_max: pd.Series,
+) -> np.ndarray:
+    """
+    Row mask of segments with correct [p_start, p_end] intervals.
+
+    For each generator (with `p_min` / `p_max` indexed by generator_id):
+    the first p_start equals P_min, the last p_end equals P_max and each
+    p_start equals the previous p_end.
+    """
+    codes, generators = _codes(generator_id)
+    starts = _float_array(p_start)
+    mask = np.empty(codes.size, dtype=np.bool_)
+    _kernel("cost_intervals")(
+        _order(codes, generators.size, starts),
+        codes,
+        starts,
+        _float_array(p_end),
+        _float_array(p_min.reindex(generators)),
+        _float_array(p_max.reindex(generators)),
+        mask,
+    )
+    return mask
+
+
+def monotonic_cost_mask(
+    generator_id: pd.Series, p_start: pd.Series, cost: pd.Series
+) -> np.ndarray:
+    """Row mask of segments not cheaper than the previous segment of the generator."""
+    codes, generators = _codes(generator_id)
+    starts = _float_array(p_start)
+    mask = np.empty(codes.size, dtype=np.bool_)
+    _kernel("monotonic_cost")(
+        _order(codes, generators.size, starts), codes, _float_array(cost), mask
+    )
+    return mask
+
+
+def _codes(generator_id: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """Generator codes of segments (-1 if missing) and generators of codes."""
+    if isinstance(generator_id.dtype, pd.CategoricalDtype):
+        # categorical identifiers are already encoded, no hashing
+        return generator_id.cat.codes.to_numpy(), generator_id.cat.categories
+    return pd.factorize(generator_id)
+
+
+def _order(codes: np.ndarray, n_generators: int, p_start: np.ndarray) -> np.ndarray:
+    """Stable permutation sorting segments by (generator, p_start), NaN p_start last."""
+    if _kernel("is_sorted")(codes, p_start):
+        return np.arange(codes.size)
+    return _kernel("group_order")(codes, n_generators, p_start)
+
+
+def _float_array(values: pd.Series) -> np.ndarray:
+    return np.ascontiguousarray(values.to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def _is_sorted(codes, p_start):
+    for i in range(1, codes.size):
+        if codes[i] < codes[i - 1]:
+            return False
+        if codes[i] == codes[i - 1] and (
+            p_start[i] < p_start[i - 1]
+            or (np.isnan(p_start[i - 1]) and not np.isnan(p_start[i]))
+        ):
+            return False
+    return True
+
+
+def _group_order(codes, n_generators, p_start):
+    # counting sort by generator code (code -1, i.e. missing generator, first)
+    ptr = np.zeros(n_generators + 2, dtype=np.int64)
+    for i in range(codes.size):
+        ptr[codes[i] + 2] += 1
+    for k in range(1, ptr.size):
+        ptr[k] += ptr[k - 1]
+    order = np.empty(codes.size, dtype=np.int64)
+    for i in range(codes.size):
+        order[ptr[codes[i] + 1]] = i
+        ptr[codes[i] + 1] += 1
+
+    # stable sort of each generator segments by p_start
+    start = 0
+    for k in range(n_generators + 1):
+        stop = ptr[k]
+        if stop - start > 32:
+            group = order[start:stop].copy()
+            order[start:stop] = group[np.argsort(p_start[group], kind="mergesort")]
+        else:
+            for i in range(start + 1, stop):
+                row, j = order[i], i - 1
+                value = p_start[row]
+                while j >= start and (
+                    value < p_start[order[j]]
+                    or (np.isnan(p_start[order[j]]) and not np.isnan(value))
+                ):
+                    order[j + 1] = order[j]
+                    j -= 1
+                order[j + 1] = row
+        start = stop
+    return order
+
+
+def _cost_intervals(order, codes, p_start, p_end, p_min, p_max, mask):
+    n = order.size
+    start = 0
+    while start < n:
+        code = codes[order[start]]
+        stop = start + 1
+        while stop < n and codes[order[stop]] == code:
+            stop += 1
+
+        # first / last defined values, like pandas groupby first / last
+        first, last = np.nan, np.nan
+        for i in range(start, stop):
+            if not np.isnan(p_start[order[i]]):
+                first = p_start[order[i]]
+                break
+        for i in range(stop - 1, start - 1, -1):
+            if not np.isnan(p_end[order[i]]):
+                last = p_end[order[i]]
+                break
+        valid_range = code >= 0 and first == p_min[code] and last == p_max[code]
+
+        previous_end = np.nan
+        for i in range(start, stop):
+            row = order[i]
+            contiguous = np.isnan(previous_end) or p_start[row] == previous_end
+            mask[row] = valid_range and contiguous
+            previous_end = p_end[row]
+        start = stop
+
+
+def _monotonic_cost(order, codes, cost, mask):
+    previous_code, previous_cost = -2, np.nan
+    for i in range(order.size):
+        row = order[i]
+        # segments without generator are not grouped (as in pandas groupby)
+        if codes[row] < 0:
+            mask[row] = True
+            continue
+        if codes[row] != previous_code:
+            previous_code, previous_cost = codes[row], np.nan
+        mask[row] = np.isnan(previous_cost) or cost[row] >= previous_cost
+        previous_cost = cost[row]
+
+
+_KERNELS = {
+    "is_sorted": _is_sorted,
+    "group_order": _group_order,
+    "cost_intervals": _cost_intervals,
+    "monotonic_cost": _monotonic_cost,
+}
+
+
+@cache
+def _kernel(name: str):
+    from numba import njit
+
+    return njit(cache=True, nogil=True)(_KERNELS[name])
@@ -3,6 +3,7 @@ import pandera as pa
 from pandera.typing import Series
 
 from src.model.data_models import DataFrameModelWithContext
+from src.model.data_models.kernels import cost_intervals_mask, monotonic_cost_mask
 from src.model.data_models.utils import err_finite_check, err_foreign_key, err_non_monotonic_merit_order, err_prange, finite_check
 
 
@@ -47,67 +48,18 @@ class MarginalCostsDataModel(DataFrameModelWithContext):
     @pa.dataframe_check(error=err_prange())
     def validate_cost_intervals(cls, df: pd.DataFrame):
         """Validate, if for each generator, marginal cost intervals are correct."""
-        df = df.copy()
-        df["_original_index"] = df.index
-
-        generators_df = cls.get_context("generators_df").reset_index()
-        mc_sorted = df.sort_values(["generator_id", "p_start"]).copy()
-
-        mc_merged = mc_sorted.merge(
-            generators_df[["generator_id", "P_min", "P_max"]],
-            on="generator_id",
-            how="left",
-        )
-
-        # identify first p_start and last p_end for each generator
-        mc_merged["first_p_start"] = mc_merged.groupby("generator_id")[
-            "p_start"
-        ].transform("first")
-        mc_merged["last_p_end"] = mc_merged.groupby("generator_id")["p_end"].transform(
-            "last"
-        )
-
-        # identify previous p_end for each entry (shift by 1)
-        mc_merged["prev_p_end"] = mc_merged.groupby("generator_id")["p_end"].shift()
-
-        # first rule: the smallest p_start for each generator should be equal to P_min
-        mc_merged["valid_min"] = mc_merged["first_p_start"].eq(mc_merged["P_min"])
-
-        # second rule: the biggest p_end should be equal to P_max
-        mc_merged["valid_max"] = mc_merged["last_p_end"].eq(mc_merged["P_max"])
-
-        # third rule: prev_p_end == p_start, if prev_p_end is defined
-        mc_merged["valid_contiguity"] = (
-            mc_merged["p_start"].eq(mc_merged["prev_p_end"])
-            | mc_merged["prev_p_end"].isna()
+        generators_df = cls.get_context("generators_df")
+        mask = cost_intervals_mask(
+            df["generator_id"],
+            df["p_start"],
+            df["p_end"],
+            generators_df["P_min"],
+            generators_df["P_max"],
         )
-
-        # fetch all rules together
-        overall_valid = mc_merged[
-            ["valid_min", "valid_max", "valid_contiguity"]
-        ]
-
-        # reindex below DataFrame, so it matches the original DF's index and order
-        overall_valid = overall_valid.set_axis(mc_merged["_original_index"], axis=0)
-        overall_valid = overall_valid.reindex(df["_original_index"], fill_value=False)
-
-        # data is correct iff all three conditions are satisfied
-        return overall_valid.all(axis=1)
+        return pd.Series(mask, index=df.index)
 
     @pa.dataframe_check(error=err_non_monotonic_merit_order())
     def validate_monotonic_cost(cls, df: pd.DataFrame):
-        # Sort to ensure intervals are in ascending order of p_start
-        df_sorted = df.sort_values(["generator_id", "p_start"]).copy()
-
-        # For each generator, shift cost by 1 to compare current vs. previous interval
-        df_sorted["prev_cost"] = (
-            df_sorted.groupby("generator_id")["cost"].shift()
-        )
-
-        df_sorted["valid_monotonic"] = (
-            df_sorted["prev_cost"].isna()
-            | (df_sorted["cost"] >= df_sorted["prev_cost"])
-        )
-
-        return df_sorted["valid_monotonic"].reindex(df.index)
-
+        """Validate, if for each generator, costs are non-decreasing in p_start order."""
+        mask = monotonic_cost_mask(df["generator_id"], df["p_start"], df["cost"])
+        return pd.Series(mask, index=df.index)
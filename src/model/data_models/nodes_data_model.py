@@ -29,6 +29,13 @@ class NodesDataModel(DataFrameModelWithContext):
             "will be picked randomly."
         ),
     )
+    zone_id: Optional[Series[str]] = pa.Field(
+        nullable=True,
+        description=(
+            "Bidding zone of the node (used for zonal PTDFs), nodes without "
+            "zone do not take part in zonal exchanges."
+        ),
+    )
 
     @pa.check("P_demand", error=utils.err_finite_check("P_demand", null=True))
     def validate_demand_is_finite(cls, P_demand: pd.Series):
@@ -0,0 +1,143 @@
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+import src.model.data_models.utils as utils
+
+if TYPE_CHECKING:
+    from src.model.time_series import TimeSeries
+
+CHUNK_ELEMENTS = 1 << 22
+"""Approximate number of matrix elements checked at once."""
+
+
+class TimeSeriesErrors(ValueError):
+    """Raised (with all found errors) when time series do not match their data model."""
+
+    def __init__(self, dataset_name: str, errors: list[tuple[str, str]]) -> None:
+        super().__init__(f"{dataset_name}: {len(errors)} validation error(s)")
+        self.dataset_name = dataset_name
+        self.errors = errors
+
+
+class TimeSeriesDataModel:
+    """
+    Data model for wide (components x time steps) time series.
+
+    Unlike pandera models, checks run on NumPy matrices: identifiers (rows)
+    are checked once and values are checked chunk by chunk along the time
+    axis, so memory mapped matrices are never loaded into memory as a whole.
+    Subclasses define checked column name, identifier name and value bounds.
+    """
+
+    name: str = "TimeSeries"
+    column: str = "value"
+    index_name: str = "index"
+    context_index: str = "index"
+    lower: float | None = None
+    upper: float | None = None
+
+    @classmethod
+    def validate(cls, time_series: "TimeSeries", context: dict[Any, Any]) -> None:
+        """Validate time series, raise `TimeSeriesErrors` with all found errors."""
+        errors = cls.errors(time_series, context)
+        if errors:
+            raise TimeSeriesErrors(cls.name, errors)
+
+    @classmethod
+    def errors(
+        cls, time_series: "TimeSeries", context: dict[Any, Any]
+    ) -> list[tuple[str, str]]:
+        """All (column, error info) pairs found in the time series."""
+        index = time_series.index
+        errors = list()
+        if index.has_duplicates:
+            errors.append((cls.index_name, utils.err_unique(cls.index_name)))
+        unknown = ~index.isin(context[cls.context_index])
+        if unknown.any():
+            errors.append(
+                (
+                    cls.index_name,
+                    f"{utils.err_foreign_key(fk_col=cls.index_name)}: "
+                    f"{_examples(index[unknown])}",
+                )
+            )
+
+        not_finite, out_of_range = _Failures(), _Failures()
+        for steps, values in time_series.iter_chunks(_chunk_steps(time_series)):
+            not_finite.add(~np.isfinite(values), steps.start)
+            with np.errstate(invalid="ignore"):
+                below = values < cls.lower if cls.lower is not None else False
+                above = values > cls.upper if cls.upper is not None else False
+            out_of_range.add(np.logical_or(below, above), steps.start)
+
+        if not_finite.count:
+            errors.append(
+                (
+                    cls.column,
+                    utils.err_finite_check(cls.column, null=False)
+                    + not_finite.describe(time_series),
+                )
+            )
+        if out_of_range.count:
+            errors.append(
+                (
+                    cls.column,
+                    utils.err_range_check(cls.column, cls.lower, cls.upper)
+                    + out_of_range.describe(time_series),
+                )
+            )
+        return errors
+
+
+class DemandTimeSeriesDataModel(TimeSeriesDataModel):
+    """Data model for nodes demand time series (nodes x time steps)."""
+
+    name = "DemandTimeSeries"
+    column = "P_demand"
+    index_name = "node_id"
+    context_index = "nodes_index"
+
+
+class AvailabilityTimeSeriesDataModel(TimeSeriesDataModel):
+    """Data model for generators availability (fraction of P_max) time series."""
+
+    name = "AvailabilityTimeSeries"
+    column = "availability"
+    index_name = "generator_id"
+    context_index = "generators_index"
+    lower = 0.0
+    upper = 1.0
+
+
+class _Failures:
+    """Number and the first position of failed values."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.first: tuple[int, int] | None = None
+
+    def add(self, failed: np.ndarray | bool, step_offset: int) -> None:
+        if not np.any(failed):
+            return
+        self.count += int(np.count_nonzero(failed))
+        if self.first is None:
+            row, step = np.argwhere(failed)[0]
+            self.first = (int(row), int(step) + step_offset)
+
+    def describe(self, time_series: "TimeSeries") -> str:
+        row, step = self.first
+        return (
+            f" ({self.count} value(s), first for "
+            f"{time_series.index[row]} at {time_series.time[step]})"
+        )
+
+
+def _chunk_steps(time_series: "TimeSeries") -> int:
+    return max(1, CHUNK_ELEMENTS // max(1, len(time_series.index)))
+
+
+def _examples(ids: pd.Index, limit: int = 5) -> str:
+    examples = ", ".join(map(str, ids[:limit]))
+    return examples + (", ..." if len(ids) > limit else "")
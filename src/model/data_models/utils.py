@@ -4,10 +4,9 @@ import pandas as pd
 
 def finite_check(s: pd.Series, allow_nan: bool = False):
     """Custom check if column contains only finite values."""
+    result = np.isfinite(s)
     if allow_nan:
-        result = np.isfinite(s[~np.isnan(s)])
-    else:
-        result = np.isfinite(s)
+        result |= np.isnan(s)
     return result
 
 
@@ -45,3 +44,15 @@ def err_prange() -> str:
 
 def err_non_monotonic_merit_order() -> str:
     return "some generators have decreasing merit order costs"
+
+
+def err_range_check(col_name: str, lower: float, upper: float) -> str:
+    return f"'{col_name}' must be within [{lower}, {upper}] interval."
+
+
+def err_unique(col_name: str) -> str:
+    return f"'{col_name}' values must be unique."
+
+
+def err_time_axes() -> str:
+    return "time series must share the same time axis"
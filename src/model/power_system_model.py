@@ -1,6 +1,7 @@
 import sys
-from dataclasses import dataclass
-from typing import Self
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import InitVar, dataclass
+from typing import Iterable, Self
 
 import numpy as np
 import pandas as pd
@@ -8,10 +9,23 @@ from pandera import errors
 
 from src.model.data_models.branches_data_model import (
     TransformersDataModel, TransmissionLinesDataModel)
-from src.model.data_models.error_logs import log_schema_errors
+from src.model.data_models.error_logs import log_schema_errors, log_validation_errors
 from src.model.data_models.generators_data_model import GeneratorsDataModel
 from src.model.data_models.marginal_costs_model import MarginalCostsDataModel
 from src.model.data_models.nodes_data_model import NodesDataModel
+from src.model.data_models.utils import err_foreign_key
+from src.model.structure_delta import SegmentsIndex, StructureDelta, new_index
+
+BRANCH_NODES = ("node_from", "node_to")
+REFERENCES = {
+    "generators": {"node_id": "nodes"},
+    "tramsmission_lines": {"node_from": "nodes", "node_to": "nodes"},
+    "transformers": {"node_from": "nodes", "node_to": "nodes"},
+    "marginal_costs": {"generator_id": "generators"},
+}
+"""Identifier columns of tables (column -> referenced table)."""
+COMPACT_TABLES = tuple(REFERENCES)
+"""Tables stored compactly (see `SystemStructure.compact`)."""
 
 
 @dataclass
@@ -28,54 +42,285 @@ class SystemStructure:
     """Nodes parameters."""
     marginal_costs: pd.DataFrame
     """Generators marginal costs."""
+    validation_workers: InitVar[int] = 1
+    """Number of threads validating tables (sequential validation by default)."""
+    compact: bool = False
+    """
+    Store identifier columns as categoricals of the referenced table index
+    (codes are positions in the index) and floats of branches, generators
+    and marginal costs as float32 where it is lossless.
+    """
 
-    def __post_init__(self) -> None:
-        self._validate()
+    def __post_init__(self, validation_workers: int) -> None:
+        self._validate(validation_workers)
         self._refine()
+        if self.compact:
+            self._encode()
+        self._segments: SegmentsIndex | None = None
 
-    def _validate(self) -> None:
-        data_is_correct: bool = True
-        for df, data_model, context in [
-            (self.generators, GeneratorsDataModel, {"nodes_index": self.nodes.index}),
+    def _validate(self, validation_workers: int = 1) -> None:
+        node_tables = [
+            ("generators", GeneratorsDataModel, {"nodes_index": self.nodes.index}),
             (
-                self.tramsmission_lines,
+                "tramsmission_lines",
                 TransmissionLinesDataModel,
                 {"nodes_index": self.nodes.index},
             ),
             (
-                self.transformers,
+                "transformers",
                 TransformersDataModel,
                 {"nodes_index": self.nodes.index},
             ),
-            (self.nodes, NodesDataModel, dict()),
-            (
-                self.marginal_costs,
-                MarginalCostsDataModel,
-                {"generators_df": self.generators},
-            ),
-        ]:
-            try:
-                data_model.validate(
-                    check_obj=df, lazy=True, inplace=True, context=context
+            ("nodes", NodesDataModel, dict()),
+        ]
+        # marginal costs are validated against already coerced generators
+        marginal_costs_table = (
+            "marginal_costs",
+            MarginalCostsDataModel,
+            {"generators_df": self.generators},
+        )
+
+        if validation_workers > 1:
+            with ThreadPoolExecutor(max_workers=validation_workers) as executor:
+                futures = [
+                    executor.submit(self._validate_structure_table, *table)
+                    for table in node_tables
+                ]
+                generators_correct = futures[0].result()
+                futures.append(
+                    executor.submit(
+                        self._validate_structure_table, *marginal_costs_table
+                    )
                 )
-            except errors.SchemaErrors as schema_errors:
-                log_schema_errors(schema_errors)
-                # TODO: if specified dump validation report to *.csv file
-                data_is_correct = False
+                results = [generators_correct] + [f.result() for f in futures[1:]]
+        else:
+            results = [
+                self._validate_structure_table(*table)
+                for table in node_tables + [marginal_costs_table]
+            ]
+
+        if not all(results):
+            sys.exit()
+
+    def _validate_structure_table(self, name: str, data_model, context: dict) -> bool:
+        df = getattr(self, name)
+        if not self.compact or name not in REFERENCES:
+            return self._validate_table(df, data_model, context)
+
+        # identifiers are encoded against referenced indexes before the
+        # validation, so they are never materialized as strings
+        references = REFERENCES[name]
+        errors = [
+            (column, err_foreign_key(fk_col=column))
+            for column, referenced in references.items()
+            if not self._encode_column(df, column, getattr(self, referenced).index)
+        ]
+        correct = self._validate_table(df, data_model, context, references)
+        if errors:
+            log_validation_errors(data_model.__name__, errors)
+        return correct and not errors
 
-        if not data_is_correct:
+    @staticmethod
+    def _validate_table(
+        df: pd.DataFrame, data_model, context: dict, skip_columns: Iterable[str] = ()
+    ) -> bool:
+        try:
+            data_model.validate(
+                check_obj=df,
+                lazy=True,
+                inplace=True,
+                context=context,
+                skip_columns=skip_columns,
+            )
+        except errors.SchemaErrors as schema_errors:
+            log_schema_errors(schema_errors)
+            # TODO: if specified dump validation report to *.csv file
+            return False
+        return True
+
+    def apply(self, delta: StructureDelta) -> None:
+        """
+        Apply row level changes to the structure tables.
+
+        Only upserted rows, references to deleted rows and marginal costs of
+        affected generators are validated, the structure is changed only if
+        the validation succeeds.
+        """
+        if not self._validate_delta(delta):
             sys.exit()
 
+        deleted_generators = delta.generators.deleted
+        costs_cascade = None
+        if len(deleted_generators) > 0:
+            costs_cascade = self._segments_index().labels(deleted_generators)
+        # tables are replaced only after all of them are changed
+        tables = {
+            name: table_delta.apply(getattr(self, name))
+            for name, table_delta in delta.tables()
+            if name != "marginal_costs"
+        }
+        costs = self.marginal_costs
+        tables["marginal_costs"] = delta.marginal_costs.apply(costs, costs_cascade)
+        if self._segments is not None and self._segments.indexes(costs):
+            self._segments.update(
+                costs, delta.marginal_costs, costs_cascade, tables["marginal_costs"]
+            )
+        for name, table in tables.items():
+            setattr(self, name, table)
+        self._refine()
+        if self.compact:
+            changed = {
+                name
+                for name, table_delta in delta.tables()
+                if len(table_delta.changed) > 0
+            }
+            self._encode(
+                name
+                for name in COMPACT_TABLES
+                if name in changed or changed.intersection(REFERENCES[name].values())
+            )
+
+    def _segments_index(self) -> SegmentsIndex:
+        if self._segments is None or not self._segments.indexes(self.marginal_costs):
+            self._segments = SegmentsIndex(self.marginal_costs)
+        return self._segments
+
+    def _validate_delta(self, delta: StructureDelta) -> bool:
+        nodes_index = new_index(self.nodes.index, delta.nodes)
+        node_tables = [
+            (delta.nodes.upsert, NodesDataModel, dict()),
+            (
+                delta.generators.upsert,
+                GeneratorsDataModel,
+                {"nodes_index": nodes_index},
+            ),
+            (
+                delta.tramsmission_lines.upsert,
+                TransmissionLinesDataModel,
+                {"nodes_index": nodes_index},
+            ),
+            (
+                delta.transformers.upsert,
+                TransformersDataModel,
+                {"nodes_index": nodes_index},
+            ),
+        ]
+        results = [
+            self._validate_table(*table)
+            for table in node_tables
+            if table[0] is not None
+        ]
+        results.append(self._validate_node_references(delta))
+        if all(results):
+            results.append(self._validate_affected_costs(delta))
+        return all(results)
+
+    def _validate_node_references(self, delta: StructureDelta) -> bool:
+        """Validate that deleted nodes are not referenced by remaining rows."""
+        deleted = delta.nodes.deleted.difference(delta.nodes.upserted)
+        if len(deleted) == 0:
+            return True
+        correct = True
+        for name, data_model, columns in (
+            ("generators", GeneratorsDataModel, ("node_id",)),
+            ("tramsmission_lines", TransmissionLinesDataModel, BRANCH_NODES),
+            ("transformers", TransformersDataModel, BRANCH_NODES),
+        ):
+            df = getattr(self, name)
+            kept = ~df.index.isin(getattr(delta, name).changed)
+            errors = [
+                (column, err_foreign_key(fk_col=column))
+                for column in columns
+                if (df[column].isin(deleted) & kept).any()
+            ]
+            if errors:
+                log_validation_errors(data_model.__name__, errors)
+                correct = False
+        return correct
+
+    def _validate_affected_costs(self, delta: StructureDelta) -> bool:
+        """
+        Validate all marginal costs of generators whose cost rows or power
+        bounds change (with upserted generators rows).
+        """
+        costs, costs_delta = self.marginal_costs, delta.marginal_costs
+        generators_delta = delta.generators
+        deleted = generators_delta.deleted.difference(generators_delta.upserted)
+        changed_costs = costs.index.intersection(costs_delta.changed)
+        affected = (
+            pd.Index(costs.loc[changed_costs, "generator_id"])
+            .append(generators_delta.upserted)
+            .append(
+                pd.Index([])
+                if costs_delta.upsert is None
+                else pd.Index(costs_delta.upsert["generator_id"])
+            )
+            .unique()
+            .difference(deleted)
+        )
+        if len(affected) == 0 and costs_delta.upsert is None:
+            return True
+
+        kept = costs.loc[
+            self._segments_index()
+            .labels(affected)
+            .difference(costs_delta.changed, sort=False)
+        ]
+        segments = pd.concat([kept, costs_delta.upsert])
+        generators = self.generators.loc[
+            affected.intersection(self.generators.index).difference(
+                generators_delta.upserted
+            )
+        ]
+        if generators_delta.upsert is not None:
+            generators = pd.concat([generators, generators_delta.upsert])
+        correct = self._validate_table(
+            segments, MarginalCostsDataModel, {"generators_df": generators}
+        )
+        if correct and costs_delta.upsert is not None:
+            # upserted rows are applied coerced
+            costs_delta.upsert = segments.iloc[len(kept) :]
+        return correct
+
     def _refine(self) -> None:
         self._refine_f_min(self.transformers)
         self._refine_f_min(self.tramsmission_lines)
 
     @staticmethod
     def _refine_f_min(df: pd.DataFrame) -> None:
+        if "F_min" not in df.columns:
+            df["F_min"] = -df["F_max"]
+            return
         f_min_nan = df["F_min"].isna()
-        if f_min_nan.size > 0:
-            df.loc[f_min_nan, "F_min"] = -df[f_min_nan]["F_max"]
+        if f_min_nan.any():
+            df.loc[f_min_nan, "F_min"] = -df.loc[f_min_nan, "F_max"]
 
+    def _encode(self, tables: Iterable[str] = COMPACT_TABLES) -> None:
+        """Compact representation of given tables (see `compact`)."""
+        for name in tables:
+            df = getattr(self, name)
+            for column, referenced in REFERENCES[name].items():
+                self._encode_column(df, column, getattr(self, referenced).index)
+            for column in df.columns[df.dtypes == np.float64]:
+                values = df[column].to_numpy()
+                narrow = values.astype(np.float32)
+                if np.array_equal(narrow, values, equal_nan=True):
+                    df[column] = narrow
+
+    @staticmethod
+    def _encode_column(df: pd.DataFrame, column: str, index: pd.Index) -> bool:
+        """
+        Store identifiers as a categorical of the index, returns False if some
+        identifiers are missing in the index (or the index is not unique).
+        """
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and dtype.categories.equals(index):
+            return True
+        if not index.is_unique:
+            return False
+        values = pd.Categorical(df[column], categories=index)
+        df[column] = values
+        return not (values.codes < 0).any()
 
 @dataclass
 class SystemState:
@@ -89,6 +334,14 @@ class SystemState:
     """Transformators power flow."""
     theta: pd.Series
     """Nodes voltage angle."""
+    load_shedding: pd.Series
+    """Nodes load shedding (nonzero only in the soft DC OPF)."""
+    generation_spill: pd.Series
+    """Nodes generation spill (nonzero only in the soft DC OPF)."""
+    ts_overload: pd.Series
+    """Transmission lines flow beyond flow limits (nonzero only in the soft DC OPF)."""
+    trafos_overload: pd.Series
+    """Transformators flow beyond flow limits (nonzero only in the soft DC OPF)."""
 
     @classmethod
     def undefined_state(cls, params: SystemStructure) -> Self:
@@ -98,6 +351,10 @@ class SystemState:
             ts_power_flow=cls._nan_like(params.tramsmission_lines, "TLines Power Flow"),
             trafos_power_flow=cls._nan_like(params.transformers, "Trafos Power Flow"),
             theta=cls._nan_like(params.nodes, "Theta"),
+            load_shedding=cls._nan_like(params.nodes, "Load Shedding"),
+            generation_spill=cls._nan_like(params.nodes, "Generation Spill"),
+            ts_overload=cls._nan_like(params.tramsmission_lines, "TLines Overload"),
+            trafos_overload=cls._nan_like(params.transformers, "Trafos Overload"),
         )
 
     @staticmethod
@@ -119,6 +376,8 @@ class PowerSystemModel:
         transformers: pd.DataFrame,
         nodes: pd.DataFrame,
         marginal_costs: pd.DataFrame,
+        validation_workers: int = 1,
+        compact: bool = False,
     ) -> None:
         self._parameters = SystemStructure(
             generators=generators,
@@ -126,9 +385,16 @@ class PowerSystemModel:
             transformers=transformers,
             nodes=nodes,
             marginal_costs=marginal_costs,
+            validation_workers=validation_workers,
+            compact=compact,
         )
         self._state = SystemState.undefined_state(self._parameters)
 
+    def apply(self, delta: StructureDelta) -> None:
+        """Apply row level changes to the structure (the state becomes undefined)."""
+        self._parameters.apply(delta)
+        self._state = SystemState.undefined_state(self._parameters)
+
     @property
     def parameters(self) -> SystemStructure:
         """Parameters defining system structure and its components."""
@@ -138,3 +404,25 @@ class PowerSystemModel:
     def state(self) -> SystemState:
         """State of the system and its compontents."""
         return self._state
+
+
+def build_power_system_models(
+    cases: Iterable[dict[str, pd.DataFrame]],
+    max_workers: int | None = None,
+    validation_workers: int = 1,
+) -> list[PowerSystemModel]:
+    """
+    Build many power system models concurrently (in a thread pool).
+
+    Each case is a dictionary of `PowerSystemModel` keyword arguments
+    (generators, transmission_lines, transformers, nodes, marginal_costs).
+    Models are returned in the order of given cases.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                PowerSystemModel, **case, validation_workers=validation_workers
+            )
+            for case in cases
+        ]
+        return [future.result() for future in futures]
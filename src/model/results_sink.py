@@ -0,0 +1,222 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from src.model.power_system_model import SystemState
+
+BUFFER_ELEMENTS = 1 << 22
+"""Approximate number of values of one quantity buffered before it is written."""
+IO_THREADS = 2
+MAX_PENDING_CHUNKS = 4
+
+COMPONENTS_FILE = "components.parquet"
+PART_PATTERN = "part-*.parquet"
+
+
+class ResultsSink:
+    """
+    Streaming writer of multi-snapshot results to partitioned Parquet files.
+
+    Each quantity (e.g. generation, flow, theta, price) is a directory of
+    Parquet parts in long format (snapshot, component, value), where component
+    is a position in the quantity components table stored next to the parts.
+    Appended snapshots are buffered per quantity and every full buffer is
+    written by background I/O threads; at most `max_pending_chunks` chunks are
+    waiting for I/O, so appending blocks instead of buffering without limit.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        components: dict[str, Iterable],
+        buffer_elements: int = BUFFER_ELEMENTS,
+        io_threads: int = IO_THREADS,
+        max_pending_chunks: int = MAX_PENDING_CHUNKS,
+        dtype: np.dtype = np.float64,
+    ) -> None:
+        self.path = Path(path)
+        self.components = {name: pd.Index(ids) for name, ids in components.items()}
+        self.dtype = np.dtype(dtype)
+        self._chunk_snapshots = {
+            name: max(1, buffer_elements // max(1, len(ids)))
+            for name, ids in self.components.items()
+        }
+        self._buffers: dict[str, list[tuple[np.ndarray, np.ndarray]]] = {
+            name: list() for name in self.components
+        }
+        self._buffered = dict.fromkeys(self.components, 0)
+        self._parts = dict.fromkeys(self.components, 0)
+        self._executor = ThreadPoolExecutor(
+            max_workers=io_threads, thread_name_prefix="results-sink"
+        )
+        self._pending = threading.BoundedSemaphore(max_pending_chunks)
+        self._futures: list[Future] = list()
+
+        for name, ids in self.components.items():
+            directory = self.path / name
+            directory.mkdir(parents=True, exist_ok=True)
+            pl.DataFrame({"component": _component_ids(ids)}).write_parquet(
+                directory / COMPONENTS_FILE
+            )
+
+    def __enter__(self) -> "ResultsSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def append(self, snapshots, **values: np.ndarray) -> None:
+        """
+        Append results of given snapshots.
+
+        `snapshots` are snapshot labels (integers or datetimes), each value is
+        a `(snapshots, components)` (or `(components,)` for a single snapshot)
+        array of the named quantity.
+        """
+        snapshots = np.atleast_1d(np.asarray(snapshots))
+        for name, array in values.items():
+            if name not in self.components:
+                raise KeyError(f"unknown results quantity: {name}")
+            array = np.asarray(array, dtype=self.dtype).reshape(
+                snapshots.size, len(self.components[name])
+            )
+            self._buffers[name].append((snapshots, array))
+            self._buffered[name] += snapshots.size
+            if self._buffered[name] >= self._chunk_snapshots[name]:
+                self._submit(name)
+
+    def append_state(self, snapshot, state: SystemState) -> None:
+        """Append generation, branch flows and voltage angles of a system state."""
+        self.append(
+            [snapshot],
+            generation=state.power_generation.to_numpy(),
+            flow=np.concatenate(
+                [state.ts_power_flow.to_numpy(), state.trafos_power_flow.to_numpy()]
+            ),
+            theta=state.theta.to_numpy(),
+        )
+
+    def flush(self) -> None:
+        """Write all buffered snapshots and wait for background writes."""
+        for name in self.components:
+            if self._buffered[name]:
+                self._submit(name)
+        futures, self._futures = self._futures, list()
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def _submit(self, name: str) -> None:
+        buffer, self._buffers[name] = self._buffers[name], list()
+        self._buffered[name] = 0
+        part = self.path / name / f"part-{self._parts[name]:06d}.parquet"
+        self._parts[name] += 1
+
+        self._pending.acquire()
+        try:
+            future = self._executor.submit(_write_part, part, buffer)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        self._futures.append(future)
+        # surface background write errors early
+        if future.done() and future.exception() is not None:
+            future.result()
+
+
+class ResultsReader:
+    """Lazy reader of results written by `ResultsSink`."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = Path(path)
+
+    @property
+    def quantities(self) -> list[str]:
+        return sorted(
+            directory.name
+            for directory in self.path.iterdir()
+            if (directory / COMPONENTS_FILE).exists()
+        )
+
+    def components(self, quantity: str) -> pd.Index:
+        """Components (identifiers) of the quantity."""
+        df = pl.read_parquet(self.path / quantity / COMPONENTS_FILE)
+        return pd.Index(df["component"].to_numpy())
+
+    def scan(
+        self,
+        quantity: str,
+        components: Iterable | None = None,
+        start=None,
+        stop=None,
+    ) -> pl.LazyFrame:
+        """
+        Lazy (snapshot, component, value) frame of selected results.
+
+        Only given components and snapshots within [start, stop] are selected;
+        filters are pushed down to Parquet row groups.
+        """
+        frame = pl.scan_parquet(self.path / quantity / PART_PATTERN)
+        if components is not None:
+            positions = self.components(quantity).get_indexer(pd.Index(components))
+            if (positions < 0).any():
+                raise KeyError(f"unknown {quantity} components requested")
+            frame = frame.filter(pl.col("component").is_in(positions.tolist()))
+        if start is not None:
+            frame = frame.filter(pl.col("snapshot") >= start)
+        if stop is not None:
+            frame = frame.filter(pl.col("snapshot") <= stop)
+        return frame
+
+    def read(
+        self,
+        quantity: str,
+        components: Iterable | None = None,
+        start=None,
+        stop=None,
+    ) -> pd.DataFrame:
+        """Selected results as a wide (snapshots x components) DataFrame."""
+        df = self.scan(quantity, components, start, stop).collect()
+        ids = self.components(quantity)
+        snapshots, rows = np.unique(df["snapshot"].to_numpy(), return_inverse=True)
+        positions, columns = np.unique(df["component"].to_numpy(), return_inverse=True)
+        values = np.full((snapshots.size, positions.size), np.nan)
+        values[rows, columns] = df["value"].to_numpy()
+        result = pd.DataFrame(values, index=snapshots, columns=ids[positions])
+        if components is not None:
+            result = result.reindex(columns=pd.Index(components))
+        return result
+
+
+def _component_ids(ids: pd.Index) -> np.ndarray:
+    """Numeric (and datetime) identifiers keep their dtype, others are strings."""
+    if ids.dtype.kind in "iufbM":
+        return ids.to_numpy()
+    return ids.astype(str).to_numpy()
+
+
+def _write_part(path: Path, buffer: list[tuple[np.ndarray, np.ndarray]]) -> None:
+    snapshots = np.concatenate([snapshots for snapshots, _ in buffer])
+    values = np.concatenate([values for _, values in buffer])
+    n_components = values.shape[1]
+    pl.DataFrame(
+        {
+            "snapshot": np.repeat(snapshots, n_components),
+            "component": np.tile(
+                np.arange(n_components, dtype=np.int32), snapshots.size
+            ),
+            "value": values.ravel(),
+        }
+    ).write_parquet(path, compression="zstd", statistics=True)
@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+STRUCTURE_TABLES = (
+    "nodes",
+    "tramsmission_lines",
+    "transformers",
+    "generators",
+    "marginal_costs",
+)
+
+
+@dataclass
+class TableDelta:
+    """Row level changes of one system structure table."""
+
+    upsert: pd.DataFrame | None = None
+    """Rows inserted, or replacing rows with the same index label."""
+    delete: Iterable | None = None
+    """Index labels of deleted rows (missing labels are ignored)."""
+
+    @property
+    def deleted(self) -> pd.Index:
+        return pd.Index([] if self.delete is None else list(self.delete))
+
+    @property
+    def upserted(self) -> pd.Index:
+        return pd.Index([]) if self.upsert is None else self.upsert.index
+
+    @property
+    def changed(self) -> pd.Index:
+        """Labels of deleted and upserted rows."""
+        return _concat_labels(self.deleted, self.upserted)
+
+    def apply(self, df: pd.DataFrame, cascade: pd.Index | None = None) -> pd.DataFrame:
+        """
+        Table with the changes applied.
+
+        Existing rows are updated, new rows appended and deleted rows (together
+        with `cascade` labels) dropped. Upserted columns missing in the table
+        (e.g. optional columns) are added, empty in other rows. The given table
+        is left unchanged, only the upserted columns are copied.
+        """
+        deleted = _concat_labels(self.deleted, cascade)
+        if len(deleted) > 0:
+            df = df.drop(index=deleted, errors="ignore")
+        if self.upsert is not None and len(self.upsert) > 0:
+            df = df.copy(deep=False)
+            positions = df.index.get_indexer(self.upsert.index)
+            existing = positions >= 0
+            for column in self.upsert.columns.difference(df.columns, sort=False):
+                df[column] = self.upsert[column].reindex(df.index)
+            for column in self.upsert.columns.intersection(df.columns):
+                df[column] = _holding(df[column], self.upsert[column].to_numpy()).copy()
+            if existing.any():
+                rows = self.upsert[existing]
+                for column in rows.columns:
+                    df.iloc[positions[existing], df.columns.get_loc(column)] = rows[
+                        column
+                    ].to_numpy()
+            if not existing.all():
+                rows = self.upsert[~existing].astype(
+                    {
+                        column: dtype
+                        for column, dtype in df.dtypes.items()
+                        if isinstance(dtype, pd.CategoricalDtype)
+                        and column in self.upsert.columns
+                    }
+                )
+                df = pd.concat([df, rows])
+        return df
+
+
+@dataclass
+class StructureDelta:
+    """
+    Row level changes (upserts and deletes) of system structure tables.
+
+    Rows are matched by index label, also in the marginal costs table. Deleting
+    a generator deletes its marginal costs as well.
+    """
+
+    nodes: TableDelta = field(default_factory=TableDelta)
+    tramsmission_lines: TableDelta = field(default_factory=TableDelta)
+    transformers: TableDelta = field(default_factory=TableDelta)
+    generators: TableDelta = field(default_factory=TableDelta)
+    marginal_costs: TableDelta = field(default_factory=TableDelta)
+
+    def tables(self) -> Iterable[tuple[str, TableDelta]]:
+        return ((name, getattr(self, name)) for name in STRUCTURE_TABLES)
+
+
+class SegmentsIndex:
+    """
+    Marginal costs row labels of every generator.
+
+    Built once per marginal costs table (which takes a full table scan) and
+    then kept up to date with applied deltas, so rows of a few generators are
+    found without scanning the table. Changes of the table made other than
+    with `SystemStructure.apply` are not tracked.
+    """
+
+    def __init__(self, costs: pd.DataFrame) -> None:
+        groups = costs.groupby("generator_id", sort=False, observed=True).indices
+        labels = costs.index.to_numpy()
+        self._labels = {
+            generator: labels[positions] for generator, positions in groups.items()
+        }
+        self._table = costs
+
+    def indexes(self, costs: pd.DataFrame) -> bool:
+        """Indicates if the index is up to date with the table."""
+        return costs is self._table
+
+    def labels(self, generators: Iterable) -> pd.Index:
+        """Row labels of given generators segments."""
+        labels = [self._labels[g] for g in generators if g in self._labels]
+        return pd.Index(np.concatenate(labels) if labels else [])
+
+    def update(
+        self,
+        costs: pd.DataFrame,
+        delta: TableDelta,
+        cascade: pd.Index | None,
+        new_costs: pd.DataFrame,
+    ) -> None:
+        """
+        Follow the change of `costs` into `new_costs` (see `TableDelta.apply`).
+
+        Removed rows are looked up in `costs`, so upserted rows moved to another
+        generator are removed from their previous generator.
+        """
+        removed = costs.index.intersection(_concat_labels(delta.changed, cascade))
+        owners = costs.loc[removed, "generator_id"]
+        labels_of = dict(self._labels)
+        for generator, labels in owners.groupby(owners, observed=True).groups.items():
+            remaining = labels_of[generator]
+            remaining = remaining[~np.isin(remaining, labels)]
+            if len(remaining) > 0:
+                labels_of[generator] = remaining
+            else:
+                del labels_of[generator]
+        if delta.upsert is not None:
+            for generator, labels in delta.upsert.groupby(
+                "generator_id"
+            ).groups.items():
+                labels_of[generator] = np.concatenate(
+                    [labels_of.get(generator, []), labels.to_numpy()]
+                )
+        self._labels = labels_of
+        self._table = new_costs
+
+
+def _holding(column: pd.Series, values: np.ndarray) -> pd.Series:
+    """Column (of a compact table) able to hold given values."""
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        new = pd.Index(values).dropna().difference(dtype.categories)
+        return column.cat.add_categories(new) if len(new) > 0 else column
+    if dtype == np.float32:
+        narrow = values.astype(np.float32)
+        if not np.array_equal(narrow, values.astype(np.float64), equal_nan=True):
+            return column.astype(np.float64)
+    return column
+
+
+def _concat_labels(labels: pd.Index, other: pd.Index | None) -> pd.Index:
+    # empty indexes are skipped, so they do not affect the labels dtype
+    if other is None or len(other) == 0:
+        return labels
+    return other if len(labels) == 0 else labels.append(other)
+
+
+def new_index(index: pd.Index, delta: TableDelta) -> pd.Index:
+    """Table index after the changes."""
+    index = index.difference(delta.deleted, sort=False)
+    return index.append(delta.upserted.difference(index, sort=False))
@@ -0,0 +1,195 @@
+import os
+import sys
+from dataclasses import dataclass
+from typing import Iterator, Self
+
+import numpy as np
+import pandas as pd
+
+from src.model.data_models.error_logs import log_validation_errors
+from src.model.data_models.time_series_data_model import (
+    AvailabilityTimeSeriesDataModel,
+    DemandTimeSeriesDataModel,
+    TimeSeriesErrors,
+)
+from src.model.data_models.utils import err_time_axes
+from src.model.power_system_model import SystemStructure
+
+FLOAT_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+
+@dataclass
+class TimeSeries:
+    """
+    Wide time series matrix (components x time steps).
+
+    Values are a float32 or float64 NumPy array, possibly memory mapped
+    (see `TimeSeries.memmap`), rows are labelled by component identifiers
+    (nodes / generators) and columns by time steps.
+    """
+
+    values: np.ndarray
+    """Values matrix (components x time steps)."""
+    index: pd.Index
+    """Components identifiers."""
+    time: pd.Index
+    """Time steps."""
+
+    def __post_init__(self) -> None:
+        self.index, self.time = pd.Index(self.index), pd.Index(self.time)
+        if self.values.dtype not in FLOAT_DTYPES:
+            raise TypeError(
+                f"time series values must be float32 or float64, got {self.values.dtype}"
+            )
+        if self.values.shape != (len(self.index), len(self.time)):
+            raise ValueError(
+                f"time series values shape {self.values.shape} does not match "
+                f"axes ({len(self.index)}, {len(self.time)})"
+            )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dtype: np.dtype = np.float64) -> Self:
+        """Time series from a wide DataFrame (components x time steps)."""
+        return cls(values=df.to_numpy(dtype=dtype), index=df.index, time=df.columns)
+
+    @classmethod
+    def from_long(
+        cls,
+        df: pd.DataFrame,
+        index: str,
+        time: str,
+        value: str,
+        dtype: np.dtype = np.float64,
+    ) -> Self:
+        """
+        Time series from a long DataFrame (one row per component and time step).
+
+        Raises ValueError if some component and time step has more than one row.
+        """
+        rows, row_ids = pd.factorize(df[index], sort=True)
+        columns, time_ids = pd.factorize(df[time], sort=True)
+        values = np.full((len(row_ids), len(time_ids)), np.nan, dtype=dtype)
+        known = (rows >= 0) & (columns >= 0)
+        cells = rows[known] * len(time_ids) + columns[known]
+        duplicated = pd.Index(cells).duplicated()
+        if duplicated.any():
+            first = cells[duplicated][0]
+            raise ValueError(
+                f"{duplicated.sum()} duplicated ({index}, {time}) rows in long time "
+                f"series, first: ({row_ids[first // len(time_ids)]}, "
+                f"{time_ids[first % len(time_ids)]})"
+            )
+        values[rows[known], columns[known]] = df[value].to_numpy(dtype=dtype)[known]
+        return cls(values=values, index=row_ids, time=time_ids)
+
+    @classmethod
+    def memmap(
+        cls,
+        path: str | os.PathLike,
+        index: pd.Index,
+        time: pd.Index,
+        dtype: np.dtype = np.float32,
+        mode: str = "r",
+    ) -> Self:
+        """
+        Time series backed by a memory mapped `.npy` file.
+
+        With `mode="w+"` a new (zero filled) file is created, otherwise an
+        existing file is opened (`"r"` read-only, `"r+"` read-write).
+        """
+        if mode == "w+":
+            values = np.lib.format.open_memmap(
+                path, mode=mode, dtype=dtype, shape=(len(index), len(time))
+            )
+        else:
+            values = np.load(path, mmap_mode=mode)
+        return cls(values=values, index=index, time=time)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide DataFrame (components x time steps), loaded into memory."""
+        return pd.DataFrame(
+            np.asarray(self.values), index=self.index, columns=self.time
+        )
+
+    def window(self, steps: slice) -> Self:
+        """Time series restricted to a slice of time steps (a view, no copy)."""
+        return type(self)(
+            values=self.values[:, steps], index=self.index, time=self.time[steps]
+        )
+
+    def iter_chunks(self, n_steps: int) -> Iterator[tuple[slice, np.ndarray]]:
+        """Yield (time steps slice, values) chunks of at most `n_steps` time steps."""
+        for start in range(0, len(self.time), n_steps):
+            steps = slice(start, min(start + n_steps, len(self.time)))
+            yield steps, self.values[:, steps]
+
+    def flush(self) -> None:
+        """Write changes of memory mapped values to disk."""
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+
+
+@dataclass
+class TimeSeriesData:
+    """Demand and generators availability time series of a power system."""
+
+    structure: SystemStructure
+    """Structure of the power system the time series belong to."""
+    demand: TimeSeries
+    """Nodes demand [per unit] (nodes x time steps), missing nodes keep base demand."""
+    availability: TimeSeries | None = None
+    """Available fraction of generators P_max (generators x time steps), 1.0 if not given."""
+
+    def __post_init__(self) -> None:
+        self._validate()
+
+    @property
+    def time(self) -> pd.Index:
+        return self.demand.time
+
+    def demand_samples(self, steps: slice = slice(None)) -> pd.DataFrame:
+        """Demand of given time steps as (time steps x nodes) samples."""
+        return self.demand.window(steps).to_frame().T
+
+    def availability_samples(self, steps: slice = slice(None)) -> pd.DataFrame:
+        """Availability of given time steps as (time steps x generators) samples."""
+        if self.availability is None:
+            return pd.DataFrame(
+                1.0, index=self.time[steps], columns=self.structure.generators.index
+            )
+        return self.availability.window(steps).to_frame().T
+
+    def _validate(self) -> None:
+        tables = [
+            (
+                self.demand,
+                DemandTimeSeriesDataModel,
+                {"nodes_index": self.structure.nodes.index},
+            ),
+        ]
+        if self.availability is not None:
+            tables.append(
+                (
+                    self.availability,
+                    AvailabilityTimeSeriesDataModel,
+                    {"generators_index": self.structure.generators.index},
+                )
+            )
+        results = [self._validate_table(*table) for table in tables]
+        if self.availability is not None and not self.availability.time.equals(
+            self.demand.time
+        ):
+            log_validation_errors("TimeSeries", [("time", err_time_axes())])
+            results.append(False)
+
+        if not all(results):
+            sys.exit()
+
+    @staticmethod
+    def _validate_table(time_series: TimeSeries, data_model, context: dict) -> bool:
+        try:
+            data_model.validate(time_series, context=context)
+        except TimeSeriesErrors as errors:
+            log_validation_errors(errors.dataset_name, errors.errors)
+            return False
+        return True
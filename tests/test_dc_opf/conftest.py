@@ -0,0 +1,24 @@
+import pandas as pd
+import pytest
+
+from src.model.power_system_model import PowerSystemModel
+
+
+@pytest.fixture
+def power_system_model(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> PowerSystemModel:
+    """Feasible power system model (without phase shifting transformers)."""
+    transmission_lines_df.loc["LINE2", "F_max"] = 2.0
+    trafos_df["phase_shift"] = 0.0
+    return PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+    )
@@ -0,0 +1,125 @@
+import os
+import time
+from multiprocessing.connection import Client
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.dc_opf.cluster as cluster
+from src.dc_opf.cluster import Coordinator, solve_chunk, start_local_workers
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.stochastic import ScenarioSet
+from src.dc_opf.template import TemplateCache
+from src.model.power_system_model import PowerSystemModel
+
+DEMAND = [3.0, 3.1, 100.0, 3.2, 3.3, 3.4, 3.5, 2.9, 3.05]
+
+
+@pytest.fixture
+def scenarios() -> ScenarioSet:
+    return ScenarioSet(demand=pd.DataFrame({"N1": DEMAND}))
+
+
+def crashing_worker(address, authkey) -> None:
+    """Worker dying in the middle of its first chunk."""
+    connection = Client(address, authkey=authkey)
+    connection.recv()
+    connection.recv()
+    os._exit(1)
+
+
+def slow_worker(address, authkey) -> None:
+    """Worker stuck on every chunk (a straggler)."""
+    solve_chunk = cluster.solve_chunk
+
+    def slow_solve_chunk(*args):
+        time.sleep(10.0)
+        return solve_chunk(*args)
+
+    cluster.solve_chunk = slow_solve_chunk
+    cluster.run_worker(address, authkey)
+
+
+def assert_dispatch(power_system_model: PowerSystemModel, dispatch) -> None:
+    assert dispatch.feasible.tolist() == [demand != 100.0 for demand in DEMAND]
+    assert dispatch.power_generation.iloc[2].isna().all()
+    for scenario in (0, 6):
+        power_system_model.parameters.nodes.loc["N1", "P_demand"] = DEMAND[scenario]
+        dc_opf(power_system_model)
+        np.testing.assert_allclose(
+            dispatch.power_generation.loc[scenario],
+            power_system_model.state.power_generation,
+            atol=1e-6,
+        )
+
+
+def test_tcp_workers(
+    power_system_model: PowerSystemModel, scenarios: ScenarioSet
+) -> None:
+    with Coordinator(chunk_size=2) as coordinator:
+        workers = start_local_workers(coordinator.address, coordinator.authkey, 3)
+        dispatch = coordinator.run(power_system_model, scenarios, timeout=60)
+
+    assert_dispatch(power_system_model, dispatch)
+    assert coordinator.stats.chunks == 5
+    for worker in workers:
+        worker.join(timeout=10)
+        assert worker.exitcode == 0
+
+
+def test_unix_socket_and_retries(
+    tmp_path, power_system_model: PowerSystemModel, scenarios: ScenarioSet
+) -> None:
+    with Coordinator(
+        str(tmp_path / "coordinator.sock"), chunk_size=4, straggler_factor=np.inf
+    ) as coordinator:
+        start_local_workers(
+            coordinator.address, coordinator.authkey, 2, target=crashing_worker
+        )
+        time.sleep(0.5)
+        start_local_workers(coordinator.address, coordinator.authkey, 1)
+        dispatch = coordinator.run(power_system_model, scenarios, timeout=60)
+
+    assert_dispatch(power_system_model, dispatch)
+    assert coordinator.stats.workers == 3
+    assert coordinator.stats.retries == 2
+
+
+def test_straggler_is_reassigned(
+    power_system_model: PowerSystemModel, scenarios: ScenarioSet
+) -> None:
+    with Coordinator(chunk_size=1, straggler_factor=2.0) as coordinator:
+        start_local_workers(
+            coordinator.address, coordinator.authkey, 1, target=slow_worker
+        )
+        time.sleep(0.5)
+        start_local_workers(coordinator.address, coordinator.authkey, 1)
+        start = time.monotonic()
+        dispatch = coordinator.run(power_system_model, scenarios, timeout=60)
+
+    assert time.monotonic() - start < 8.0
+    assert coordinator.stats.reassigned >= 1
+    assert_dispatch(power_system_model, dispatch)
+
+
+def test_timeout(power_system_model: PowerSystemModel, scenarios: ScenarioSet) -> None:
+    with Coordinator() as coordinator:
+        with pytest.raises(TimeoutError):
+            coordinator.run(power_system_model, scenarios, timeout=0.2)
+
+
+def test_derating_below_minimal_generation(
+    power_system_model: PowerSystemModel,
+) -> None:
+    template = TemplateCache().get(power_system_model.parameters)
+    network = template.network
+    # GEN2 P_min 3.0 is above its derated capacity 0.5 * 4.5
+    availability = np.ones((2, network.n_generators))
+    availability[1, 1] = 0.5
+    generation, _, _, feasible = solve_chunk(
+        template, np.tile(network.demand, (2, 1)), availability
+    )
+
+    assert feasible.all()
+    assert generation[1, 1] == pytest.approx(2.25)
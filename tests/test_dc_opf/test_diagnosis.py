@@ -0,0 +1,64 @@
+import pytest
+
+from src.dc_opf.diagnosis import diagnose
+from src.dc_opf.opt_model import InfeasibleModelError, dc_opf
+from src.model.power_system_model import PowerSystemModel
+
+
+def test_feasible_model(power_system_model: PowerSystemModel) -> None:
+    assert diagnose(power_system_model) == []
+
+
+def test_island_balance(power_system_model: PowerSystemModel) -> None:
+    power_system_model.parameters.nodes.loc["N5", "P_demand"] = 1.0
+    (infeasibility,) = diagnose(power_system_model)
+    assert infeasibility.kind == "island balance"
+    assert list(infeasibility.nodes) == ["N5"]
+    assert infeasibility.generators == {}
+
+
+def test_node_cut(power_system_model: PowerSystemModel) -> None:
+    lines = power_system_model.parameters.tramsmission_lines
+    trafos = power_system_model.parameters.transformers
+    lines.loc[["LINE1", "LINE2"], ["F_min", "F_max"]] = [-0.5, 0.5]
+    trafos.loc["TRAFO1", ["F_min", "F_max"]] = [-0.5, 0.5]
+
+    (infeasibility,) = diagnose(power_system_model)
+    assert infeasibility.kind == "node cut"
+    assert list(infeasibility.nodes) == ["N2"]
+    assert list(infeasibility.generators) == ["GEN2"]
+    assert set(infeasibility.branches) == {"LINE1", "LINE2", "TRAFO1"}
+
+
+def test_bridge_cut(power_system_model: PowerSystemModel) -> None:
+    structure = power_system_model.parameters
+    structure.transformers = structure.transformers.drop(index="TRAFO3")
+    structure.tramsmission_lines.loc["LINE4"] = {
+        "node_from": "N4",
+        "node_to": "N5",
+        "reactance": 0.1,
+        "F_max": 5.0,
+        "F_min": -5.0,
+    }
+    structure.nodes.loc[["N4", "N5"], "P_demand"] = 1.5
+
+    (infeasibility,) = diagnose(power_system_model)
+    assert infeasibility.kind == "bridge cut"
+    assert set(infeasibility.nodes) == {"N4", "N5"}
+    assert list(infeasibility.branches) == ["TRAFO2"]
+
+
+def test_irreducible_infeasible_subsystem(
+    power_system_model: PowerSystemModel,
+) -> None:
+    lines = power_system_model.parameters.tramsmission_lines
+    lines.loc["LINE2", "F_min"] = -1.0
+    with pytest.raises(InfeasibleModelError):
+        dc_opf(power_system_model)
+
+    (infeasibility,) = diagnose(power_system_model)
+    assert infeasibility.kind == "IIS"
+    assert infeasibility.generators == {"GEN2": "P_min"}
+    assert infeasibility.branches["LINE2"] == "F_min"
+    assert "N2" in infeasibility.nodes
+    assert "N5" not in infeasibility.nodes
@@ -0,0 +1,111 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dc_opf.expansion import (
+    ExpansionCandidates,
+    ExpansionProgram,
+    SnapshotSolver,
+    expansion_planning,
+)
+from src.model.power_system_model import PowerSystemModel
+from src.model.time_series import TimeSeries, TimeSeriesData
+
+
+@pytest.fixture
+def candidates() -> ExpansionCandidates:
+    return ExpansionCandidates(
+        pd.DataFrame(
+            {
+                "node_from": ["N1", "N2", "N1"],
+                "node_to": ["N3", "N3", "N2"],
+                "reactance": [0.02, 0.05, 0.1],
+                "F_max": [2.0, 1.0, 1.0],
+                "investment_cost": [1.0, 0.3, 0.5],
+            },
+            index=pd.Index(["C1", "C2", "C3"], name="line_id"),
+        )
+    )
+
+
+@pytest.fixture
+def time_series(power_system_model: PowerSystemModel) -> TimeSeriesData:
+    structure = power_system_model.parameters
+    demand = structure.nodes["P_demand"].fillna(0.0)
+    return TimeSeriesData(
+        structure,
+        TimeSeries.from_frame(
+            pd.DataFrame({step: demand * (1.0 + 0.3 * step) for step in range(4)})
+        ),
+    )
+
+
+@pytest.fixture
+def solver(
+    power_system_model: PowerSystemModel, candidates: ExpansionCandidates
+) -> SnapshotSolver:
+    return SnapshotSolver(
+        ExpansionProgram.from_structure(power_system_model.parameters, candidates)
+    )
+
+
+def builds(n: int) -> list[np.ndarray]:
+    return [
+        np.array(built, dtype=float) for built in itertools.product([0, 1], repeat=n)
+    ]
+
+
+def test_expansion_plan_is_optimal(
+    power_system_model: PowerSystemModel,
+    time_series: TimeSeriesData,
+    candidates: ExpansionCandidates,
+    solver: SnapshotSolver,
+) -> None:
+    result = expansion_planning(
+        power_system_model, time_series, candidates, max_workers=2, chunk_size=3
+    )
+
+    demand = time_series.demand_samples().to_numpy()
+    availability = np.ones((len(demand), 4))
+    costs = [
+        candidates.investment_cost @ built
+        + sum(
+            solver.solve(built, *snapshot)[0] for snapshot in zip(demand, availability)
+        )
+        for built in builds(3)
+    ]
+    assert result.total_cost == pytest.approx(min(costs))
+    assert result.built.tolist() == [True, False, False]
+    assert result.gap <= 1e-4
+
+
+def test_benders_cuts_are_valid(
+    time_series: TimeSeriesData, solver: SnapshotSolver
+) -> None:
+    demand = time_series.demand_samples().to_numpy()
+    availability = np.ones((len(demand), 4))
+    for point in builds(3):
+        cost, gradient = solver.solve(point, demand[3], availability[3])
+        for built in builds(3):
+            assert (
+                solver.solve(built, demand[3], availability[3])[0]
+                >= cost + gradient @ (built - point) - 1e-7
+            )
+
+
+def test_candidate_to_other_island(
+    power_system_model: PowerSystemModel,
+    time_series: TimeSeriesData,
+    candidates: ExpansionCandidates,
+) -> None:
+    candidates.lines.loc["C3", "node_to"] = "N5"
+
+    with pytest.raises(ValueError):
+        expansion_planning(power_system_model, time_series, candidates, max_workers=1)
+
+
+def test_invalid_investment_cost(candidates: ExpansionCandidates) -> None:
+    with pytest.raises(ValueError):
+        ExpansionCandidates(candidates.lines.assign(investment_cost=-1.0))
@@ -0,0 +1,133 @@
+from pathlib import Path
+
+import highspy
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from src.dc_opf.export import (
+    export_dc_opf,
+    import_solution,
+    lp_names,
+    write_lp,
+    write_mps,
+)
+from src.dc_opf.lp import LinearProgram, dc_opf_lp, named_blocks, solve_lp
+from src.dc_opf.network import compile_network
+from src.dc_opf.opt_model import SlackPenalties, dc_opf
+from src.model.power_system_model import PowerSystemModel
+
+
+def solve_file(path: Path) -> highspy.Highs:
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    assert highs.readModel(str(path)) == highspy.HighsStatus.kOk
+    highs.run()
+    assert highs.getModelStatus() == highspy.HighsModelStatus.kOptimal
+    return highs
+
+
+@pytest.mark.parametrize(
+    "name", ["model.mps", "model.lp", "model.mps.gz", "model.lp.gz"]
+)
+def test_export_and_import_solution(
+    power_system_model: PowerSystemModel, tmp_path: Path, name: str
+) -> None:
+    export_dc_opf(power_system_model, tmp_path / name, chunk_size=4)
+    highs = solve_file(tmp_path / name)
+    highs.writeSolution(str(tmp_path / "solution.sol"), 0)
+
+    import_solution(power_system_model, tmp_path / "solution.sol")
+    state = power_system_model.state
+    generation, flow = state.power_generation.copy(), state.ts_power_flow.copy()
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(generation, state.power_generation, atol=1e-7)
+    np.testing.assert_allclose(flow, state.ts_power_flow, atol=1e-7)
+
+
+def test_export_and_import_soft_solution(
+    power_system_model: PowerSystemModel, tmp_path: Path
+) -> None:
+    power_system_model.parameters.nodes.loc["N5", "P_demand"] = 1.0
+    power_system_model.parameters.tramsmission_lines.loc["LINE2", "F_min"] = -1.0
+    penalties = SlackPenalties()
+    export_dc_opf(power_system_model, tmp_path / "model.mps", penalties)
+    highs = solve_file(tmp_path / "model.mps")
+    highs.writeSolution(str(tmp_path / "solution.sol"), 0)
+
+    import_solution(power_system_model, tmp_path / "solution.sol", penalties)
+    state = power_system_model.state
+    imported = [
+        state.power_generation.copy(),
+        state.ts_power_flow.copy(),
+        state.ts_overload.copy(),
+        state.load_shedding.copy(),
+    ]
+    assert state.ts_overload.abs().sum() > 0.0
+    dc_opf(power_system_model, penalties=penalties)
+    expected = [
+        state.power_generation,
+        state.ts_power_flow,
+        state.ts_overload,
+        state.load_shedding,
+    ]
+    for actual, value in zip(imported, expected):
+        np.testing.assert_allclose(actual, value, atol=1e-7)
+
+
+@pytest.mark.parametrize(
+    "writer, name", [(write_mps, "model.mps"), (write_lp, "model.lp")]
+)
+def test_bounds_and_ranged_rows(tmp_path: Path, writer, name: str) -> None:
+    # x0 free, x1 <= -1, x2 fixed, x3 in [0, inf), x4 in [-2, 5]
+    lp = LinearProgram(
+        cost=np.array([1.0, -1.0, 0.0, 2.0, -0.5]),
+        matrix=sp.csr_matrix(
+            np.array(
+                [
+                    [1.0, 1.0, 0.0, 0.0, 0.0],
+                    [1.0, 0.0, 1.0, -1.0, 0.0],
+                    [0.0, 0.0, 0.0, 0.0, 0.0],
+                    [0.0, 1.0, 0.0, 1.0, 1.0],
+                ]
+            )
+        ),
+        row_lb=np.array([-3.0, -np.inf, -np.inf, 1.0]),
+        row_ub=np.array([4.0, 2.0, np.inf, 1.0]),
+        col_lb=np.array([-np.inf, -np.inf, 0.5, 0.0, -2.0]),
+        col_ub=np.array([np.inf, -1.0, 0.5, np.inf, 5.0]),
+        columns=named_blocks(X=5),
+        rows=named_blocks(R=4),
+    )
+    writer(lp, tmp_path / name, chunk_size=1)
+
+    highs = solve_file(tmp_path / name)
+    expected = solve_lp(lp)
+    assert highs.getInfo().objective_function_value == pytest.approx(expected.objective)
+    # LP files order columns by first appearance
+    solution = dict(zip(highs.getLp().col_names_, highs.getSolution().col_value))
+    np.testing.assert_allclose(
+        [solution[f"x{i}"] for i in range(lp.n_cols)], expected.x, atol=1e-9
+    )
+
+
+def test_lp_names(power_system_model: PowerSystemModel) -> None:
+    structure = power_system_model.parameters
+    structure.nodes.rename(index={"N1": "N 1"}, inplace=True)
+    for table in (
+        structure.generators,
+        structure.tramsmission_lines,
+        structure.transformers,
+    ):
+        table.replace("N1", "N 1", inplace=True)
+    network = compile_network(structure)
+    lp = dc_opf_lp(network, SlackPenalties())
+    columns, rows = lp_names(network, lp)
+
+    assert columns[lp.columns["GenS"]][:3].tolist() == [
+        "GenS(GEN1,0)",
+        "GenS(GEN1,1)",
+        "GenS(GEN2,0)",
+    ]
+    assert columns[lp.columns["Shed"]][0] == "Shed(N_1)"
+    assert rows[lp.rows["PowerFlowEquation"]][-1] == "PowerFlowEquation(TRAFO3)"
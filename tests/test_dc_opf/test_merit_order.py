@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.dc_opf.lp import dc_opf_lp, solve_lp
+from src.dc_opf.merit_order import fast_dc_opf, merit_order_dispatch
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import dc_opf
+from src.model.power_system_model import PowerSystemModel
+
+
+def generation_cost(network: CompiledNetwork, generation: np.ndarray) -> float:
+    """Merit order cost of generation above P_min."""
+    above_p_min = generation[network.seg_gen] - network.p_min[network.seg_gen]
+    width = network.seg_end - network.seg_start
+    offset = network.seg_start - network.p_min[network.seg_gen]
+    fill = np.clip(above_p_min - offset, 0.0, width)
+    return float(fill @ network.seg_cost)
+
+
+def test_fast_path_skips_solver_if_uncongested(
+    power_system_model: PowerSystemModel,
+) -> None:
+    assert fast_dc_opf(power_system_model)
+    state = power_system_model.state
+    generation = state.power_generation.copy()
+    ts_flow = state.ts_power_flow.copy()
+
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(generation, state.power_generation, atol=1e-7)
+    np.testing.assert_allclose(ts_flow, state.ts_power_flow, atol=1e-7)
+
+
+def test_fallback_to_solver_if_congested(
+    power_system_model: PowerSystemModel,
+) -> None:
+    power_system_model.parameters.tramsmission_lines.loc["LINE3", "F_min"] = -0.5
+    network = compile_network(power_system_model.parameters)
+    dispatch = merit_order_dispatch(network)
+    assert dispatch.balanced[0] and dispatch.congested[0]
+
+    assert not fast_dc_opf(power_system_model)
+    assert power_system_model.state.ts_power_flow["LINE3"] >= -0.5 - 1e-7
+
+
+def test_unbalanced_snapshot(power_system_model: PowerSystemModel) -> None:
+    network = compile_network(power_system_model.parameters)
+    demand = network.demand.copy()
+    demand[0] += 100.0
+    assert not merit_order_dispatch(network, demand).balanced[0]
+
+
+def test_optimal_snapshots_match_lp(power_system_model: PowerSystemModel) -> None:
+    network = compile_network(power_system_model.parameters)
+    rng = np.random.default_rng(0)
+    demand = network.demand + rng.uniform(-1.0, 1.0, (100, network.n_nodes))
+    demand[:, 4] = 0.0
+
+    dispatch = merit_order_dispatch(network, demand)
+    assert dispatch.optimal.any() and not dispatch.optimal.all()
+
+    lp = dc_opf_lp(network)
+    balance = lp.rows["BalancingEquation"]
+    for snapshot in np.flatnonzero(dispatch.optimal)[:10]:
+        lp.row_lb[balance] = lp.row_ub[balance] = demand[snapshot]
+        expected = solve_lp(lp).objective
+        assert generation_cost(network, dispatch.generation[snapshot]) == pytest.approx(
+            expected, abs=1e-7
+        )
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.model.power_system_model import PowerSystemModel
+
+
+def test_compiled_network_indexing(power_system_model: PowerSystemModel) -> None:
+    network = compile_network(power_system_model.parameters)
+
+    assert network.n_nodes == 5
+    assert network.n_branches == 6
+    assert list(network.branch_ids) == [
+        "LINE1", "LINE2", "LINE3", "TRAFO1", "TRAFO2", "TRAFO3"
+    ]
+    assert network.branch_from.dtype == np.int32
+    np.testing.assert_array_equal(network.branch_from, [0, 2, 0, 1, 3, 3])
+    np.testing.assert_array_equal(network.branch_to, [1, 1, 2, 2, 2, 2])
+    np.testing.assert_array_equal(network.node_generators(0), [0, 2])
+    np.testing.assert_array_equal(network.node_generators(4), [])
+    np.testing.assert_array_equal(network.branches_in(2), [2, 3, 4, 5])
+    np.testing.assert_array_equal(network.branches_out(3), [4, 5])
+
+
+def test_compiled_network_segments(power_system_model: PowerSystemModel) -> None:
+    marginal_costs = power_system_model.parameters.marginal_costs
+    power_system_model.parameters.marginal_costs = marginal_costs.iloc[::-1]
+    network = compile_network(power_system_model.parameters)
+
+    np.testing.assert_array_equal(network.gen_seg_ptr, [0, 2, 4, 6, 7])
+    np.testing.assert_array_equal(network.seg_start[:2], [-2.0, 0.0])
+    np.testing.assert_array_equal(network.seg_cost[:2], [-1.0, 2.0])
+
+
+def test_generator_without_segments_gets_zero_cost_segment(
+    power_system_model: PowerSystemModel,
+) -> None:
+    marginal_costs = power_system_model.parameters.marginal_costs
+    power_system_model.parameters.marginal_costs = marginal_costs[
+        marginal_costs["generator_id"] != "GEN4"
+    ]
+    network = compile_network(power_system_model.parameters)
+
+    assert list(network.generator_segments(3)) == [6]
+    assert (network.seg_start[6], network.seg_end[6]) == (-7.0, -3.5)
+    assert network.seg_cost[6] == 0.0
+
+
+def test_compiled_network_has_no_instance_dict(
+    power_system_model: PowerSystemModel,
+) -> None:
+    network = compile_network(power_system_model.parameters)
+    with pytest.raises(AttributeError):
+        network.__dict__
+    assert isinstance(network, CompiledNetwork)
+
+
+def test_compact_structure_network(
+    power_system_model: PowerSystemModel,
+    nodes_df,
+    transmission_lines_df,
+    trafos_df,
+    generators_df,
+    marginal_costs_df,
+) -> None:
+    compact = PowerSystemModel(
+        nodes=nodes_df.copy(),
+        transmission_lines=transmission_lines_df.copy(),
+        transformers=trafos_df.copy(),
+        generators=generators_df.copy(),
+        marginal_costs=marginal_costs_df.copy(),
+        compact=True,
+    )
+    network = compile_network(power_system_model.parameters)
+    compact_network = compile_network(compact.parameters)
+
+    for name in ("branch_from", "branch_to", "gen_node", "seg_gen", "seg_cost"):
+        np.testing.assert_array_equal(
+            getattr(compact_network, name), getattr(network, name)
+        )
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dc_opf.network import compile_network
+from src.dc_opf.opt_model import InfeasibleModelError, dc_opf
+from src.model.power_system_model import PowerSystemModel
+
+
+def test_dc_opf_writes_back_optimal_state(
+    power_system_model: PowerSystemModel,
+) -> None:
+    dc_opf(power_system_model)
+    state = power_system_model.state
+    network = compile_network(power_system_model.parameters)
+
+    assert not state.power_generation.isna().any()
+    assert state.power_generation.sum() == pytest.approx(network.demand.sum())
+    assert state.theta["N1"] == pytest.approx(0.0)
+
+    flow = np.concatenate([state.ts_power_flow, state.trafos_power_flow])
+    theta = state.theta.fillna(0.0).to_numpy()
+    expected_flow = network.susceptance * (
+        theta[network.branch_from] - theta[network.branch_to]
+    )
+    np.testing.assert_allclose(flow, expected_flow, atol=1e-7)
+    assert (flow <= network.f_max + 1e-7).all()
+    assert (flow >= network.f_min - 1e-7).all()
+
+
+def test_dc_opf_raises_on_infeasible_model(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> None:
+    model = PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+    )
+    with pytest.raises(InfeasibleModelError):
+        dc_opf(model)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dc_opf.network import compile_network
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.power_flow import PowerFlowSolver, dc_power_flow
+from src.dc_opf.sensitivity import SensitivityEngine
+from src.model.power_system_model import PowerSystemModel, SystemState
+
+
+@pytest.fixture
+def solved_model(power_system_model: PowerSystemModel) -> PowerSystemModel:
+    dc_opf(power_system_model)
+    return power_system_model
+
+
+def test_power_flow_of_optimal_dispatch(solved_model: PowerSystemModel) -> None:
+    state = solved_model.state
+    ts_flow, trafos_flow = state.ts_power_flow.copy(), state.trafos_power_flow.copy()
+    state.ts_power_flow.iloc[:] = np.nan
+    state.trafos_power_flow.iloc[:] = np.nan
+
+    result = dc_power_flow(solved_model)
+
+    assert result.theta.shape == (1, 5)
+    np.testing.assert_allclose(state.ts_power_flow, ts_flow, atol=1e-6)
+    np.testing.assert_allclose(state.trafos_power_flow, trafos_flow, atol=1e-6)
+    np.testing.assert_allclose(result.ts_power_flow.iloc[0], ts_flow, atol=1e-6)
+
+
+def test_demand_samples(solved_model: PowerSystemModel) -> None:
+    rng = np.random.default_rng(0)
+    demand = pd.DataFrame(rng.uniform(0.0, 1.0, (3000, 3)), columns=["N1", "N2", "N3"])
+    result = dc_power_flow(solved_model, demand=demand, batch_size=128)
+
+    assert result.theta.shape == (3000, 5)
+    assert result.ts_power_flow.shape == (3000, 3)
+    assert result.trafos_power_flow.shape == (3000, 3)
+    # batched solution matches solutions of single samples
+    for sample in [0, 1234, 2999]:
+        single = dc_power_flow(solved_model, demand=demand.loc[[sample]])
+        np.testing.assert_allclose(
+            single.theta.iloc[0], result.theta.loc[sample], atol=1e-9
+        )
+        # single sample is written to the state
+        np.testing.assert_allclose(
+            solved_model.state.theta, result.theta.loc[sample], atol=1e-9
+        )
+
+
+def test_flows_of_truncated_ptdf(solved_model: PowerSystemModel) -> None:
+    rng = np.random.default_rng(0)
+    demand = pd.DataFrame(rng.uniform(0.0, 1.0, (50, 3)), columns=["N1", "N2", "N3"])
+    exact = dc_power_flow(solved_model, demand=demand)
+    network = compile_network(solved_model.parameters)
+    ptdf = SensitivityEngine(network).sparse_ptdf(np.array([0, 2, 3]), threshold=0.1)
+    result = dc_power_flow(solved_model, demand=demand, batch_size=16, ptdf=ptdf)
+
+    assert result.theta.isna().all(axis=None)
+    assert result.ts_power_flow["LINE2"].isna().all()
+    flows = pd.concat([result.ts_power_flow, result.trafos_power_flow], axis=1)
+    exact_flows = pd.concat([exact.ts_power_flow, exact.trafos_power_flow], axis=1)
+    error = (flows - exact_flows).iloc[:, ptdf.monitored].abs()
+    bound = result.flow_error.iloc[:, ptdf.monitored]
+    assert (error.to_numpy() <= bound.to_numpy() + 1e-9).all()
+    assert result.flow_error["TRAFO2"].isna().all()
+    assert exact.flow_error is None
+
+
+def test_flows_satisfy_nodal_balance(power_system_model: PowerSystemModel) -> None:
+    network = compile_network(power_system_model.parameters)
+    rng = np.random.default_rng(1)
+    injections = rng.normal(size=(50, network.n_nodes))
+    injections[:, :4] -= injections[:, :4].mean(axis=1, keepdims=True)
+    injections[:, 4] = 0.0
+
+    theta, flow = PowerFlowSolver(network, batch_size=7).solve(injections)
+
+    net_outflow = np.zeros_like(injections)
+    np.add.at(net_outflow.T, network.branch_from, flow.T)
+    np.add.at(net_outflow.T, network.branch_to, -flow.T)
+    np.testing.assert_allclose(net_outflow, injections, atol=1e-9)
+    np.testing.assert_allclose(theta[:, network.slack], 0.0)
+
+
+def test_dispatch_samples(solved_model: PowerSystemModel) -> None:
+    generation = pd.DataFrame(
+        [solved_model.state.power_generation] * 4, index=list("abcd")
+    )
+    result = dc_power_flow(solved_model, generation=generation)
+    assert list(result.theta.index) == list("abcd")
+    np.testing.assert_allclose(result.theta.to_numpy(), result.theta.iloc[[0] * 4])
+
+    with pytest.raises(ValueError):
+        dc_power_flow(
+            solved_model, demand=pd.DataFrame({"N1": [1.0]}), generation=generation
+        )
+
+
+def test_undefined_dispatch(power_system_model: PowerSystemModel) -> None:
+    with pytest.raises(ValueError):
+        dc_power_flow(power_system_model)
+    assert isinstance(power_system_model.state, SystemState)
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+from src.dc_opf.lp import dc_opf_lp, solve_lp
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.presolve import (
+    flow_ranges,
+    presolved_dc_opf,
+    presolved_dc_opf_lp,
+    relaxed_dc_opf_lp,
+)
+from src.dc_opf.sensitivity import SensitivityEngine
+from src.model.power_system_model import PowerSystemModel
+
+
+@pytest.fixture
+def network(power_system_model: PowerSystemModel) -> CompiledNetwork:
+    return compile_network(power_system_model.parameters)
+
+
+def exact_flow_range(network: CompiledNetwork, branch: int) -> tuple[float, float]:
+    """Flow range of the branch over all balanced dispatches (by LP)."""
+    lp = dc_opf_lp(network)
+    flows = lp.columns["Flow"]
+    lp.col_lb[flows], lp.col_ub[flows] = -np.inf, np.inf
+    lp.cost[:] = 0.0
+    lp.cost[flows.start + branch] = 1.0
+    lower = solve_lp(lp).objective
+    lp.cost[flows.start + branch] = -1.0
+    return lower, -solve_lp(lp).objective
+
+
+def test_flow_ranges_contain_achievable_flows(network: CompiledNetwork) -> None:
+    ranges = flow_ranges(network)
+    for branch in range(network.n_branches):
+        lower, upper = exact_flow_range(network, branch)
+        assert ranges.lower[branch] <= lower + 1e-7
+        assert ranges.upper[branch] >= upper - 1e-7
+
+
+def test_demand_ranges_widen_flow_ranges(network: CompiledNetwork) -> None:
+    fixed = flow_ranges(network)
+    ranged = flow_ranges(network, network.demand - 0.5, network.demand + 0.5)
+    assert (ranged.lower <= fixed.lower + 1e-12).all()
+    assert (ranged.upper >= fixed.upper - 1e-12).all()
+
+
+def test_overbuilt_network_has_no_flow_rows(
+    power_system_model: PowerSystemModel,
+) -> None:
+    for branches in (
+        power_system_model.parameters.tramsmission_lines,
+        power_system_model.parameters.transformers,
+    ):
+        branches["F_max"], branches["F_min"] = 100.0, -100.0
+    network = compile_network(power_system_model.parameters)
+
+    lp, monitored = presolved_dc_opf_lp(network)
+    assert monitored.size == 0
+    assert lp.n_rows == 2 + network.n_generators
+    assert lp.n_rows < dc_opf_lp(network).n_rows
+
+
+@pytest.mark.parametrize("congested", [False, True])
+def test_presolved_dc_opf_matches_dc_opf(
+    power_system_model: PowerSystemModel, congested: bool
+) -> None:
+    if congested:
+        power_system_model.parameters.tramsmission_lines.loc["LINE3", "F_min"] = -0.5
+    network = compile_network(power_system_model.parameters)
+    lp, monitored = presolved_dc_opf_lp(network)
+    assert solve_lp(lp).objective == pytest.approx(
+        solve_lp(dc_opf_lp(network)).objective, abs=1e-7
+    )
+    if congested:
+        assert 2 in monitored
+
+    presolved_dc_opf(power_system_model)
+    state = power_system_model.state
+    generation, ts_flow = state.power_generation.copy(), state.ts_power_flow.copy()
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(generation, state.power_generation, atol=1e-7)
+    np.testing.assert_allclose(ts_flow, state.ts_power_flow, atol=1e-7)
+
+
+@pytest.mark.parametrize("congested", [False, True])
+def test_relaxed_dc_opf_matches_dc_opf(
+    power_system_model: PowerSystemModel, congested: bool
+) -> None:
+    if congested:
+        power_system_model.parameters.tramsmission_lines.loc["LINE3", "F_min"] = -0.5
+    network = compile_network(power_system_model.parameters)
+    lp = relaxed_dc_opf_lp(network)
+    flows = lp.columns["Flow"]
+    lower_binds, upper_binds = flow_ranges(network).binding(network)
+    np.testing.assert_array_equal(np.isfinite(lp.col_lb[flows]), lower_binds)
+    np.testing.assert_array_equal(np.isfinite(lp.col_ub[flows]), upper_binds)
+    assert not lower_binds.all() and not upper_binds.all()
+    assert solve_lp(lp).objective == pytest.approx(
+        solve_lp(dc_opf_lp(network)).objective, abs=1e-7
+    )
+
+    presolved_dc_opf(power_system_model, ptdf_form=False)
+    state = power_system_model.state
+    generation, ts_flow = state.power_generation.copy(), state.ts_power_flow.copy()
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(generation, state.power_generation, atol=1e-7)
+    np.testing.assert_allclose(ts_flow, state.ts_power_flow, atol=1e-7)
+
+
+def test_sparse_ptdf_flow_ranges(network: CompiledNetwork) -> None:
+    engine = SensitivityEngine(network)
+    ranges = flow_ranges(network, ptdf=engine.sparse_ptdf(threshold=0.2))
+    for branch in range(network.n_branches):
+        lower, upper = exact_flow_range(network, branch)
+        assert ranges.lower[branch] <= lower + 1e-7
+        assert ranges.upper[branch] >= upper - 1e-7
+
+
+def test_partial_sparse_ptdf(network: CompiledNetwork) -> None:
+    ptdf = SensitivityEngine(network).sparse_ptdf(np.array([0, 1, 3]))
+    with pytest.raises(ValueError):
+        flow_ranges(network, ptdf=ptdf)
+    # LINE3 (branch 2) limit may bind, but its row is not stored
+    with pytest.raises(ValueError):
+        presolved_dc_opf_lp(network, flow_ranges(network), ptdf)
+
+
+def test_presolved_dc_opf_with_sparse_ptdf(
+    power_system_model: PowerSystemModel,
+) -> None:
+    power_system_model.parameters.tramsmission_lines.loc["LINE3", "F_min"] = -0.5
+    presolved_dc_opf(power_system_model, ptdf_threshold=1e-6)
+    state = power_system_model.state
+    generation = state.power_generation.copy()
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(generation, state.power_generation, atol=1e-5)
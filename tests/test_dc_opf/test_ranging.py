@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.dc_opf.lp import solve_lp
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.ranging import demand_sweep, ranging_dc_opf
+from src.dc_opf.template import ModelTemplate
+from src.model.power_system_model import PowerSystemModel
+
+
+def solve_at(power_system_model: PowerSystemModel, node: str, demand: float):
+    structure = power_system_model.parameters
+    network, lp = ModelTemplate.compile(structure).instantiate(structure)
+    balance = lp.rows["BalancingEquation"]
+    row = balance.start + network.node_ids.get_loc(node)
+    lp.row_lb[row] = lp.row_ub[row] = demand
+    solution = solve_lp(lp)
+    return solution.objective, solution.row_dual[balance]
+
+
+def test_ranging(power_system_model: PowerSystemModel) -> None:
+    ranging = ranging_dc_opf(power_system_model)
+
+    generation = power_system_model.state.power_generation.copy()
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(
+        generation, power_system_model.state.power_generation, atol=1e-7
+    )
+
+    n1 = ranging.demand.loc["N1"]
+    assert (n1["lmp"], n1["lower"], n1["upper"]) == pytest.approx((1.0, 1.5, 4.5))
+    _, inside = solve_at(power_system_model, "N1", 4.4)
+    _, outside = solve_at(power_system_model, "N1", 4.6)
+    np.testing.assert_allclose(inside, ranging.demand["lmp"], atol=1e-9)
+    assert outside[0] == pytest.approx(2.0)
+
+    gen3 = ranging.cost.loc[("GEN3", 0.0)]
+    assert (gen3["cost"], gen3["lower"], gen3["upper"]) == (1.0, 0.0, 2.0)
+
+
+def test_demand_sweep_matches_resolves(power_system_model: PowerSystemModel) -> None:
+    sweep = demand_sweep(power_system_model, "N1", stop=6.0)
+
+    np.testing.assert_allclose(sweep.demand, [3.5, 4.5, 6.0])
+    assert sweep.solves == 2
+    for demand in np.linspace(3.5, 6.0, 11):
+        cost, lmp = solve_at(power_system_model, "N1", demand)
+        assert sweep.cost_at(demand) == pytest.approx(cost, abs=1e-9)
+        if not np.isclose(demand, 4.5):
+            np.testing.assert_allclose(sweep.lmp_at(demand).iloc[0], lmp, atol=1e-9)
+
+
+def test_demand_sweep_ends_at_max_feasible_demand(
+    power_system_model: PowerSystemModel,
+) -> None:
+    sweep = demand_sweep(power_system_model, "N1", stop=100.0)
+
+    # generators capacity is 7.0 and other nodes demand -2.0
+    assert sweep.demand[-1] == pytest.approx(9.0)
+    cost, _ = solve_at(power_system_model, "N1", sweep.demand[-1])
+    assert sweep.cost[-1] == pytest.approx(cost)
+    assert (np.diff(sweep.lmp["N1"]) >= -1e-9).all()
+
+
+def test_decreasing_demand_sweep(power_system_model: PowerSystemModel) -> None:
+    sweep = demand_sweep(power_system_model, "N1", stop=-4.0, start=2.0)
+
+    assert (sweep.demand[0], sweep.demand[-1]) == (-4.0, 2.0)
+    assert (np.diff(sweep.demand) > 0).all()
+    for demand in np.linspace(-4.0, 2.0, 13):
+        cost, _ = solve_at(power_system_model, "N1", demand)
+        assert sweep.cost_at(demand) == pytest.approx(cost, abs=1e-9)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.result_store import ResultStore, memoized_dc_opf
+from src.dc_opf.template import TemplateCache
+from src.model.power_system_model import PowerSystemModel
+
+
+def set_demand(power_system_model: PowerSystemModel, demand: float) -> None:
+    power_system_model.parameters.nodes.loc["N1", "P_demand"] = demand
+
+
+def test_repeated_snapshots_are_answered_from_store(
+    power_system_model: PowerSystemModel,
+) -> None:
+    store, templates = ResultStore(), TemplateCache()
+    outcomes = list()
+    for demand in (3.5, 3.0, 3.5, 3.0 + 1e-9, 3.2):
+        set_demand(power_system_model, demand)
+        outcomes.append(memoized_dc_opf(power_system_model, store, templates=templates))
+        generation = power_system_model.state.power_generation.copy()
+        dc_opf(power_system_model)
+        np.testing.assert_allclose(
+            generation, power_system_model.state.power_generation, atol=1e-6
+        )
+
+    assert outcomes == ["miss", "warm_start", "hit", "hit", "warm_start"]
+    assert len(store) == 3
+    assert store.stats.hit_rate == pytest.approx(0.4)
+    assert store.stats.time_saved > 0.0
+
+
+def test_stored_state(power_system_model: PowerSystemModel) -> None:
+    store = ResultStore()
+    memoized_dc_opf(power_system_model, store)
+    (result,) = store._results.values()
+
+    state = result.state(power_system_model.parameters)
+    np.testing.assert_allclose(
+        state.power_generation, power_system_model.state.power_generation
+    )
+    np.testing.assert_allclose(state.theta, power_system_model.state.theta)
+
+
+def test_availability_is_part_of_snapshot(
+    power_system_model: PowerSystemModel,
+) -> None:
+    store = ResultStore()
+    memoized_dc_opf(power_system_model, store)
+    availability = np.ones(len(power_system_model.parameters.generators))
+    availability[2] = 0.5
+
+    assert memoized_dc_opf(power_system_model, store, availability) == "warm_start"
+    p_max = power_system_model.parameters.generators["P_max"].iloc[2]
+    assert power_system_model.state.power_generation.iloc[2] <= 0.5 * p_max + 1e-7
+
+
+def test_derating_below_minimal_generation(
+    power_system_model: PowerSystemModel,
+) -> None:
+    # GEN2 P_min 3.0 is above its derated capacity 0.5 * 4.5
+    availability = np.ones(len(power_system_model.parameters.generators))
+    availability[1] = 0.5
+
+    memoized_dc_opf(power_system_model, ResultStore(), availability)
+    assert power_system_model.state.power_generation.iloc[1] == pytest.approx(2.25)
+
+
+def test_store_size_is_bounded(power_system_model: PowerSystemModel) -> None:
+    store = ResultStore(maxsize=2)
+    for demand in (3.0, 3.1, 3.2, 3.0):
+        set_demand(power_system_model, demand)
+        memoized_dc_opf(power_system_model, store)
+
+    # the first snapshot was evicted before it repeated
+    assert len(store) == 2
+    assert store.stats.hits == 0 and store.stats.lookups == 4
@@ -0,0 +1,170 @@
+import numpy as np
+import pytest
+
+from src.dc_opf.network import CompiledNetwork, compile_network
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.sensitivity import (SensitivityEngine, factorize, islands,
+                                    reference_nodes, topology_hash)
+from src.model.power_system_model import PowerSystemModel
+
+
+def dense_ptdf(network: CompiledNetwork, out_of_service=()) -> np.ndarray:
+    """Reference PTDF computed with a dense inverse."""
+    susceptance = network.susceptance.copy()
+    susceptance[list(out_of_service)] = 0.0
+    incidence = np.zeros((network.n_branches, network.n_nodes))
+    incidence[np.arange(network.n_branches), network.branch_from] = 1.0
+    incidence[np.arange(network.n_branches), network.branch_to] = -1.0
+    b_bus = incidence.T @ np.diag(susceptance) @ incidence
+    kept = np.setdiff1d(np.arange(network.n_nodes), reference_nodes(network))
+    inverse = np.zeros_like(b_bus)
+    inverse[np.ix_(kept, kept)] = np.linalg.inv(b_bus[np.ix_(kept, kept)])
+    return np.diag(susceptance) @ incidence @ inverse
+
+
+@pytest.fixture
+def network(power_system_model: PowerSystemModel) -> CompiledNetwork:
+    return compile_network(power_system_model.parameters)
+
+
+def test_reference_node_per_island(network: CompiledNetwork) -> None:
+    labels = islands(network)
+    assert len(np.unique(labels)) == 2
+    np.testing.assert_array_equal(reference_nodes(network), [0, 4])
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 512])
+def test_ptdf_matches_dense_inverse(network: CompiledNetwork, batch_size: int) -> None:
+    engine = SensitivityEngine(network, batch_size=batch_size)
+    np.testing.assert_allclose(engine.ptdf(), dense_ptdf(network), atol=1e-10)
+
+    monitored = np.array([4, 0])
+    np.testing.assert_allclose(
+        engine.ptdf(monitored), dense_ptdf(network)[monitored], atol=1e-10
+    )
+
+
+def test_ptdf_float32_storage(network: CompiledNetwork) -> None:
+    ptdf = SensitivityEngine(network).ptdf(dtype=np.float32)
+    assert ptdf.dtype == np.float32
+    np.testing.assert_allclose(ptdf, dense_ptdf(network), atol=1e-6)
+
+
+def test_flows_match_dc_opf(power_system_model: PowerSystemModel) -> None:
+    dc_opf(power_system_model)
+    state = power_system_model.state
+    network = compile_network(power_system_model.parameters)
+    generation = np.bincount(
+        network.gen_node, weights=state.power_generation, minlength=network.n_nodes
+    )
+    flows = SensitivityEngine(network).flows(generation - network.demand)
+    np.testing.assert_allclose(
+        flows,
+        np.concatenate([state.ts_power_flow, state.trafos_power_flow]),
+        atol=1e-7,
+    )
+
+
+def test_lodf_and_outage_ptdf(network: CompiledNetwork) -> None:
+    engine = SensitivityEngine(network)
+    base = dense_ptdf(network)
+    for outage in [0, 1, 3, 4]:
+        expected = dense_ptdf(network, out_of_service=[outage])
+        np.testing.assert_allclose(
+            engine.outage_ptdf([outage]), expected, atol=1e-9
+        )
+        # PTDF' = PTDF + LODF[:, k] PTDF_k
+        lodf = engine.lodf([outage])
+        np.testing.assert_allclose(
+            base + lodf @ base[[outage]], expected, atol=1e-9
+        )
+
+    expected = dense_ptdf(network, out_of_service=[0, 4])
+    np.testing.assert_allclose(engine.outage_ptdf([0, 4]), expected, atol=1e-9)
+
+
+def test_islanding_outage(power_system_model: PowerSystemModel) -> None:
+    engine = SensitivityEngine(compile_network(power_system_model.parameters))
+    with pytest.raises(ValueError):
+        engine.outage_ptdf([4, 5])
+
+    structure = power_system_model.parameters
+    structure.transformers = structure.transformers.drop(index="TRAFO3")
+    engine = SensitivityEngine(compile_network(structure))
+    assert np.isnan(engine.lodf([4], monitored=[0, 1, 2])).all()
+
+
+def test_factorization_is_cached_by_topology(
+    power_system_model: PowerSystemModel,
+) -> None:
+    first = compile_network(power_system_model.parameters)
+    power_system_model.parameters.nodes["P_demand"] = 0.0
+    second = compile_network(power_system_model.parameters)
+    assert topology_hash(first) == topology_hash(second)
+    assert factorize(first) is factorize(second)
+
+    power_system_model.parameters.tramsmission_lines["reactance"] *= 2.0
+    third = compile_network(power_system_model.parameters)
+    assert factorize(third) is not factorize(first)
+
+
+def test_sparse_ptdf_error_bound(network: CompiledNetwork) -> None:
+    engine = SensitivityEngine(network, batch_size=2)
+    exact = dense_ptdf(network)
+    threshold = 0.5 * np.abs(exact[exact != 0.0]).min() + 0.1
+    ptdf = engine.sparse_ptdf(threshold=threshold)
+
+    assert ptdf.matrix.dtype == np.float32
+    assert 0 < ptdf.matrix.nnz < np.count_nonzero(exact)
+    assert np.abs(ptdf.matrix.data).min() >= threshold
+    np.testing.assert_allclose(
+        ptdf.residual, np.abs(exact - ptdf.matrix.toarray()).sum(axis=1), atol=1e-12
+    )
+    injections = np.random.default_rng(0).uniform(-2.0, 2.0, (network.n_nodes, 8))
+    error = np.abs(ptdf.flows(injections) - engine.flows(injections))
+    assert (error <= ptdf.error_bound(injections) + 1e-12).all()
+    assert (error > 1e-6).any()
+
+
+def test_sparse_ptdf_rows(network: CompiledNetwork) -> None:
+    ptdf = SensitivityEngine(network).sparse_ptdf(np.array([4, 0, 2]), threshold=0.0)
+    np.testing.assert_allclose(
+        ptdf.rows([0, 4]).toarray(), dense_ptdf(network)[[0, 4]], atol=1e-6
+    )
+    assert ptdf.residual.max() < 1e-6
+    with pytest.raises(ValueError):
+        ptdf.rows([1])
+
+
+def test_sparse_lodf_and_outage_ptdf(network: CompiledNetwork) -> None:
+    engine = SensitivityEngine(network)
+    ptdf = engine.sparse_ptdf(np.array([0, 1, 2, 3]), threshold=0.0)
+    np.testing.assert_allclose(
+        engine.lodf([1, 4], ptdf=ptdf), engine.lodf([1, 4], [0, 1, 2, 3]), atol=1e-6
+    )
+
+    outage = engine.sparse_outage_ptdf([1], ptdf)
+    expected = dense_ptdf(network, out_of_service=[1])[[0, 1, 2, 3]]
+    np.testing.assert_allclose(outage.matrix.toarray(), expected, atol=1e-6)
+    assert outage.residual.max() < 1e-5
+
+
+def test_sparse_outage_ptdf_error_bound(
+    power_system_model: PowerSystemModel,
+) -> None:
+    structure = power_system_model.parameters
+    structure.transformers.loc["TRAFO1", "phase_shift"] = 0.1
+    network = compile_network(structure)
+    engine = SensitivityEngine(network)
+    ptdf = engine.sparse_ptdf(threshold=0.15)
+    outage = engine.sparse_outage_ptdf([4], ptdf)
+
+    structure.transformers = structure.transformers.drop(index="TRAFO2")
+    post_outage = SensitivityEngine(compile_network(structure))
+    injections = np.random.default_rng(0).uniform(-2.0, 2.0, (network.n_nodes, 8))
+    remaining = [0, 1, 2, 3, 5]
+    flows = outage.flows(injections)
+    error = np.abs(flows[remaining] - post_outage.flows(injections))
+    assert (error <= outage.error_bound(injections)[remaining] + 1e-9).all()
+    assert (error > 1e-6).any()
+    np.testing.assert_array_equal(flows[4], 0.0)
@@ -0,0 +1,120 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dc_opf.opt_model import InfeasibleModelError, dc_opf
+from src.dc_opf.service import DispatchService
+from src.dc_opf.template import TemplateCache
+from src.model.power_system_model import PowerSystemModel
+from src.model.structure_delta import StructureDelta, TableDelta
+
+
+def run_burst(power_system_model: PowerSystemModel, demands: list, **kwargs):
+    async def burst():
+        async with DispatchService(TemplateCache(), **kwargs) as service:
+            states = await asyncio.gather(
+                *(
+                    service.dispatch(power_system_model, pd.Series({"N1": demand}))
+                    for demand in demands
+                ),
+                return_exceptions=True,
+            )
+        return service, states
+
+    return asyncio.run(burst())
+
+
+def test_burst_is_coalesced(power_system_model: PowerSystemModel) -> None:
+    demands = [3.0, 3.5, 3.0, 3.2, 3.5, 3.0]
+    service, states = run_burst(power_system_model, demands)
+
+    assert service.stats.requests == 6
+    assert service.stats.coalesced == 3
+    assert service.stats.batches == 1 and service.stats.snapshots == 3
+    for demand, state in zip(demands, states):
+        power_system_model.parameters.nodes.loc["N1", "P_demand"] = demand
+        dc_opf(power_system_model)
+        np.testing.assert_allclose(
+            state.power_generation, power_system_model.state.power_generation, atol=1e-6
+        )
+        np.testing.assert_allclose(
+            state.ts_power_flow, power_system_model.state.ts_power_flow, atol=1e-6
+        )
+    # every caller owns its state
+    assert states[0] is not states[2]
+    assert states[0].power_generation is not states[2].power_generation
+
+
+def test_batch_size_is_bounded(power_system_model: PowerSystemModel) -> None:
+    demands = list(np.linspace(3.0, 3.5, 10))
+    service, states = run_burst(power_system_model, demands, max_batch_size=4)
+
+    assert service.stats.batches == 3 and service.stats.snapshots == 10
+    assert all(state.power_generation.notna().all() for state in states)
+
+
+def test_infeasible_snapshot_fails_alone(power_system_model: PowerSystemModel) -> None:
+    service, states = run_burst(power_system_model, [3.0, 100.0, 3.5])
+
+    assert isinstance(states[1], InfeasibleModelError)
+    assert states[0].power_generation.notna().all()
+    assert states[2].power_generation.notna().all()
+
+
+def test_structure_changed_within_burst(power_system_model: PowerSystemModel) -> None:
+    lines = power_system_model.parameters.tramsmission_lines
+    line = lines.loc[["LINE3"]].copy()
+    line["reactance"] = 0.2
+    delta = StructureDelta(tramsmission_lines=TableDelta(upsert=line))
+
+    async def burst():
+        async with DispatchService(TemplateCache(), max_wait=0.05) as service:
+            first = asyncio.ensure_future(service.dispatch(power_system_model))
+            await asyncio.sleep(0)
+            # the structure object is kept, its tables are replaced
+            power_system_model.apply(delta)
+            second = await service.dispatch(power_system_model)
+            return await first, second
+
+    first, second = asyncio.run(burst())
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(
+        second.ts_power_flow, power_system_model.state.ts_power_flow, atol=1e-6
+    )
+    assert not np.allclose(first.ts_power_flow, second.ts_power_flow)
+
+
+def test_availability(power_system_model: PowerSystemModel) -> None:
+    async def dispatch():
+        async with DispatchService(TemplateCache()) as service:
+            return await service.dispatch(
+                power_system_model, availability=pd.Series({"GEN3": 0.5})
+            )
+
+    state = asyncio.run(dispatch())
+    assert state.power_generation["GEN3"] <= 1.5 + 1e-7
+
+
+def test_derating_below_minimal_generation(
+    power_system_model: PowerSystemModel,
+) -> None:
+    # GEN2 P_min 3.0 is above its derated capacity 0.5 * 4.5
+    async def dispatch():
+        async with DispatchService(TemplateCache()) as service:
+            return await service.dispatch(
+                power_system_model, availability=pd.Series({"GEN2": 0.5})
+            )
+
+    state = asyncio.run(dispatch())
+    assert state.power_generation["GEN2"] == pytest.approx(2.25)
+
+
+def test_unknown_node(power_system_model: PowerSystemModel) -> None:
+    async def dispatch():
+        async with DispatchService(TemplateCache()) as service:
+            await service.dispatch(power_system_model, pd.Series({"N9": 1.0}))
+
+    with pytest.raises(KeyError):
+        asyncio.run(dispatch())
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from pyomo.environ import value
+
+from src.dc_opf.lp import dc_opf_lp, solve_lp
+from src.dc_opf.network import compile_network
+from src.dc_opf.opt_model import SlackPenalties, dc_opf, dc_opf_model, solve
+from src.model.power_system_model import PowerSystemModel
+
+
+def test_soft_dc_opf_on_feasible_model_has_zero_slacks(
+    power_system_model: PowerSystemModel,
+) -> None:
+    dc_opf(power_system_model)
+    expected = power_system_model.state.power_generation.copy()
+    dc_opf(power_system_model, penalties=SlackPenalties())
+    state = power_system_model.state
+
+    np.testing.assert_allclose(state.power_generation, expected, atol=1e-7)
+    for slack in (
+        state.load_shedding,
+        state.generation_spill,
+        state.ts_overload,
+        state.trafos_overload,
+    ):
+        np.testing.assert_allclose(slack, 0.0, atol=1e-7)
+
+
+def test_soft_dc_opf_reports_infeasibility_as_slacks(
+    power_system_model: PowerSystemModel,
+) -> None:
+    power_system_model.parameters.nodes.loc["N5", "P_demand"] = 1.0
+    power_system_model.parameters.tramsmission_lines.loc["LINE2", "F_min"] = -1.0
+
+    dc_opf(power_system_model, penalties=SlackPenalties())
+    state = power_system_model.state
+
+    # N5 is isolated: its demand cannot be covered
+    assert state.load_shedding["N5"] == pytest.approx(1.0)
+    assert state.generation_spill.sum() == pytest.approx(0.0, abs=1e-7)
+    assert state.ts_overload.abs().sum() > 0.0
+    assert state.ts_power_flow["LINE2"] == pytest.approx(
+        -1.0 + state.ts_overload["LINE2"]
+    )
+
+
+def test_soft_lp_matches_pyomo_model(power_system_model: PowerSystemModel) -> None:
+    power_system_model.parameters.nodes.loc["N5", "P_demand"] = 1.0
+    network = compile_network(power_system_model.parameters)
+    penalties = SlackPenalties(load_shedding=50.0, overload=5.0)
+
+    opt_model = dc_opf_model(network, penalties)
+    solve(opt_model)
+    lp = dc_opf_lp(network, penalties)
+    solution = solve_lp(lp)
+
+    assert solution.objective == pytest.approx(value(opt_model.obj))
+    assert lp.n_rows == dc_opf_lp(network).n_rows
+    np.testing.assert_allclose(solution.x[lp.columns["Shed"]], [0, 0, 0, 0, 1.0])
+
+
+def test_load_shedding_is_bounded_by_demand(
+    power_system_model: PowerSystemModel,
+) -> None:
+    # shedding at N1 (zero demand) would otherwise be a generator cheaper
+    # than generation behind the congested LINE1
+    power_system_model.parameters.nodes.loc["N1", "P_demand"] = 0.0
+    power_system_model.parameters.tramsmission_lines.loc["LINE1", "F_max"] = 0.1
+    power_system_model.parameters.tramsmission_lines.loc["LINE1", "F_min"] = -0.1
+    network = compile_network(power_system_model.parameters)
+    penalties = SlackPenalties(load_shedding=0.5)
+
+    opt_model = dc_opf_model(network, penalties)
+    solve(opt_model)
+    lp = dc_opf_lp(network, penalties)
+    solution = solve_lp(lp)
+    shed_max, spill_max = network.slack_limits()
+
+    assert solution.objective == pytest.approx(value(opt_model.obj))
+    assert solution.x[lp.columns["Shed"]][0] == pytest.approx(0.0, abs=1e-7)
+    assert (solution.x[lp.columns["Shed"]] <= shed_max + 1e-7).all()
+    assert (solution.x[lp.columns["Spill"]] <= spill_max + 1e-7).all()
+    assert value(opt_model.Shed[0]) == pytest.approx(0.0, abs=1e-7)
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dc_opf.lp import dc_opf_lp, solve_lp
+from src.dc_opf.network import compile_network
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.stochastic import ScenarioSet, stochastic_dc_opf
+from src.model.power_system_model import PowerSystemModel
+
+
+@pytest.fixture
+def scenarios(power_system_model: PowerSystemModel) -> ScenarioSet:
+    base = power_system_model.parameters.nodes["P_demand"].fillna(0.0)
+    demand = pd.DataFrame([base, base, base], index=["S1", "S2", "S3"])
+    demand.loc["S2", "N1"] += 0.5
+    demand.loc["S3", "N2"] -= 0.4
+    return ScenarioSet(
+        demand=demand,
+        availability=pd.DataFrame({"GEN1": [1.0, 0.9, 0.5]}, index=["S1", "S2", "S3"]),
+        probability=pd.Series([0.5, 0.25, 0.25], index=["S1", "S2", "S3"]),
+    )
+
+
+def test_dc_opf_lp_matches_pyomo_model(power_system_model: PowerSystemModel) -> None:
+    network = compile_network(power_system_model.parameters)
+    lp = dc_opf_lp(network)
+    solution = solve_lp(lp)
+    dc_opf(power_system_model)
+    np.testing.assert_allclose(
+        solution.x[lp.columns["Gen"]],
+        power_system_model.state.power_generation,
+        atol=1e-7,
+    )
+
+
+def test_invalid_probabilities(power_system_model: PowerSystemModel) -> None:
+    demand = pd.DataFrame({"N1": [1.0, 2.0]})
+    with pytest.raises(ValueError):
+        ScenarioSet(demand=demand, probability=pd.Series([0.5, 0.6]))
+
+
+def test_single_scenario_equals_deterministic_dc_opf(
+    power_system_model: PowerSystemModel,
+) -> None:
+    nodes = power_system_model.parameters.nodes
+    scenarios = ScenarioSet(demand=nodes[["P_demand"]].T.fillna(0.0))
+    result = stochastic_dc_opf(power_system_model, scenarios)
+
+    network = compile_network(power_system_model.parameters)
+    expected = solve_lp(dc_opf_lp(network))
+    assert result.expected_cost == pytest.approx(expected.objective, abs=1e-7)
+    scenario = scenarios.scenario_ids[0]
+    state = result.state(power_system_model, scenario)
+    balance = state.power_generation.sum() - network.demand.sum()
+    assert balance == pytest.approx(0.0, abs=1e-7)
+
+
+def test_recourse_balances_each_scenario(
+    power_system_model: PowerSystemModel, scenarios: ScenarioSet
+) -> None:
+    result = stochastic_dc_opf(power_system_model, scenarios)
+    network = compile_network(power_system_model.parameters)
+    demand = scenarios.demand_matrix(network)
+
+    np.testing.assert_allclose(
+        result.power_generation.sum(axis=1), demand.sum(axis=1), atol=1e-7
+    )
+    assert result.power_generation.loc["S3", "GEN1"] <= 0.5 * 3.0 + 1e-7
+    assert (result.power_flow.abs().to_numpy() <= network.f_max + 1e-7).all()
+
+
+def test_progressive_hedging_converges_to_extensive_form(
+    power_system_model: PowerSystemModel, scenarios: ScenarioSet
+) -> None:
+    extensive = stochastic_dc_opf(power_system_model, scenarios)
+    hedged = stochastic_dc_opf(
+        power_system_model,
+        scenarios,
+        progressive_hedging=True,
+        rho=2.0,
+        tolerance=1e-5,
+        max_iterations=500,
+        max_workers=2,
+    )
+    assert hedged.expected_cost == pytest.approx(extensive.expected_cost, abs=1e-3)
+    assert hedged.converged and hedged.residual < 1e-5
+
+
+def test_progressive_hedging_iterations_limit(
+    power_system_model: PowerSystemModel, scenarios: ScenarioSet
+) -> None:
+    # expensive recourse makes scenario schedules disagree
+    result = stochastic_dc_opf(
+        power_system_model,
+        scenarios,
+        upward_cost=5.0,
+        downward_cost=5.0,
+        progressive_hedging=True,
+        max_iterations=2,
+        max_workers=1,
+    )
+    assert not result.converged
+    assert result.residual > 1e-4
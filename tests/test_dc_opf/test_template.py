@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from src.dc_opf.opt_model import dc_opf
+from src.dc_opf.template import (
+    ModelTemplate,
+    TemplateCache,
+    structure_hash,
+    template_dc_opf,
+)
+from src.model.power_system_model import PowerSystemModel
+
+
+def test_structure_hash_ignores_demand(power_system_model: PowerSystemModel) -> None:
+    structure = power_system_model.parameters
+    key = structure_hash(structure)
+    structure.nodes.loc["N1", "P_demand"] += 1.0
+    assert structure_hash(structure) == key
+    structure.tramsmission_lines.loc["LINE1", "F_max"] += 1.0
+    assert structure_hash(structure) != key
+
+
+def test_template_dc_opf_matches_dc_opf(power_system_model: PowerSystemModel) -> None:
+    cache = TemplateCache()
+    results = list()
+    for demand in (3.5, 3.0):
+        power_system_model.parameters.nodes.loc["N1", "P_demand"] = demand
+        dc_opf(power_system_model)
+        expected = power_system_model.state.power_generation.copy()
+        template_dc_opf(power_system_model, cache)
+        np.testing.assert_allclose(
+            power_system_model.state.power_generation, expected, atol=1e-7
+        )
+        results.append(expected)
+
+    assert cache.misses == 1 and cache.memory_hits == 1
+    assert not np.allclose(results[0], results[1])
+
+
+def test_memory_tier_is_lru(power_system_model: PowerSystemModel) -> None:
+    structure = power_system_model.parameters
+    cache = TemplateCache(maxsize=1)
+    first = cache.get(structure)
+    structure.tramsmission_lines.loc["LINE1", "F_max"] += 1.0
+    cache.get(structure)
+    structure.tramsmission_lines.loc["LINE1", "F_max"] -= 1.0
+    assert cache.get(structure) is not first
+    assert cache.misses == 3
+
+
+def test_disk_tier(tmp_path, power_system_model: PowerSystemModel) -> None:
+    structure = power_system_model.parameters
+    compiled = TemplateCache(directory=tmp_path).get(structure)
+
+    cache = TemplateCache(directory=tmp_path)
+    loaded = cache.get(structure)
+    assert cache.disk_hits == 1 and cache.misses == 0
+    assert isinstance(loaded.network.susceptance, np.memmap)
+    assert list(loaded.network.node_ids) == list(compiled.network.node_ids)
+    assert (loaded.lp.matrix != compiled.lp.matrix).nnz == 0
+    np.testing.assert_array_equal(loaded.lp.col_ub, compiled.lp.col_ub)
+
+    dc_opf(power_system_model)
+    expected = power_system_model.state.power_generation.copy()
+    template_dc_opf(power_system_model, cache)
+    np.testing.assert_allclose(
+        power_system_model.state.power_generation, expected, atol=1e-7
+    )
+
+
+def test_saved_template_is_not_overwritten(
+    tmp_path, power_system_model: PowerSystemModel
+) -> None:
+    template = ModelTemplate.compile(power_system_model.parameters)
+    template.save(tmp_path / "template")
+    loaded = ModelTemplate.load(tmp_path / "template")
+    inode = (tmp_path / "template" / "lp.cost.npy").stat().st_ino
+
+    ModelTemplate.compile(power_system_model.parameters).save(tmp_path / "template")
+    assert (tmp_path / "template" / "lp.cost.npy").stat().st_ino == inode
+    np.testing.assert_array_equal(loaded.lp.cost, template.lp.cost)
+    assert [path.name for path in tmp_path.iterdir()] == ["template"]
+
+
+def test_incomplete_template_is_replaced(
+    tmp_path, power_system_model: PowerSystemModel
+) -> None:
+    (tmp_path / "template").mkdir()
+    (tmp_path / "template" / "lp.cost.npy").write_bytes(b"")
+    template = ModelTemplate.compile(power_system_model.parameters)
+    template.save(tmp_path / "template")
+
+    loaded = ModelTemplate.load(tmp_path / "template")
+    np.testing.assert_array_equal(loaded.lp.cost, template.lp.cost)
+
+
+def test_instances_share_template_arrays(
+    power_system_model: PowerSystemModel,
+) -> None:
+    structure = power_system_model.parameters
+    template = ModelTemplate.compile(structure)
+    network, lp = template.instantiate(structure)
+
+    assert network.susceptance is template.network.susceptance
+    assert lp.matrix is template.lp.matrix
+    np.testing.assert_array_equal(
+        lp.row_lb[lp.rows["BalancingEquation"]], network.demand
+    )
+    assert (template.lp.row_lb[template.lp.rows["BalancingEquation"]] == 0.0).all()
+    assert template.factorization is template.factorization
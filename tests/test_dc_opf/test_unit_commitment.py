@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dc_opf.unit_commitment import CommitmentData, unit_commitment
+from src.model.power_system_model import PowerSystemModel
+from src.model.time_series import TimeSeries, TimeSeriesData
+
+
+@pytest.fixture
+def commitment_model(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> PowerSystemModel:
+    """Feasible model where GEN1 is a cheap unit worth committing at high demand."""
+    transmission_lines_df.loc["LINE2", "F_max"] = 2.0
+    trafos_df["phase_shift"] = 0.0
+    generators_df.loc["GEN1", ["P_min", "P_max"]] = [1.0, 3.0]
+    marginal_costs_df.loc[5, "cost"] = 4.0
+    marginal_costs_df = pd.concat(
+        [
+            marginal_costs_df[marginal_costs_df["generator_id"] != "GEN1"],
+            pd.DataFrame(
+                [{"generator_id": "GEN1", "p_start": 1.0, "p_end": 3.0, "cost": 0.5}]
+            ),
+        ],
+        ignore_index=True,
+    )
+    return PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+    )
+
+
+@pytest.fixture
+def time_series(commitment_model: PowerSystemModel) -> TimeSeriesData:
+    demand = pd.DataFrame({"N1": [3.5, 0.5, 0.5, 3.5]}).T
+    return TimeSeriesData(commitment_model.parameters, TimeSeries.from_frame(demand))
+
+
+def commitment(**columns) -> CommitmentData:
+    return CommitmentData(
+        pd.DataFrame(
+            {"no_load_cost": [1.0], **columns},
+            index=pd.Index(["GEN1"], name="generator_id"),
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "columns, expected",
+    [
+        ({}, [1, 0, 0, 1]),
+        ({"startup_cost": [10.0]}, [1, 1, 1, 1]),
+        ({"min_down": [3]}, [1, 1, 1, 1]),
+        ({"initial_status": [0], "min_up": [3]}, [1, 1, 1, 1]),
+    ],
+)
+def test_commitment(
+    commitment_model: PowerSystemModel,
+    time_series: TimeSeriesData,
+    columns: dict,
+    expected: list[int],
+) -> None:
+    result = unit_commitment(commitment_model, time_series, commitment(**columns))
+
+    assert result.commitment["GEN1"].tolist() == expected
+    assert result.status == "Optimal"
+    assert result.cost >= result.relaxation_cost - 1e-9
+    # generation of a unit which is off is zero, otherwise within its bounds
+    generation = result.power_generation["GEN1"].to_numpy()
+    on = np.array(expected, dtype=bool)
+    np.testing.assert_allclose(generation[~on], 0.0, atol=1e-9)
+    assert ((generation[on] >= 1.0 - 1e-9) & (generation[on] <= 3.0 + 1e-9)).all()
+
+
+def test_startups_and_costs(
+    commitment_model: PowerSystemModel, time_series: TimeSeriesData
+) -> None:
+    data = commitment(initial_status=[0], startup_cost=[0.25])
+    result = unit_commitment(commitment_model, time_series, data)
+    cold = unit_commitment(commitment_model, time_series, data, warm_start=False)
+
+    assert result.startup["GEN1"].tolist() == [1, 0, 0, 1]
+    assert result.cost == pytest.approx(cold.cost)
+    assert result.cost == pytest.approx(3.5)
+
+
+def test_state_is_balanced(
+    commitment_model: PowerSystemModel, time_series: TimeSeriesData
+) -> None:
+    result = unit_commitment(commitment_model, time_series, commitment())
+    demand = time_series.demand_samples()
+
+    for step in time_series.time:
+        state = result.state(commitment_model, step)
+        nodes = commitment_model.parameters.nodes["P_demand"].fillna(0.0).copy()
+        nodes.update(demand.loc[step])
+        assert state.power_generation.sum() == pytest.approx(nodes.sum())
+
+
+def test_invalid_commitment_data() -> None:
+    with pytest.raises(ValueError):
+        commitment(min_up=[0])
+    with pytest.raises(ValueError):
+        commitment(startup_cost=[-1.0])
+    with pytest.raises(ValueError):
+        commitment(initial_status=[2])
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dc_opf.network import compile_network
+from src.dc_opf.sensitivity import SensitivityEngine
+from src.dc_opf.zonal import generation_shift_keys, zonal_ptdf
+from src.model.power_system_model import PowerSystemModel, SystemStructure
+from src.model.time_series import TimeSeries
+
+
+@pytest.fixture
+def structure(power_system_model: PowerSystemModel) -> SystemStructure:
+    structure = power_system_model.parameters
+    structure.nodes["zone_id"] = ["A", "A", "B", "B", None]
+    return structure
+
+
+@pytest.fixture
+def availability() -> TimeSeries:
+    return TimeSeries.from_frame(
+        pd.DataFrame(
+            [[1.0, 0.5, 0.0], [0.2, 1.0, 1.0]],
+            index=["GEN1", "GEN2"],
+            columns=pd.date_range("2024-01-01", periods=3, freq="h"),
+        )
+    )
+
+
+def test_generation_shift_keys(
+    structure: SystemStructure, availability: TimeSeries
+) -> None:
+    keys = generation_shift_keys(structure, ["P_max", "flat"], availability)
+
+    np.testing.assert_array_equal(keys.nodes, [0, 1, 2])
+    np.testing.assert_array_equal(keys.node_zone, [0, 0, 1])
+    assert keys.keys.shape == (2, 3, 3)
+    # N1: GEN1 (P_max 3.0, available 1.0) and GEN3 (3.0), N2: GEN2 (4.5 * 0.2)
+    np.testing.assert_allclose(keys.keys[0, 0, :2], [6.0 / 6.9, 0.9 / 6.9])
+    np.testing.assert_allclose(keys.keys[1, 2], [0.5, 0.5, 1.0])
+    # the only zone B generator has negative P_max
+    assert np.isnan(keys.keys[0, :, 2]).all()
+
+
+def test_static_shift_keys(structure: SystemStructure) -> None:
+    structure.generators["gsk"] = [1.0, 3.0, 0.0, 2.0]
+    keys = generation_shift_keys(structure, ["gsk"])
+
+    assert len(keys.time) == 1
+    np.testing.assert_allclose(keys.keys[0, 0], [0.25, 0.75, 1.0])
+
+
+def test_zonal_ptdf_matches_nodal_ptdf(
+    structure: SystemStructure, availability: TimeSeries
+) -> None:
+    network = compile_network(structure)
+    keys = generation_shift_keys(structure, ["headroom", "flat"], availability)
+    monitored = np.array([2, 0, 3])
+    result = zonal_ptdf(network, keys, monitored, hub="A")
+
+    ptdf = SensitivityEngine(network).ptdf(monitored)
+    for v, variant in enumerate(keys.variants):
+        for t, step in enumerate(keys.time):
+            gsk = np.zeros((network.n_nodes, len(keys.zones)))
+            gsk[keys.nodes, keys.node_zone] = keys.keys[v, t]
+            expected = ptdf @ gsk
+            frame = result.frame(variant, step)
+            np.testing.assert_allclose(frame, expected - expected[:, [0]], atol=1e-12)
+            assert frame.index.tolist() == ["LINE3", "LINE1", "TRAFO1"]
+
+
+def test_zonal_ptdf_of_zone_without_generators(structure: SystemStructure) -> None:
+    structure.nodes["zone_id"] = ["A", "A", "A", "C", "B"]
+    keys = generation_shift_keys(structure)
+    result = zonal_ptdf(compile_network(structure), keys)
+
+    assert keys.zones.tolist() == ["A", "B", "C"]
+    assert np.isnan(result.values[..., 1:]).all()
+    assert np.isfinite(result.values[..., 0]).all()
+
+
+def test_shift_keys_require_zones(power_system_model: PowerSystemModel) -> None:
+    with pytest.raises(ValueError):
+        generation_shift_keys(power_system_model.parameters)
@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ("pyomo", "rich", "highspy")
+# own import time of the data model layer (on top of pandas and pandera)
+IMPORT_TIME_LIMIT = 0.2
+
+_SCRIPT = """
+import json, sys, time
+import pandas, pandera
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def _cold_import(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "src.model.power_system_model",
+        "src.dc_opf.network",
+        "src.dc_opf.opt_model",
+        "src.dc_opf.lp",
+        "src.dc_opf.diagnosis",
+    ],
+)
+def test_heavy_dependencies_are_not_imported_eagerly(module):
+    assert _cold_import(module)["loaded"] == []
+
+
+def test_data_model_layer_import_time():
+    elapsed = min(
+        _cold_import("src.model.power_system_model")["elapsed"] for _ in range(3)
+    )
+    assert elapsed < IMPORT_TIME_LIMIT
+
+
+def test_console_is_created_on_first_use():
+    from src.model.data_models import error_logs
+
+    assert error_logs.console is error_logs.get_console()
+    assert "rich" in sys.modules
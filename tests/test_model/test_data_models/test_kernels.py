@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.data_models.kernels import cost_intervals_mask, monotonic_cost_mask
+
+
+def reference_cost_intervals_mask(
+    df: pd.DataFrame, generators_df: pd.DataFrame
+) -> np.ndarray:
+    merged = df.join(generators_df[["P_min", "P_max"]], on="generator_id")
+    merged = merged.sort_values(["generator_id", "p_start"], kind="stable")
+    groups = merged.groupby("generator_id")
+    prev_p_end = groups["p_end"].shift()
+    valid = (
+        groups["p_start"].transform("first").eq(merged["P_min"])
+        & groups["p_end"].transform("last").eq(merged["P_max"])
+        & (merged["p_start"].eq(prev_p_end) | prev_p_end.isna())
+    )
+    return valid.reindex(df.index).to_numpy()
+
+
+def reference_monotonic_cost_mask(df: pd.DataFrame) -> np.ndarray:
+    df_sorted = df.sort_values(["generator_id", "p_start"], kind="stable")
+    prev_cost = df_sorted.groupby("generator_id")["cost"].shift()
+    valid = prev_cost.isna() | (df_sorted["cost"] >= prev_cost)
+    return valid.reindex(df.index).to_numpy()
+
+
+def random_segments(
+    rng: np.random.Generator, n_generators: int, n_segments: int
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    points = np.tile(np.arange(n_segments, dtype=float), n_generators)
+    df = pd.DataFrame(
+        {
+            "generator_id": np.repeat(
+                [f"GEN{i}" for i in range(n_generators)], n_segments
+            ),
+            "p_start": points,
+            "p_end": points + 1.0,
+            "cost": points + rng.integers(0, 2, points.size),
+        }
+    )
+    # distort some of the rows and shuffle them
+    for col in ["p_start", "p_end", "cost"]:
+        rows = rng.choice(df.shape[0], df.shape[0] // 8 + 1, replace=False)
+        df.loc[rows, col] = rng.choice([np.nan, 0.0, 1.0, 2.0], rows.size)
+    rows = rng.choice(df.shape[0], df.shape[0] // 10 + 1, replace=False)
+    df.loc[rows, "generator_id"] = "NON-EXISTING-GEN-ID"
+    df = df.sample(frac=1.0, random_state=int(rng.integers(1000)))
+
+    generators_df = pd.DataFrame(
+        {"P_min": 0.0, "P_max": float(n_segments)},
+        index=pd.Index([f"GEN{i}" for i in range(n_generators)], name="generator_id"),
+    )
+    generators_df.iloc[::3, 1] += 1.0
+    return df, generators_df
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_masks_match_reference(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    df, generators_df = random_segments(
+        rng, n_generators=int(rng.integers(1, 8)), n_segments=int(rng.integers(1, 50))
+    )
+    intervals = cost_intervals_mask(
+        df["generator_id"],
+        df["p_start"],
+        df["p_end"],
+        generators_df["P_min"],
+        generators_df["P_max"],
+    )
+    monotonic = monotonic_cost_mask(df["generator_id"], df["p_start"], df["cost"])
+    np.testing.assert_array_equal(
+        intervals, reference_cost_intervals_mask(df, generators_df)
+    )
+    np.testing.assert_array_equal(monotonic, reference_monotonic_cost_mask(df))
+
+
+def test_sorted_segments(
+    marginal_costs_df: pd.DataFrame, generators_df: pd.DataFrame
+) -> None:
+    intervals = cost_intervals_mask(
+        marginal_costs_df["generator_id"],
+        marginal_costs_df["p_start"],
+        marginal_costs_df["p_end"],
+        generators_df["P_min"],
+        generators_df["P_max"],
+    )
+    monotonic = monotonic_cost_mask(
+        marginal_costs_df["generator_id"],
+        marginal_costs_df["p_start"],
+        marginal_costs_df["cost"],
+    )
+    assert intervals.all() and monotonic.all()
+
+
+def test_empty_segments() -> None:
+    empty = pd.Series([], dtype=float)
+    ids = pd.Series([], dtype=str)
+    assert cost_intervals_mask(ids, empty, empty, empty, empty).size == 0
+    assert monotonic_cost_mask(ids, empty, empty).size == 0
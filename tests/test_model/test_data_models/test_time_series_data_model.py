@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.model.data_models.utils as u
+from src.model.data_models import time_series_data_model
+from src.model.data_models.time_series_data_model import (
+    AvailabilityTimeSeriesDataModel,
+    DemandTimeSeriesDataModel,
+    TimeSeriesErrors,
+)
+from src.model.time_series import TimeSeries
+
+TIME = pd.date_range("2025-01-01", periods=48, freq="h")
+
+
+@pytest.fixture
+def demand(nodes_df: pd.DataFrame) -> TimeSeries:
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0.0, 2.0, (len(nodes_df), len(TIME))).astype(np.float32)
+    return TimeSeries(values=values, index=nodes_df.index, time=TIME)
+
+
+@pytest.fixture
+def availability(generators_df: pd.DataFrame) -> TimeSeries:
+    values = np.full((len(generators_df), len(TIME)), 0.5)
+    return TimeSeries(values=values, index=generators_df.index, time=TIME)
+
+
+def error_messages(data_model, time_series: TimeSeries, context: dict) -> list[str]:
+    with pytest.raises(TimeSeriesErrors) as errors:
+        data_model.validate(time_series, context=context)
+    return [info for _, info in errors.value.errors]
+
+
+def test_correct_data(
+    demand: TimeSeries,
+    availability: TimeSeries,
+    nodes_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+) -> None:
+    DemandTimeSeriesDataModel.validate(demand, context={"nodes_index": nodes_df.index})
+    AvailabilityTimeSeriesDataModel.validate(
+        availability, context={"generators_index": generators_df.index}
+    )
+
+
+@pytest.mark.parametrize("chunk_elements", [1, 7, 1 << 22])
+def test_not_finite_values(
+    demand: TimeSeries,
+    nodes_df: pd.DataFrame,
+    monkeypatch: pytest.MonkeyPatch,
+    chunk_elements: int,
+) -> None:
+    monkeypatch.setattr(time_series_data_model, "CHUNK_ELEMENTS", chunk_elements)
+    demand.values[1, 30] = np.inf
+    demand.values[3, 40] = np.nan
+
+    (message,) = error_messages(
+        DemandTimeSeriesDataModel, demand, {"nodes_index": nodes_df.index}
+    )
+    assert message.startswith(u.err_finite_check("P_demand", null=False))
+    assert f"2 value(s), first for N2 at {TIME[30]}" in message
+
+
+def test_invalid_node_identifiers(demand: TimeSeries, nodes_df: pd.DataFrame) -> None:
+    demand.index = pd.Index(["N1", "N1", "N3", "N4", "NON-EXISTING-NODE-ID"])
+
+    messages = error_messages(
+        DemandTimeSeriesDataModel, demand, {"nodes_index": nodes_df.index}
+    )
+    assert messages == [
+        u.err_unique("node_id"),
+        f"{u.err_foreign_key(fk_col='node_id')}: NON-EXISTING-NODE-ID",
+    ]
+
+
+def test_availability_out_of_range(
+    availability: TimeSeries, generators_df: pd.DataFrame
+) -> None:
+    availability.values[0, 0] = 1.5
+    availability.values[2, 5] = -0.1
+
+    (message,) = error_messages(
+        AvailabilityTimeSeriesDataModel,
+        availability,
+        {"generators_index": generators_df.index},
+    )
+    assert message.startswith(u.err_range_check("availability", 0.0, 1.0))
+    assert "2 value(s)" in message
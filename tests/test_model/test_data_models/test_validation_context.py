@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pandas as pd
+import pytest
+from pandera.errors import SchemaErrors
+
+from src.model.data_models import DataFrameModelWithContext
+from src.model.data_models.generators_data_model import GeneratorsDataModel
+
+
+def test_missing_context_parameter() -> None:
+    with pytest.raises(KeyError):
+        DataFrameModelWithContext.get_context("nodes_index")
+
+
+def test_concurrent_validations_with_different_contexts(
+    generators_df: pd.DataFrame, nodes_df: pd.DataFrame
+) -> None:
+    """Hundreds of validations against valid and invalid node sets at once."""
+    n_workers, n_validations = 16, 400
+    barrier = Barrier(n_workers)
+    valid_nodes = nodes_df.index
+    invalid_nodes = pd.Index(["N1", "N2"], name="node_id")  # no N3 for GEN4
+
+    def validate(i: int) -> bool:
+        if i < n_workers:
+            barrier.wait()
+        nodes_index = valid_nodes if i % 2 == 0 else invalid_nodes
+        try:
+            GeneratorsDataModel.validate(
+                generators_df.copy(), lazy=True, context={"nodes_index": nodes_index}
+            )
+        except SchemaErrors:
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(validate, range(n_validations)))
+
+    assert results == [i % 2 == 0 for i in range(n_validations)]
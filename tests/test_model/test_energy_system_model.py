@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 import pytest
-from src.model.power_system_model import PowerSystemModel
+from src.model.power_system_model import (PowerSystemModel,
+                                            build_power_system_models)
 
 
 def test_create_power_system_model_on_correct_data(
@@ -20,3 +22,102 @@ def test_create_power_system_model_on_correct_data(
         )
     except:
         pytest.fail()
+
+
+def test_build_power_system_models_concurrently(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> None:
+    cases = [
+        dict(
+            nodes=nodes_df.copy(),
+            transmission_lines=transmission_lines_df.copy(),
+            transformers=trafos_df.copy(),
+            generators=generators_df.copy(),
+            marginal_costs=marginal_costs_df.copy(),
+        )
+        for _ in range(20)
+    ]
+    models = build_power_system_models(cases, max_workers=8, validation_workers=4)
+
+    assert len(models) == len(cases)
+    for model in models:
+        assert (model.parameters.transformers["F_min"] == -trafos_df["F_max"]).all()
+
+
+def test_invalid_data_in_parallel_validation(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> None:
+    generators_df.loc["GEN1", "node_id"] = "NON-EXISTING-NODE-ID"
+    with pytest.raises(SystemExit):
+        PowerSystemModel(
+            nodes=nodes_df,
+            transmission_lines=transmission_lines_df,
+            transformers=trafos_df,
+            generators=generators_df,
+            marginal_costs=marginal_costs_df,
+            validation_workers=5,
+        )
+
+
+def test_compact_power_system_model(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> None:
+    marginal_costs_df["generator_id"] = marginal_costs_df["generator_id"].astype(
+        "category"
+    )
+    params = PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+        compact=True,
+    ).parameters
+
+    node_from = params.tramsmission_lines["node_from"]
+    assert node_from.cat.categories.equals(params.nodes.index)
+    assert node_from.cat.codes.tolist() == [0, 2, 0]
+    assert params.marginal_costs["generator_id"].cat.codes.tolist() == [
+        0,
+        0,
+        1,
+        1,
+        2,
+        2,
+        3,
+    ]
+    assert params.marginal_costs["cost"].dtype == np.float32
+    # 0.1 is not a float32 number
+    assert params.tramsmission_lines["reactance"].dtype == np.float64
+    assert (params.transformers["F_min"] == -trafos_df["F_max"]).all()
+
+
+def test_invalid_reference_in_compact_model(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> None:
+    transmission_lines_df.loc["LINE1", "node_to"] = "NON-EXISTING-NODE-ID"
+    with pytest.raises(SystemExit):
+        PowerSystemModel(
+            nodes=nodes_df,
+            transmission_lines=transmission_lines_df,
+            transformers=trafos_df,
+            generators=generators_df,
+            marginal_costs=marginal_costs_df,
+            compact=True,
+        )
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.power_system_model import PowerSystemModel
+from src.model.results_sink import ResultsReader, ResultsSink
+
+
+@pytest.fixture
+def results() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    return {"generation": rng.random((50, 3)), "flow": rng.random((50, 4))}
+
+
+@pytest.fixture
+def components() -> dict[str, list[str]]:
+    return {"generation": ["G1", "G2", "G3"], "flow": ["L1", "L2", "L3", "T1"]}
+
+
+def write(path, components, results, **kwargs) -> None:
+    with ResultsSink(path, components, **kwargs) as sink:
+        for start in range(0, 50, 7):
+            steps = np.arange(start, min(start + 7, 50))
+            sink.append(
+                steps, **{name: values[steps] for name, values in results.items()}
+            )
+
+
+def test_round_trip_in_bounded_chunks(tmp_path, components, results) -> None:
+    write(tmp_path, components, results, buffer_elements=40, max_pending_chunks=1)
+    reader = ResultsReader(tmp_path)
+
+    assert reader.quantities == ["flow", "generation"]
+    # 40 buffered values are 13 snapshots of generation, 7 appends fill 2 of them
+    assert len(list((tmp_path / "generation").glob("part-*.parquet"))) == 4
+    for name, values in results.items():
+        df = reader.read(name)
+        assert list(df.columns) == components[name]
+        np.testing.assert_array_equal(df.index, np.arange(50))
+        np.testing.assert_array_equal(df.to_numpy(), values)
+
+
+def test_lazy_selection(tmp_path, components, results) -> None:
+    write(tmp_path, components, results)
+    reader = ResultsReader(tmp_path)
+
+    df = reader.read("flow", components=["T1", "L2"], start=10, stop=19)
+    np.testing.assert_array_equal(df.index, np.arange(10, 20))
+    assert list(df.columns) == ["T1", "L2"]
+    np.testing.assert_array_equal(df.to_numpy(), results["flow"][10:20][:, [3, 1]])
+    assert reader.scan("flow", ["L1"]).collect().height == 50
+
+    with pytest.raises(KeyError):
+        reader.scan("flow", ["L9"])
+
+
+def test_integer_components(tmp_path, results) -> None:
+    components = {"generation": [10, 20, 30], "flow": [1, 2, 3, 4]}
+    write(tmp_path, components, results)
+    reader = ResultsReader(tmp_path)
+
+    assert reader.components("flow").tolist() == [1, 2, 3, 4]
+    df = reader.read("flow", components=[4, 2], start=10, stop=19)
+    assert list(df.columns) == [4, 2]
+    np.testing.assert_array_equal(df.to_numpy(), results["flow"][10:20][:, [3, 1]])
+    with pytest.raises(KeyError):
+        reader.scan("generation", [1])
+
+
+def test_unknown_quantity(tmp_path, components) -> None:
+    with ResultsSink(tmp_path, components) as sink:
+        with pytest.raises(KeyError):
+            sink.append([0], price=np.zeros(3))
+
+
+def test_datetime_snapshots(tmp_path) -> None:
+    time = pd.date_range("2024-01-01", periods=24, freq="h")
+    with ResultsSink(tmp_path, {"price": ["N1", "N2"]}) as sink:
+        sink.append(time.to_numpy(), price=np.arange(48.0).reshape(24, 2))
+
+    df = ResultsReader(tmp_path).read(
+        "price", start=time[6].to_pydatetime(), stop=time[11].to_pydatetime()
+    )
+    np.testing.assert_array_equal(df.index, time[6:12])
+    np.testing.assert_array_equal(df["N2"], np.arange(13.0, 24.0, 2.0))
+
+
+def test_append_state(
+    tmp_path,
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> None:
+    model = PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+    )
+    structure, state = model.parameters, model.state
+    for series in (
+        state.power_generation,
+        state.ts_power_flow,
+        state.trafos_power_flow,
+        state.theta,
+    ):
+        series[:] = np.arange(len(series), dtype=float)
+    components = {
+        "generation": structure.generators.index,
+        "flow": structure.tramsmission_lines.index.append(structure.transformers.index),
+        "theta": structure.nodes.index,
+    }
+    with ResultsSink(tmp_path, components) as sink:
+        sink.append_state(0, state)
+        sink.append_state(1, state)
+
+    reader = ResultsReader(tmp_path)
+    np.testing.assert_allclose(
+        reader.read("generation").loc[1], state.power_generation.to_numpy()
+    )
+    flow = reader.read("flow", components=structure.transformers.index)
+    np.testing.assert_allclose(flow.loc[0], state.trafos_power_flow.to_numpy())
+    np.testing.assert_allclose(reader.read("theta").loc[0], state.theta.to_numpy())
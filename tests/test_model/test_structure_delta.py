@@ -0,0 +1,271 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.power_system_model import PowerSystemModel
+from src.model.structure_delta import StructureDelta, TableDelta
+
+
+@pytest.fixture
+def power_system_model(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> PowerSystemModel:
+    return PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+    )
+
+
+def test_update_demand(power_system_model: PowerSystemModel) -> None:
+    power_system_model.apply(
+        StructureDelta(
+            nodes=TableDelta(
+                upsert=pd.DataFrame(
+                    {"P_demand": [1.5]}, index=pd.Index(["N1"], name="node_id")
+                )
+            )
+        )
+    )
+
+    nodes = power_system_model.parameters.nodes
+    assert nodes.loc["N1", "P_demand"] == 1.5
+    assert len(nodes) == 5
+    assert power_system_model.state.theta.isna().all()
+
+
+def test_add_generator_with_costs(power_system_model: PowerSystemModel) -> None:
+    params = power_system_model.parameters
+    power_system_model.apply(
+        StructureDelta(
+            generators=TableDelta(
+                upsert=pd.DataFrame(
+                    {"node_id": ["N4"], "P_min": [0.0], "P_max": [2.0]},
+                    index=pd.Index(["GEN5"], name="generator_id"),
+                )
+            ),
+            marginal_costs=TableDelta(
+                upsert=pd.DataFrame(
+                    {
+                        "generator_id": ["GEN5", "GEN5"],
+                        "p_start": [0.0, 1.0],
+                        "p_end": [1.0, 2.0],
+                        "cost": [1.0, 1.5],
+                    },
+                    index=[7, 8],
+                )
+            ),
+        )
+    )
+
+    assert params.generators.loc["GEN5", "P_max"] == 2.0
+    assert params.marginal_costs.loc[[7, 8], "cost"].tolist() == [1.0, 1.5]
+    assert len(params.marginal_costs) == 9
+
+
+def test_invalid_cost_segments(power_system_model: PowerSystemModel) -> None:
+    params = power_system_model.parameters
+    costs = params.marginal_costs.copy()
+    # the segment leaves a gap in the GEN1 power range
+    delta = StructureDelta(
+        marginal_costs=TableDelta(
+            upsert=pd.DataFrame(
+                {"generator_id": ["GEN1"], "p_start": [0.5], "p_end": [3.0]},
+                index=[1],
+            ).assign(cost=2.0)
+        )
+    )
+
+    with pytest.raises(SystemExit):
+        power_system_model.apply(delta)
+    pd.testing.assert_frame_equal(params.marginal_costs, costs)
+
+
+def test_generator_bounds_validate_costs(
+    power_system_model: PowerSystemModel,
+) -> None:
+    # GEN2 costs end at 4.5, so P_max cannot be raised without new segments
+    delta = StructureDelta(
+        generators=TableDelta(
+            upsert=pd.DataFrame(
+                {"node_id": ["N2"], "P_min": [3.0], "P_max": [5.0]},
+                index=pd.Index(["GEN2"], name="generator_id"),
+            )
+        )
+    )
+
+    with pytest.raises(SystemExit):
+        power_system_model.apply(delta)
+    assert power_system_model.parameters.generators.loc["GEN2", "P_max"] == 4.5
+
+
+def test_delete_referenced_node(power_system_model: PowerSystemModel) -> None:
+    with pytest.raises(SystemExit):
+        power_system_model.apply(StructureDelta(nodes=TableDelta(delete=["N2"])))
+    assert "N2" in power_system_model.parameters.nodes.index
+
+
+def test_delete_generator_with_costs(power_system_model: PowerSystemModel) -> None:
+    params = power_system_model.parameters
+    power_system_model.apply(StructureDelta(generators=TableDelta(delete=["GEN1"])))
+    power_system_model.apply(StructureDelta(generators=TableDelta(delete=["GEN2"])))
+
+    assert params.generators.index.tolist() == ["GEN3", "GEN4"]
+    assert params.marginal_costs.index.tolist() == [4, 5, 6]
+    assert len(power_system_model.state.power_generation) == 2
+
+
+def test_upsert_branch(power_system_model: PowerSystemModel) -> None:
+    line = pd.DataFrame(
+        {
+            "node_from": ["N4"],
+            "node_to": ["N5"],
+            "reactance": [0.2],
+            "F_max": [1.5],
+        },
+        index=pd.Index(["LINE4"], name="line_id"),
+    )
+    power_system_model.apply(StructureDelta(tramsmission_lines=TableDelta(line)))
+
+    lines = power_system_model.parameters.tramsmission_lines
+    assert lines.loc["LINE4", "F_min"] == -1.5
+    assert len(power_system_model.state.ts_power_flow) == 4
+
+
+def test_upsert_branch_to_deleted_node(power_system_model: PowerSystemModel) -> None:
+    line = pd.DataFrame(
+        {"node_from": ["N1"], "node_to": ["N5"], "reactance": [0.2], "F_max": [1.5]},
+        index=pd.Index(["LINE4"], name="line_id"),
+    )
+
+    with pytest.raises(SystemExit):
+        power_system_model.apply(
+            StructureDelta(
+                nodes=TableDelta(delete=["N5"]),
+                tramsmission_lines=TableDelta(line),
+            )
+        )
+    assert "LINE4" not in power_system_model.parameters.tramsmission_lines.index
+
+
+def test_compact_structure_delta(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> None:
+    power_system_model = PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+        compact=True,
+    )
+    params = power_system_model.parameters
+    power_system_model.apply(
+        StructureDelta(
+            nodes=TableDelta(
+                upsert=pd.DataFrame(
+                    {"P_demand": [0.0]}, index=pd.Index(["N6"], name="node_id")
+                )
+            ),
+            generators=TableDelta(
+                upsert=pd.DataFrame(
+                    {"node_id": ["N6"], "P_min": [0.0], "P_max": [1.0]},
+                    index=pd.Index(["GEN5"], name="generator_id"),
+                )
+            ),
+            marginal_costs=TableDelta(
+                upsert=pd.DataFrame(
+                    {
+                        "generator_id": ["GEN5", "GEN2"],
+                        "p_start": [0.0, 4.0],
+                        "p_end": [1.0, 4.5],
+                        "cost": [0.3, 3.5],
+                    },
+                    index=[7, 3],
+                )
+            ),
+        )
+    )
+    power_system_model.apply(StructureDelta(generators=TableDelta(delete=["GEN1"])))
+
+    assert params.generators["node_id"].cat.categories.equals(params.nodes.index)
+    assert params.generators.loc["GEN5", "node_id"] == "N6"
+    costs = params.marginal_costs
+    assert costs["generator_id"].cat.categories.equals(params.generators.index)
+    assert costs["generator_id"].tolist() == ["GEN2"] * 2 + ["GEN3"] * 2 + [
+        "GEN4",
+        "GEN5",
+    ]
+    # 0.3 is not a float32 number
+    assert costs["cost"].dtype == np.float64
+    assert costs.loc[7, "cost"] == 0.3
+
+
+def test_move_segment_to_other_generator(
+    power_system_model: PowerSystemModel,
+) -> None:
+    params = power_system_model.parameters
+    # builds the marginal costs index of generators
+    power_system_model.apply(StructureDelta(generators=TableDelta(delete=["GEN4"])))
+    costs = params.marginal_costs
+    power_system_model.apply(
+        StructureDelta(
+            generators=TableDelta(
+                upsert=pd.DataFrame(
+                    {"node_id": ["N4"], "P_min": [0.0], "P_max": [3.0]},
+                    index=pd.Index(["GEN5"], name="generator_id"),
+                )
+            ),
+            marginal_costs=TableDelta(
+                upsert=pd.DataFrame(
+                    {
+                        "generator_id": ["GEN5", "GEN1"],
+                        "p_start": [0.0, 0.0],
+                        "p_end": [3.0, 3.0],
+                        "cost": [2.0, 2.5],
+                    },
+                    index=[1, 9],
+                )
+            ),
+        )
+    )
+    assert costs.loc[1, "generator_id"] == "GEN1"
+    assert params.marginal_costs.loc[1, "generator_id"] == "GEN5"
+    assert len(power_system_model.state.power_generation) == 4
+
+    power_system_model.apply(StructureDelta(generators=TableDelta(delete=["GEN1"])))
+    assert params.marginal_costs.index.tolist() == [1, 2, 3, 4, 5]
+
+
+def test_upsert_missing_optional_column(power_system_model: PowerSystemModel) -> None:
+    assert "active" not in power_system_model.parameters.generators.columns
+    power_system_model.apply(
+        StructureDelta(
+            generators=TableDelta(
+                upsert=pd.DataFrame(
+                    {
+                        "node_id": ["N1"],
+                        "P_min": [-2.0],
+                        "P_max": [3.0],
+                        "active": [False],
+                    },
+                    index=pd.Index(["GEN1"], name="generator_id"),
+                )
+            )
+        )
+    )
+
+    generators = power_system_model.parameters.generators
+    assert generators.loc["GEN1", "P_max"] == 3.0
+    assert not generators.loc["GEN1", "active"]
+    assert generators.loc[["GEN2", "GEN3", "GEN4"], "active"].isna().all()
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.power_system_model import PowerSystemModel
+from src.model.time_series import TimeSeries, TimeSeriesData
+
+TIME = pd.date_range("2025-01-01", periods=24, freq="h")
+
+
+@pytest.fixture
+def power_system_model(
+    nodes_df: pd.DataFrame,
+    transmission_lines_df: pd.DataFrame,
+    trafos_df: pd.DataFrame,
+    generators_df: pd.DataFrame,
+    marginal_costs_df: pd.DataFrame,
+) -> PowerSystemModel:
+    return PowerSystemModel(
+        nodes=nodes_df,
+        transmission_lines=transmission_lines_df,
+        transformers=trafos_df,
+        generators=generators_df,
+        marginal_costs=marginal_costs_df,
+    )
+
+
+def test_from_long_format() -> None:
+    long = pd.DataFrame(
+        {
+            "node_id": ["N2", "N1", "N2", "N1"],
+            "time": [TIME[1], TIME[0], TIME[0], TIME[1]],
+            "P_demand": [4.0, 1.0, 3.0, 2.0],
+        }
+    )
+    time_series = TimeSeries.from_long(
+        long, index="node_id", time="time", value="P_demand", dtype=np.float32
+    )
+
+    assert time_series.values.dtype == np.float32
+    assert list(time_series.index) == ["N1", "N2"]
+    np.testing.assert_array_equal(time_series.values, [[1.0, 2.0], [3.0, 4.0]])
+
+
+def test_duplicated_long_rows() -> None:
+    long = pd.DataFrame(
+        {
+            "node_id": ["N1", "N2", "N1"],
+            "time": [TIME[0], TIME[0], TIME[0]],
+            "P_demand": [1.0, 2.0, 3.0],
+        }
+    )
+    with pytest.raises(ValueError, match="N1"):
+        TimeSeries.from_long(long, index="node_id", time="time", value="P_demand")
+
+
+def test_invalid_values() -> None:
+    with pytest.raises(TypeError):
+        TimeSeries(np.zeros((2, 3), dtype=np.int64), index=["a", "b"], time=TIME[:3])
+    with pytest.raises(ValueError):
+        TimeSeries(np.zeros((2, 3)), index=["a", "b"], time=TIME[:4])
+
+
+def test_memory_mapped_time_series(tmp_path, nodes_df: pd.DataFrame) -> None:
+    path = tmp_path / "demand.npy"
+    written = TimeSeries.memmap(path, nodes_df.index, TIME, mode="w+")
+    for steps, values in written.iter_chunks(5):
+        values[:] = np.arange(steps.start, steps.stop)
+    written.flush()
+
+    loaded = TimeSeries.memmap(path, nodes_df.index, TIME)
+    assert isinstance(loaded.values, np.memmap)
+    assert loaded.values.dtype == np.float32
+    window = loaded.window(slice(10, 12))
+    assert isinstance(window.values, np.memmap)
+    np.testing.assert_array_equal(window.values[0], [10.0, 11.0])
+
+
+def test_time_series_data(power_system_model: PowerSystemModel) -> None:
+    structure = power_system_model.parameters
+    demand = TimeSeries(np.ones((2, len(TIME))), index=["N1", "N2"], time=TIME)
+    data = TimeSeriesData(structure=structure, demand=demand)
+
+    samples = data.demand_samples(slice(0, 6))
+    assert samples.shape == (6, 2)
+    assert list(samples.index) == list(TIME[:6])
+    availability = data.availability_samples(slice(0, 6))
+    assert availability.shape == (6, len(structure.generators))
+    assert (availability == 1.0).all().all()
+
+
+def test_invalid_time_series_data(power_system_model: PowerSystemModel) -> None:
+    structure = power_system_model.parameters
+    demand = TimeSeries(np.ones((1, len(TIME))), index=["N1"], time=TIME)
+    availability = TimeSeries(
+        np.full((len(structure.generators), 3), 2.0),
+        index=structure.generators.index,
+        time=TIME[:3],
+    )
+    with pytest.raises(SystemExit):
+        TimeSeriesData(structure=structure, demand=demand, availability=availability)